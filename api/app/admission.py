@@ -0,0 +1,229 @@
+# api/app/admission.py
+"""
+Admission control and load shedding for the scoring endpoints.
+
+AdmissionController caps how many requests are inside the handler at once
+(``max_inflight``); the rest wait in a FIFO. A request is turned away
+*before* its body is read when:
+
+- its client deadline (``X-Request-Deadline`` epoch seconds, or
+  ``X-Request-Timeout-Ms`` relative to arrival) has already passed -> 504
+- the wait queue is full                                          -> 429
+- the estimated queue wait exceeds ``queue_budget_ms``            -> 503
+
+and a request whose deadline expires while queued is dropped without doing
+the work (504). 429/503 carry ``Retry-After``. The wait estimate is
+(queued + 1) / max_inflight * EWMA of recent service times.
+
+Only paths listed in ``paths`` (exact match) are guarded, so /health and
+/metrics are always served. Counters are exposed via ``stats()``.
+
+/predict/stream is not guarded per request (a stream can last for hours);
+NdjsonScorer takes a slot around each scored batch via ``batch_slot()``
+instead. Batches queue in the same FIFO but are never shed: a bulk stream
+gets back-pressure while interactive requests keep their share.
+
+An admitted request's AdmissionSlot is stored in ``scope["state"]`` under
+SLOT_KEY; a handler that stops doing work of its own (e.g. a /predict
+duplicate waiting on a coalesced result) calls ``release_threadsafe()`` so
+its slot goes to the next queued request. Early releases don't feed the
+service-time EWMA since they measure waiting, not scoring.
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Iterable, Optional
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+SLOT_KEY = "admission_slot"
+
+
+def _client_deadline(scope: Scope, arrived: float) -> Optional[float]:
+    """Absolute deadline (epoch seconds) from request headers, if any."""
+    for k, v in scope.get("headers", []):
+        try:
+            if k == b"x-request-deadline":
+                return float(v)
+            if k == b"x-request-timeout-ms":
+                return arrived + float(v) / 1000.0
+        except ValueError:
+            return None
+    return None
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_inflight: int = 8,
+        max_queue: int = 64,
+        queue_budget_ms: float = 2000.0,
+        paths: Iterable[str] = ("/predict",),
+    ):
+        self.max_inflight = int(max_inflight)
+        self.max_queue = int(max_queue)
+        self.queue_budget_ms = float(queue_budget_ms)
+        self.paths = tuple(paths)
+        self.inflight = 0
+        self.ewma_ms = 10.0  # service-time estimate; refined as requests finish
+        self._waiters: deque = deque()
+        self.counters = {
+            "admitted": 0,
+            "shed_queue_full": 0,
+            "shed_wait_budget": 0,
+            "shed_deadline": 0,
+            "expired_in_queue": 0,
+            "released_early": 0,
+            "stream_batches": 0,
+        }
+
+    def guards(self, path: str) -> bool:
+        return self.max_inflight > 0 and path in self.paths
+
+    def estimated_wait_ms(self) -> float:
+        if self.max_inflight <= 0 or self.inflight < self.max_inflight:
+            return 0.0  # disabled, or a slot is free
+        return (len(self._waiters) + 1) * self.ewma_ms / self.max_inflight
+
+    def stats(self) -> dict:
+        return {
+            **self.counters,
+            "inflight": self.inflight,
+            "queued": len(self._waiters),
+            "max_inflight": self.max_inflight,
+            "ewma_service_ms": round(self.ewma_ms, 3),
+            "estimated_wait_ms": round(self.estimated_wait_ms(), 3),
+        }
+
+    # ---- slots ----
+    async def acquire(self, timeout_s: float) -> bool:
+        if self.inflight < self.max_inflight and not self._waiters:
+            self.inflight += 1
+            return True
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        try:
+            # release() hands its slot straight to us, so inflight is unchanged
+            await asyncio.wait_for(fut, timeout=max(0.0, timeout_s))
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            try:
+                self._waiters.remove(fut)
+            except ValueError:
+                pass
+
+    @asynccontextmanager
+    async def batch_slot(self) -> AsyncIterator[None]:
+        """Hold a slot around one batch of streamed work, waiting as long as it takes."""
+        if self.max_inflight <= 0:
+            yield
+            return
+        while not await self.acquire(max(self.queue_budget_ms / 1000.0, 0.1)):
+            pass  # timed out in the queue: rejoin at the back, never drop the batch
+        self.counters["stream_batches"] += 1
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.release((time.perf_counter() - t0) * 1000.0)
+
+    def release(self, service_ms: Optional[float]):
+        if service_ms is not None:
+            self.ewma_ms = 0.8 * self.ewma_ms + 0.2 * service_ms
+        while self._waiters:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                fut.set_result(True)
+                return
+        self.inflight -= 1
+
+
+class AdmissionSlot:
+    """One admitted request's slot; released exactly once, on the event loop."""
+
+    def __init__(self, controller: AdmissionController, loop: asyncio.AbstractEventLoop):
+        self._ctl = controller
+        self._loop = loop
+        self._t0 = time.perf_counter()
+        self._held = True
+
+    def release(self, early: bool = False):
+        if not self._held:
+            return
+        self._held = False
+        if early:
+            self._ctl.counters["released_early"] += 1
+            self._ctl.release(None)
+        else:
+            self._ctl.release((time.perf_counter() - self._t0) * 1000.0)
+
+    def release_threadsafe(self):
+        """Give the slot back early from a threadpool handler."""
+        self._loop.call_soon_threadsafe(self.release, True)
+
+
+class AdmissionMiddleware:
+    """Pure ASGI middleware applying an AdmissionController to guarded paths."""
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController):
+        self.app = app
+        self.ctl = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self.ctl.guards(scope.get("path", "")):
+            await self.app(scope, receive, send)
+            return
+
+        ctl = self.ctl
+        now = time.time()
+        deadline = _client_deadline(scope, now)
+        if deadline is not None and deadline <= now:
+            ctl.counters["shed_deadline"] += 1
+            await self._reject(scope, receive, send, 504, "client deadline already passed")
+            return
+        if len(ctl._waiters) >= ctl.max_queue:
+            ctl.counters["shed_queue_full"] += 1
+            await self._reject(scope, receive, send, 429, "too many queued requests",
+                               ctl.estimated_wait_ms())
+            return
+        est = ctl.estimated_wait_ms()
+        if est > ctl.queue_budget_ms:
+            ctl.counters["shed_wait_budget"] += 1
+            await self._reject(scope, receive, send, 503, "server overloaded", est)
+            return
+
+        budget_s = ctl.queue_budget_ms / 1000.0
+        if deadline is not None:
+            budget_s = min(budget_s, deadline - now)
+        if not await ctl.acquire(budget_s):
+            if deadline is not None and time.time() >= deadline:
+                ctl.counters["expired_in_queue"] += 1
+                await self._reject(scope, receive, send, 504, "client deadline passed in queue")
+            else:
+                ctl.counters["shed_wait_budget"] += 1
+                await self._reject(scope, receive, send, 503, "server overloaded",
+                                   ctl.estimated_wait_ms())
+            return
+
+        ctl.counters["admitted"] += 1
+        slot = AdmissionSlot(ctl, asyncio.get_running_loop())
+        scope.setdefault("state", {})[SLOT_KEY] = slot
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            slot.release()
+
+    async def _reject(self, scope, receive, send, status: int, detail: str,
+                      wait_ms: Optional[float] = None):
+        headers = {}
+        if wait_ms is not None:
+            headers["Retry-After"] = str(max(1, math.ceil(wait_ms / 1000.0)))
+        resp = JSONResponse({"detail": detail}, status_code=status, headers=headers)
+        await resp(scope, receive, send)
@@ -0,0 +1,104 @@
+# api/app/batch.py
+"""
+Columnar batch scoring over Arrow IPC (POST /predict/batch).
+
+For service-to-service traffic, JSON encoding and per-item pydantic models
+cost more than the TF-IDF inference itself. With
+``Content-Type: application/vnd.apache.arrow.stream`` the request is an Arrow
+IPC stream with a string column ``text``, and the response is one record
+batch::
+
+    probability  float32                       null where the text was empty
+    label        dictionary<int8, string>      "non-toxic" / "toxic", null if empty
+    truncated    bool
+    score_<lbl>  float32                       multi-label models only
+    explanation  list<struct<ngram: string, contribution: float32>>
+                                               with ``?explain=k`` (explain.py)
+
+with the model version in the schema metadata (and the x-model-version
+header). The body is read zero-copy into a ``pyarrow`` table, the text column
+is handed to the vectorizer as one list, and the result columns are built
+directly from the numpy arrays scoring produced; no per-item dicts, pydantic
+models or JSON strings exist on this path. (The vectorizer itself still
+tokenizes Python ``str`` objects, so those are materialized once.)
+
+pyarrow is imported lazily; without it the endpoint answers 415 and the JSON
+form (``{"texts": [...]}``) keeps working.
+"""
+from __future__ import annotations
+
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+TEXT_COLUMN = "text"
+LABEL_NAMES = ("non-toxic", "toxic")
+
+
+def _explanation_type():
+    import pyarrow as pa
+
+    return pa.list_(pa.struct([("ngram", pa.string()), ("contribution", pa.float32())]))
+
+
+def is_arrow(content_type: Optional[str]) -> bool:
+    return (content_type or "").split(";", 1)[0].strip().lower() == ARROW_STREAM
+
+
+def decode_texts(body: bytes) -> List[Optional[str]]:
+    """Texts from an Arrow IPC stream with a string ``text`` column (nulls -> None)."""
+    import pyarrow as pa
+
+    try:
+        table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+    except pa.ArrowInvalid as e:
+        raise ValueError(f"invalid Arrow IPC stream: {e}") from e
+    if TEXT_COLUMN not in table.column_names:
+        raise ValueError(f"missing '{TEXT_COLUMN}' column")
+    col = table.column(TEXT_COLUMN)
+    if not (pa.types.is_string(col.type) or pa.types.is_large_string(col.type)):
+        raise ValueError(f"'{TEXT_COLUMN}' must be a string column, got {col.type}")
+    return col.to_pylist()
+
+
+def encode_results(
+    probs: np.ndarray,
+    truncated: np.ndarray,
+    scores: Optional[np.ndarray] = None,
+    heads: Optional[Sequence[str]] = None,
+    model_version: str = "",
+    explanations: Optional[Sequence[Optional[Sequence[Tuple[str, float]]]]] = None,
+) -> bytes:
+    """One record batch as an Arrow IPC stream; NaN probabilities become nulls."""
+    import pyarrow as pa
+
+    probs = np.asarray(probs, dtype=np.float32)
+    empty = np.isnan(probs)
+    mask = empty if empty.any() else None
+    labels = pa.DictionaryArray.from_arrays(
+        pa.array((probs >= 0.5).astype(np.int8), mask=mask),
+        pa.array(LABEL_NAMES),
+    )
+    names = ["probability", "label", "truncated"]
+    arrays = [pa.array(probs, type=pa.float32(), mask=mask), labels,
+              pa.array(np.asarray(truncated, dtype=bool))]
+    if scores is not None and heads:
+        for j, h in enumerate(heads):
+            names.append(f"score_{h}")
+            arrays.append(pa.array(np.ascontiguousarray(scores[:, j], dtype=np.float32),
+                                   mask=mask))
+    if explanations is not None:
+        names.append("explanation")
+        arrays.append(pa.array(
+            [None if e is None else [{"ngram": g, "contribution": c} for g, c in e]
+             for e in explanations],
+            type=_explanation_type(),
+        ))
+
+    batch = pa.RecordBatch.from_arrays(arrays, names=names)
+    batch = batch.replace_schema_metadata({"model_version": model_version})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
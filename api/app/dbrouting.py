@@ -0,0 +1,187 @@
+# api/app/dbrouting.py
+"""
+Primary / read-replica routing, shared by the API and the monitoring app.
+
+Writes (prediction inserts, feedback updates, DDL) use ``primary()``. Reads
+that can tolerate a little lag (dashboards, exports, health checks) use
+``reader()``, which returns the replica engine unless
+
+- no replica is configured (DATABASE_READ_URL unset),
+- the replica is unreachable, or
+- its replication lag exceeds ``max_lag_s``,
+
+in which case it falls back to the primary. The lag is measured at most
+every ``lag_check_s`` seconds, so routing costs nothing per query.
+
+Each side has its own pool size, overflow and statement timeout, so a long
+dashboard scan can't hold a connection the insert path needs, and is
+cancelled by the server before it gets expensive. The primary keeps
+SQLAlchemy's default 10 overflow connections for insert bursts (coalesced
+/predict waiters give their admission slot back, so more than MAX_INFLIGHT
+handlers can reach the insert at once); the replica pool is fixed. On
+Postgres the replica sessions are also opened read-only.
+
+Configuration (environment)::
+
+    DATABASE_URL                     primary
+    DATABASE_READ_URL                replica (optional)
+    DB_POOL_SIZE=5                   DB_READ_POOL_SIZE=5
+    DB_MAX_OVERFLOW=10               DB_READ_MAX_OVERFLOW=0
+    DB_STATEMENT_TIMEOUT_MS=5000     DB_READ_STATEMENT_TIMEOUT_MS=30000
+    DB_MAX_REPLICA_LAG_S=5           DB_LAG_CHECK_S=5
+
+Any SQLAlchemy URL works; two SQLite files stand in for the pair in tests
+(SQLite has no replication, so a reachable one reads as lag 0 unless ``lag_fn``
+is given).
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+
+# Seconds since the last replayed transaction, or 0 when the standby has
+# replayed everything it received (an idle primary is not "lag").
+PG_LAG_SQL = """
+SELECT CASE
+  WHEN NOT pg_is_in_recovery() THEN 0
+  WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+  ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+
+def make_engine(url: str, pool_size: int = 5, statement_timeout_ms: int = 0,
+                read_only: bool = False, max_overflow: int = 10) -> Engine:
+    kw = {"pool_pre_ping": True, "future": True}
+    if url.startswith("postgresql"):
+        opts = []
+        if statement_timeout_ms > 0:
+            opts.append(f"-c statement_timeout={int(statement_timeout_ms)}")
+        if read_only:
+            opts.append("-c default_transaction_read_only=on")
+        if opts:
+            kw["connect_args"] = {"options": " ".join(opts)}
+    if ":memory:" not in url:
+        kw.update(pool_size=int(pool_size), max_overflow=int(max_overflow))
+    return create_engine(url, **kw)
+
+
+class Database:
+    def __init__(
+        self,
+        primary_url: Optional[str],
+        replica_url: Optional[str] = None,
+        pool_size: int = 5,
+        read_pool_size: int = 5,
+        max_overflow: int = 10,
+        read_max_overflow: int = 0,
+        statement_timeout_ms: int = 5000,
+        read_statement_timeout_ms: int = 30000,
+        max_lag_s: float = 5.0,
+        lag_check_s: float = 5.0,
+        lag_fn: Optional[Callable[[Engine], float]] = None,
+    ):
+        self.primary_url = primary_url
+        self.replica_url = replica_url or None
+        self.pool_size = int(pool_size)
+        self.read_pool_size = int(read_pool_size)
+        self.max_overflow = int(max_overflow)
+        self.read_max_overflow = int(read_max_overflow)
+        self.statement_timeout_ms = int(statement_timeout_ms)
+        self.read_statement_timeout_ms = int(read_statement_timeout_ms)
+        self.max_lag_s = float(max_lag_s)
+        self.lag_check_s = float(lag_check_s)
+        self.lag_fn = lag_fn or self._default_lag
+        self._primary: Optional[Engine] = None
+        self._replica: Optional[Engine] = None
+        self._lock = threading.Lock()
+        self._checked_at = float("-inf")
+        self._replica_ok = False
+        self.last_lag_s: Optional[float] = None
+        self.counters = {"reads_replica": 0, "reads_primary": 0, "replica_fallbacks": 0}
+
+    @classmethod
+    def from_env(cls, **overrides) -> "Database":
+        env = os.getenv
+        kw = dict(
+            primary_url=env("DATABASE_URL"),
+            replica_url=env("DATABASE_READ_URL"),
+            pool_size=int(env("DB_POOL_SIZE", "5")),
+            read_pool_size=int(env("DB_READ_POOL_SIZE", "5")),
+            max_overflow=int(env("DB_MAX_OVERFLOW", "10")),
+            read_max_overflow=int(env("DB_READ_MAX_OVERFLOW", "0")),
+            statement_timeout_ms=int(env("DB_STATEMENT_TIMEOUT_MS", "5000")),
+            read_statement_timeout_ms=int(env("DB_READ_STATEMENT_TIMEOUT_MS", "30000")),
+            max_lag_s=float(env("DB_MAX_REPLICA_LAG_S", "5")),
+            lag_check_s=float(env("DB_LAG_CHECK_S", "5")),
+        )
+        kw.update(overrides)
+        return cls(**kw)
+
+    # ---- engines ----
+    def primary(self) -> Optional[Engine]:
+        if self._primary is None and self.primary_url:
+            with self._lock:
+                if self._primary is None:
+                    self._primary = make_engine(
+                        self.primary_url, self.pool_size, self.statement_timeout_ms,
+                        max_overflow=self.max_overflow,
+                    )
+        return self._primary
+
+    def replica(self) -> Optional[Engine]:
+        if self._replica is None and self.replica_url:
+            with self._lock:
+                if self._replica is None:
+                    self._replica = make_engine(
+                        self.replica_url, self.read_pool_size,
+                        self.read_statement_timeout_ms, read_only=True,
+                        max_overflow=self.read_max_overflow,
+                    )
+        return self._replica
+
+    def reader(self) -> Optional[Engine]:
+        """Replica if configured, reachable and fresh enough; else the primary."""
+        rep = self.replica()
+        if rep is not None:
+            if self._replica_fresh(rep):
+                self.counters["reads_replica"] += 1
+                return rep
+            self.counters["replica_fallbacks"] += 1
+        self.counters["reads_primary"] += 1
+        return self.primary() or rep
+
+    # ---- staleness ----
+    @staticmethod
+    def _default_lag(eng: Engine) -> float:
+        # Also the reachability check: raises if the replica is down
+        sql = PG_LAG_SQL if eng.dialect.name == "postgresql" else "SELECT 0"
+        with eng.connect() as conn:
+            return float(conn.execute(text(sql)).scalar() or 0.0)
+
+    def _replica_fresh(self, rep: Engine) -> bool:
+        now = time.monotonic()
+        if now - self._checked_at < self.lag_check_s:
+            return self._replica_ok
+        self._checked_at = now
+        try:
+            self.last_lag_s = self.lag_fn(rep)
+            ok = self.last_lag_s <= self.max_lag_s
+        except Exception as e:
+            print(f"[warn] replica check failed: {e}")
+            self.last_lag_s, ok = None, False
+        self._replica_ok = ok
+        return ok
+
+    def stats(self) -> dict:
+        return {
+            **self.counters,
+            "replica_configured": self.replica_url is not None,
+            "replica_ok": self._replica_ok,
+            "replica_lag_s": self.last_lag_s,
+        }
@@ -0,0 +1,132 @@
+# api/app/limits.py
+"""
+Bounds on how much work a single request can cause.
+
+- MaxBodySizeMiddleware rejects oversized bodies with 413 *before* FastAPI
+  reads/parses the JSON (Content-Length is checked up front; chunked bodies
+  are counted as they stream in).
+- window_text() caps how many characters reach the vectorizer, either by
+  keeping the head or by sampling evenly spaced windows across the text.
+"""
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+def _declared_length(scope: Scope) -> int:
+    for k, v in scope.get("headers", []):
+        if k == b"content-length":
+            try:
+                return int(v)
+            except ValueError:
+                return 0
+    return 0
+
+
+class _BodyGuard:
+    """Counts streamed body bytes; once over the limit, answers 413 itself
+    and reports a disconnect to the app so it stops reading."""
+
+    def __init__(self, owner: "MaxBodySizeMiddleware", scope: Scope, receive: Receive,
+                 send: Send, limit: int):
+        self.owner = owner
+        self.limit = limit
+        self.scope = scope
+        self._receive = receive
+        self._send = send
+        self.seen = 0
+        self.rejected = False
+        self.started = False
+
+    async def receive(self) -> Message:
+        msg = await self._receive()
+        if msg["type"] != "http.request" or self.rejected:
+            return msg
+        self.seen += len(msg.get("body", b""))
+        if self.seen <= self.limit:
+            return msg
+        self.rejected = True
+        if not self.started:
+            await self.owner._reject(self.scope, self._receive, self._send, self.limit)
+        return {"type": "http.disconnect"}
+
+    async def send(self, msg: Message):
+        if self.rejected:
+            return  # we already answered 413
+        if msg["type"] == "http.response.start":
+            self.started = True
+        await self._send(msg)
+
+
+class MaxBodySizeMiddleware:
+    """
+    Pure ASGI middleware: 413 for request bodies larger than ``max_bytes``.
+
+    ``exempt_paths`` are streaming endpoints that enforce their own per-line
+    limit instead of a total-body one; ``path_limits`` overrides ``max_bytes``
+    for endpoints that legitimately take larger bodies (batch scoring).
+    """
+
+    def __init__(self, app: ASGIApp, max_bytes: int, exempt_paths: Iterable[str] = (),
+                 path_limits: Optional[Dict[str, int]] = None):
+        self.app = app
+        self.max_bytes = int(max_bytes)
+        self.exempt_paths = frozenset(exempt_paths)
+        self.path_limits = {p: int(n) for p, n in (path_limits or {}).items()}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope.get("path") in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+        limit = self.path_limits.get(scope.get("path"), self.max_bytes)
+        if limit <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        # Fast path: trust a declared Content-Length
+        if _declared_length(scope) > limit:
+            await self._reject(scope, receive, send, limit)
+            return
+
+        # Chunked / undeclared bodies: count bytes as they arrive
+        guard = _BodyGuard(self, scope, receive, send, limit)
+        try:
+            await self.app(scope, guard.receive, guard.send)
+        except Exception:
+            if not guard.rejected:
+                raise
+
+    async def _reject(self, scope: Scope, receive: Receive, send: Send, limit: int):
+        resp = JSONResponse(
+            {"detail": f"request body exceeds {limit} bytes"},
+            status_code=413,
+        )
+        await resp(scope, receive, send)
+
+
+def window_text(
+    text: str, max_chars: int, strategy: str = "head", n_windows: int = 4
+) -> Tuple[List[str], bool]:
+    """
+    Return ``(pieces, truncated)`` where the pieces together hold at most
+    ``max_chars`` characters.
+
+    strategy="head"    -> [text[:max_chars]]
+    strategy="windows" -> ``n_windows`` evenly spaced slices (first one at the
+                          start, last one at the end); the caller scores each
+                          and takes the max, so toxic content past the head is
+                          still seen at the same bounded cost.
+    """
+    if max_chars <= 0 or len(text) <= max_chars:
+        return [text], False
+
+    if strategy != "windows" or n_windows <= 1:
+        return [text[:max_chars]], True
+
+    w = max(1, max_chars // n_windows)
+    last = len(text) - w
+    starts = [round(i * last / (n_windows - 1)) for i in range(n_windows)]
+    return [text[s:s + w] for s in starts], True
@@ -1,20 +1,39 @@
 # api/app/main.py
 from __future__ import annotations
 
+import hmac
 import os
+import threading
 import time
 from pathlib import Path
-from typing import Optional
-
-import joblib
-import mlflow
-import mlflow.pyfunc
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from sqlalchemy import create_engine, text
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.responses import Response
+from pydantic import BaseModel, Field, ValidationError
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import text
 from sqlalchemy.engine import Engine
 from fastapi.middleware.cors import CORSMiddleware
 
+from .admission import SLOT_KEY, AdmissionController, AdmissionMiddleware
+from .batch import ARROW_STREAM, LABEL_NAMES, decode_texts, encode_results, is_arrow
+from .dbrouting import Database
+from .explain import Explanation, explain_rows
+from .limits import MaxBodySizeMiddleware, window_text
+from .model_cache import ModelArtifactCache, resolve_version
+from .singleflight import SingleFlight
+from .streaming import NdjsonScorer
+from .textnorm import normalize_text
+from .tracing import (
+    SlowTraceBuffer,
+    TracingMiddleware,
+    current_trace_id,
+    mark_since_start,
+    span,
+)
 
 APP_DIR = Path(__file__).resolve().parent
 ART_DIR = APP_DIR / "artifacts"
@@ -30,18 +49,77 @@ MLFLOW_TRACKING_URI = os.getenv("MLFLOW_TRACKING_URI")
 MLFLOW_MODEL_NAME = os.getenv("MLFLOW_MODEL_NAME", "toxic-comment-model")
 MODEL_STAGE = os.getenv("MODEL_STAGE", "Production")
 
+# POST /reload requires "Authorization: Bearer $RELOAD_TOKEN"; unset = disabled
+RELOAD_TOKEN = os.getenv("RELOAD_TOKEN", "")
+
+# Local mirror of registry versions (see model_cache.py); 0 = unlimited
+MODEL_CACHE_DIR = os.getenv("MODEL_CACHE_DIR", str(APP_DIR / "model_cache"))
+MODEL_CACHE_MAX_VERSIONS = int(os.getenv("MODEL_CACHE_MAX_VERSIONS", "3"))
+MODEL_CACHE_MAX_BYTES = int(os.getenv("MODEL_CACHE_MAX_BYTES", "0"))
+
+# Long-input limits: bodies over MAX_REQUEST_BYTES get 413 before JSON parsing;
+# at most MAX_TEXT_CHARS characters are vectorized per comment, taken as the
+# head or as TRUNCATION_WINDOWS evenly spaced windows (max prob wins).
+MAX_REQUEST_BYTES = int(os.getenv("MAX_REQUEST_BYTES", str(256 * 1024)))
+MAX_TEXT_CHARS = int(os.getenv("MAX_TEXT_CHARS", "10000"))
+TRUNCATION_STRATEGY = os.getenv("TRUNCATION_STRATEGY", "windows")  # "head" | "windows"
+TRUNCATION_WINDOWS = int(os.getenv("TRUNCATION_WINDOWS", "4"))
+
+# Dummy predictions run at startup so the first real request doesn't pay
+# first-call costs (lazy sklearn/scipy imports, vocabulary page-in, ...)
+WARMUP_PREDICTIONS = int(os.getenv("WARMUP_PREDICTIONS", "3"))
+
+# Tracing: requests slower than SLOW_REQUEST_MS keep their span breakdown in a
+# ring buffer of TRACE_BUFFER_SIZE entries, served at GET /debug/slow-requests
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "250"))
+TRACE_BUFFER_SIZE = int(os.getenv("TRACE_BUFFER_SIZE", "100"))
+
+# Streaming NDJSON scoring (POST /predict/stream): lines per vectorized batch
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "256"))
+
+# Batch scoring (POST /predict/batch, JSON or Arrow IPC): its own body limit
+# instead of MAX_REQUEST_BYTES, and at most MAX_BATCH_ITEMS texts per request
+MAX_BATCH_BYTES = int(os.getenv("MAX_BATCH_BYTES", str(64 * 1024 * 1024)))
+MAX_BATCH_ITEMS = int(os.getenv("MAX_BATCH_ITEMS", "10000"))
+
+# "explain": at most this many top contributing n-grams per comment
+MAX_EXPLAIN_K = int(os.getenv("MAX_EXPLAIN_K", "50"))
+
+# Concurrent identical /predict requests (same normalized text + model
+# version) share one model call; see singleflight.py
+COALESCE_PREDICTIONS = os.getenv("COALESCE_PREDICTIONS", "true").lower() == "true"
+
+# Admission control (see admission.py): at most MAX_INFLIGHT scoring requests
+# in the handler, MAX_QUEUE waiting; shed when the estimated wait exceeds
+# QUEUE_BUDGET_MS. MAX_INFLIGHT=0 disables it. /predict/stream takes a slot per
+# scored batch instead, so keep it out of ADMISSION_PATHS.
+MAX_INFLIGHT = int(os.getenv("MAX_INFLIGHT", "8"))
+MAX_QUEUE = int(os.getenv("MAX_QUEUE", "64"))
+QUEUE_BUDGET_MS = float(os.getenv("QUEUE_BUDGET_MS", "2000"))
+ADMISSION_PATHS = tuple(
+    p.strip() for p in os.getenv("ADMISSION_PATHS", "/predict,/predict/batch").split(",")
+    if p.strip()
+)
+
 # ---------- DB helpers ----------
-engine: Optional[Engine] = None
+# Primary for writes, optional DATABASE_READ_URL replica for reads; pool sizes
+# and statement timeouts per side come from DB_* env vars (see dbrouting.py)
+db = Database.from_env(primary_url=DATABASE_URL)
 
 
 def get_engine() -> Optional[Engine]:
-    """Return a SQLAlchemy engine or None (e.g., in tests)."""
-    global engine
+    """Return the primary (write) engine or None (e.g., in tests)."""
     if TESTING:
         return None  # skip DB in tests
-    if engine is None and DATABASE_URL:
-        engine = create_engine(DATABASE_URL, pool_pre_ping=True, future=True)
-    return engine
+    return db.primary()
+
+
+def get_read_engine() -> Optional[Engine]:
+    """Replica when configured and fresh, else the primary; None in tests."""
+    if TESTING:
+        return None
+    return db.reader()
 
 
 DDL = """
@@ -56,6 +134,13 @@ CREATE TABLE IF NOT EXISTS predictions (
   created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
 );
 CREATE INDEX IF NOT EXISTS idx_predictions_created_at ON predictions (created_at DESC);
+-- high-water mark for ml/incremental.py
+ALTER TABLE predictions ADD COLUMN IF NOT EXISTS feedback_at TIMESTAMPTZ;
+-- feedback edits polled by monitoring/feed.py
+CREATE INDEX IF NOT EXISTS idx_predictions_feedback_at ON predictions (feedback_at)
+  WHERE feedback_at IS NOT NULL;
+-- multi-label models: one byte per label (multilabel.LABELS order), p * 255
+ALTER TABLE predictions ADD COLUMN IF NOT EXISTS label_scores BYTEA;
 """
 
 
@@ -63,7 +148,11 @@ def ensure_schema():
     eng = get_engine()
     if eng is None:
         return
-    with eng.begin() as conn:
+    with span("db.ensure_schema"), eng.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            # DDL may wait on locks or build indexes; DB_STATEMENT_TIMEOUT_MS is
+            # meant for request queries, so lift it for this transaction only
+            conn.exec_driver_sql("SET LOCAL statement_timeout = 0")
         conn.exec_driver_sql(DDL)
 
 
@@ -72,14 +161,23 @@ def ensure_schema():
 class ModelWrapper:
     """
     Loads a model from one of:
-      1) MLflow Model Registry (if MLFLOW_TRACKING_URI set)
+      1) MLflow Model Registry (if MLFLOW_TRACKING_URI set), via the local
+         artifact cache; the stage is resolved (and a cache miss downloaded)
+         in the background and hot-swapped in, while the newest cached
+         version or (2)/(3) serve
       2) Local artifacts (vectorizer.joblib + classifier.joblib)
       3) TESTING fallback (tiny TF-IDF + LogisticRegression) when TESTING=1
+
+    Heavy dependencies (mlflow, pandas, joblib/sklearn) are imported only on
+    the branch that needs them, so importing this module stays cheap.
     """
     def __init__(self):
         self.model = None            # Either ("local", vec, clf) or mlflow pyfunc
         self.source = None           # "mlflow:<uri>" or "local-artifacts" or "testing-stub"
         self.model_version = MODEL_VERSION
+        self._pd = None              # pandas, imported once for the pyfunc path
+        self._fetching = False       # background registry sync in progress
+        self._lock = threading.Lock()  # guards model/source swaps
 
         # If training wrote MODEL_VERSION.txt, prefer that
         mv_txt = ART_DIR / "MODEL_VERSION.txt"
@@ -102,11 +200,8 @@ class ModelWrapper:
         # 1) Try MLflow Registry (Production by default)
         if MLFLOW_TRACKING_URI:
             try:
-                mlflow.set_tracking_uri(MLFLOW_TRACKING_URI)
-                uri = f"models:/{MLFLOW_MODEL_NAME}/{MODEL_STAGE}"
-                self.model = mlflow.pyfunc.load_model(uri)
-                self.source = f"mlflow:{uri}"
-                return
+                if self._load_from_registry():
+                    return
             except Exception as e:
                 print(f"[warn] MLflow load failed: {e}")
 
@@ -115,50 +210,214 @@ class ModelWrapper:
             vec = ART_DIR / "vectorizer.joblib"
             clf = ART_DIR / "classifier.joblib"
             if vec.exists() and clf.exists():
+                import joblib
+
                 v = joblib.load(vec)
                 c = joblib.load(clf)
-                self.model = ("local", v, c)  # flag + objects
-                self.source = "local-artifacts"
+                self._set_fallback(("local", v, c), "local-artifacts")  # flag + objects
                 return
 
         # 3) TESTING fallback
         if TESTING:
             print("[model] Using TESTING fallback model.")
             self._load_testing_stub()
-            self.source = "testing-stub"
             if not self.model_version:
                 self.model_version = "testing-stub"
             return
 
         raise RuntimeError("No model available (MLflow/local/testing all unavailable).")
 
+    def reload(self):
+        """Load the current artifacts/registry version again and swap it in."""
+        with self._lock:
+            self.source = None  # let a local fallback replace a registry model
+        mv_txt = ART_DIR / "MODEL_VERSION.txt"
+        if mv_txt.exists():
+            self.model_version = mv_txt.read_text(encoding="utf-8").strip()
+        self.load()
+
     def predict_proba(self, text: str) -> float:
         """Return probability of 'toxic' (float in [0,1])."""
+        return self.predict_proba_batch([text])[0]
+
+    def predict_proba_batch(self, texts: List[str]) -> List[float]:
+        """Vectorized predict_proba: one transform/predict call for all texts."""
+        return self.predict_scores_batch(texts)[0]
+
+    def predict_scores_batch(
+        self, texts: List[str]
+    ) -> Tuple[List[float], Optional[List[List[float]]], Optional[Tuple[str, ...]]]:
+        """
+        (toxic probabilities, per-label rows, label names) for a batch.
+
+        The last two are None for single-label models. A multi-label model
+        (multilabel.MultiLabelLinear) scores every label in one X @ W product.
+        """
+        probs, rows, heads = self.predict_arrays(texts)
+        return probs.tolist(), (rows.tolist() if rows is not None else None), heads
+
+    def predict_arrays(
+        self, texts: List[str]
+    ) -> Tuple[np.ndarray, Optional[np.ndarray], Optional[Tuple[str, ...]]]:
+        """predict_scores_batch as numpy arrays: (n,) and (n, n_labels) floats."""
         if not self.is_loaded():
             raise RuntimeError("Model not loaded")
+        texts = [str(t) for t in texts]
 
+        m = self.model  # read once: a background load may swap it
         # Local artifacts or testing stub (both use vec+clf)
-        if isinstance(self.model, tuple) and self.model[0] == "local":
-            _, vec, clf = self.model
-            X = vec.transform([str(text)])
-            return float(clf.predict_proba(X)[:, 1][0])
+        if isinstance(m, tuple) and m[0] == "local":
+            _, vec, clf = m
+            with span("model.transform"):
+                X = vec.transform(texts)
+            return self._proba(clf, X)
 
         # MLflow pyfunc path: expect DataFrame with column 'prob' or 'label'
-        import pandas as pd
-        res = self.model.predict(pd.Series([str(text)]))
+        # (multi-label models add prob_<label> columns)
+        with span("model.pyfunc_predict"):
+            res = m.predict(self._pd.Series(texts))
         if hasattr(res, "columns"):
+            cols = [c for c in res.columns if str(c).startswith("prob_")]
+            rows = res[cols].to_numpy(dtype=float) if cols else None
+            heads = tuple(str(c)[5:] for c in cols) or None
             if "prob" in res.columns:
-                return float(res["prob"].iloc[0])
+                return res["prob"].to_numpy(dtype=float), rows, heads
             if "label" in res.columns:
-                return float(res["label"].iloc[0])
+                return res["label"].to_numpy(dtype=float), rows, heads
         try:
-            val = float(res.iloc[0])  # type: ignore[attr-defined]
-            return val
+            return np.asarray(res, dtype=float).reshape(-1), None, None
         except Exception:
             pass
         raise RuntimeError("Unexpected model output from pyfunc")
 
+    def predict_explained(
+        self, texts: List[str], k: int
+    ) -> Tuple[np.ndarray, Optional[np.ndarray], Optional[Tuple[str, ...]],
+               List[Optional[Explanation]]]:
+        """
+        predict_arrays plus the top-``k`` n-gram contributions per text
+        (explain.py), taken from the same TF-IDF rows used for scoring.
+
+        Explanations are None when the model isn't a linear vec+clf pair.
+        """
+        if not self.is_loaded():
+            raise RuntimeError("Model not loaded")
+        parts = self._linear_parts(self.model)
+        if parts is None:
+            return (*self.predict_arrays(texts), [None] * len(texts))
+        vec, clf = parts
+        with span("model.transform"):
+            X = vec.transform([str(t) for t in texts])
+        probs, rows, heads = self._proba(clf, X)
+        with span("model.explain"):
+            expl = explain_rows(vec, clf, X, k)
+        return probs, rows, heads, expl or [None] * len(texts)
+
+    def warm_up(self, n: int = WARMUP_PREDICTIONS) -> float:
+        """Run ``n`` dummy predictions; returns elapsed ms."""
+        t0 = time.perf_counter()
+        samples = ["warm up", "you are nice", "this is stupid"]
+        for i in range(n):
+            self.predict_proba(samples[i % len(samples)])
+        if n:
+            self.predict_proba_batch(samples)
+        return (time.perf_counter() - t0) * 1000.0
+
     # ---- helpers ----
+    @staticmethod
+    def _proba(clf, X) -> Tuple[np.ndarray, Optional[np.ndarray], Optional[Tuple[str, ...]]]:
+        with span("model.predict_proba"):
+            P = clf.predict_proba(X)
+        heads = getattr(clf, "labels", None)
+        if heads:
+            return P[:, 0].astype(float), np.asarray(P, dtype=float), tuple(heads)
+        return P[:, 1].astype(float), None, None
+
+    @staticmethod
+    def _linear_parts(m) -> Optional[Tuple[object, object]]:
+        """(vectorizer, classifier) of a local model or a ml/train.py pyfunc."""
+        if isinstance(m, tuple) and m[0] == "local":
+            return m[1], m[2]
+        try:
+            inner = m.unwrap_python_model()
+        except Exception:
+            return None
+        if hasattr(inner, "vec") and hasattr(inner, "clf"):
+            return inner.vec, inner.clf
+        return None
+
+    def _load_from_registry(self) -> bool:
+        """
+        Serve the newest cached registry version right away (if any) and ask
+        the registry for the current one in the background: resolving the
+        stage is a network call with MLflow's retry/backoff, which must not
+        hold up startup or /reload when the tracking server is unreachable.
+        """
+        import mlflow
+
+        mlflow.set_tracking_uri(MLFLOW_TRACKING_URI)
+        cache = ModelArtifactCache(
+            Path(MODEL_CACHE_DIR), MODEL_CACHE_MAX_VERSIONS, MODEL_CACHE_MAX_BYTES
+        )
+        stale = cache.latest(MLFLOW_MODEL_NAME)
+        if stale is not None:
+            print(f"[model-cache] serving cached v{stale[0]} while the registry is checked")
+            self._activate_pyfunc(stale[1], stale[0])
+        self._sync_in_background(cache, stale[0] if stale else None)
+        return stale is not None
+
+    def _activate_pyfunc(self, path: Path, version: str):
+        import mlflow.pyfunc
+        import pandas as pd
+
+        t0 = time.perf_counter()
+        loaded = mlflow.pyfunc.load_model(str(path))
+        with self._lock:
+            self._pd = pd
+            self.model = loaded
+            self.source = f"mlflow:models:/{MLFLOW_MODEL_NAME}/{version}"
+            self.model_version = f"mlflow-{MLFLOW_MODEL_NAME}-v{version}-{MODEL_STAGE.lower()}"
+        ms = (time.perf_counter() - t0) * 1000.0
+        print(f"[model-cache] loaded v{version} from {path} in {ms:.1f} ms")
+
+    def _set_fallback(self, m, source: str):
+        """Install a local/testing model unless a registry model already won the race."""
+        with self._lock:
+            if self.source and self.source.startswith("mlflow:"):
+                return
+            self.model = m
+            self.source = source
+
+    def _sync_in_background(self, cache: ModelArtifactCache, serving: Optional[str]):
+        """Resolve the stage's version, fetch it on a cache miss and hot-swap it in."""
+        if self._fetching:
+            return
+        self._fetching = True
+
+        def run():
+            version = None
+            try:
+                version = resolve_version(MLFLOW_MODEL_NAME, MODEL_STAGE)
+                if version == serving:
+                    return
+                path = cache.lookup(MLFLOW_MODEL_NAME, version)
+                if path is not None:
+                    print(f"[model-cache] hit {MLFLOW_MODEL_NAME} v{version}")
+                else:
+                    print(f"[model-cache] miss {MLFLOW_MODEL_NAME} v{version}, downloading")
+                    t0 = time.perf_counter()
+                    path = cache.fetch(MLFLOW_MODEL_NAME, version)
+                    ms = (time.perf_counter() - t0) * 1000.0
+                    print(f"[model-cache] downloaded v{version} in {ms:.1f} ms")
+                self._activate_pyfunc(path, version)
+            except Exception as e:
+                what = f"v{version}" if version else f"the {MODEL_STAGE} version"
+                print(f"[model-cache] background sync of {what} failed: {e}")
+            finally:
+                self._fetching = False
+
+        threading.Thread(target=run, name="model-cache-sync", daemon=True).start()
+
     def _load_testing_stub(self):
         """Tiny in-memory TF-IDF + LogisticRegression for TESTING=1."""
         from sklearn.feature_extraction.text import TfidfVectorizer
@@ -174,7 +433,7 @@ class ModelWrapper:
         X = vec.fit_transform(texts)
         clf = LogisticRegression(max_iter=200).fit(X, labels)
 
-        self.model = ("local", vec, clf)  # reuse local tuple handler
+        self._set_fallback(("local", vec, clf), "testing-stub")  # reuse local tuple handler
 
 
 model = ModelWrapper()
@@ -189,10 +448,25 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(
+    MaxBodySizeMiddleware, max_bytes=MAX_REQUEST_BYTES, exempt_paths=("/predict/stream",),
+    path_limits={"/predict/batch": MAX_BATCH_BYTES},
+)
+admission = AdmissionController(MAX_INFLIGHT, MAX_QUEUE, QUEUE_BUDGET_MS, ADMISSION_PATHS)
+app.add_middleware(AdmissionMiddleware, controller=admission)  # before the body is read
+inflight = SingleFlight(COALESCE_PREDICTIONS)
+slow_traces = SlowTraceBuffer(SLOW_REQUEST_MS, TRACE_BUFFER_SIZE)
+app.add_middleware(TracingMiddleware, buffer=slow_traces, enabled=TRACING_ENABLED)  # outermost
 
 
 class PredictIn(BaseModel):
     text: str
+    explain: int = Field(0, ge=0, le=MAX_EXPLAIN_K)  # top-k n-grams, 0 = off
+
+
+class Contribution(BaseModel):
+    ngram: str
+    contribution: float  # tfidf x coef, in logit units (> 0 pushes towards toxic)
 
 
 class PredictOut(BaseModel):
@@ -200,6 +474,24 @@ class PredictOut(BaseModel):
     label: str
     probability: float
     model_version: str
+    truncated: bool = False
+    scores: Optional[Dict[str, float]] = None  # per-label, multi-label models only
+    explanation: Optional[List[Contribution]] = None  # with explain > 0, linear models
+
+
+class BatchIn(BaseModel):
+    texts: List[str]
+    explain: int = Field(0, ge=0, le=MAX_EXPLAIN_K)
+
+
+class BatchOut(BaseModel):
+    """Column-oriented like the Arrow response; nulls where the text was empty."""
+    probability: List[Optional[float]]
+    label: List[Optional[str]]
+    truncated: List[bool]
+    model_version: str
+    scores: Optional[Dict[str, List[Optional[float]]]] = None
+    explanation: Optional[List[Optional[List[Contribution]]]] = None
 
 
 class FeedbackIn(BaseModel):
@@ -212,6 +504,8 @@ def _startup():
     # Best-effort eager load (tests will also lazy-load)
     try:
         model.load()
+        ms = model.warm_up()
+        print(f"[startup] model warm-up: {WARMUP_PREDICTIONS} predictions in {ms:.1f} ms")
     except Exception as e:
         print(f"[startup] model load deferred: {e}")
     # Ensure DB schema
@@ -227,10 +521,10 @@ def health():
         print(f"[health] lazy load failed: {e}")
 
     db_ok = False
-    eng = get_engine()
+    eng = get_read_engine()
     if eng is not None:
         try:
-            with eng.connect() as conn:
+            with span("db.ping"), eng.connect() as conn:
                 conn.execute(text("SELECT 1"))
             db_ok = True
         except Exception:
@@ -244,17 +538,195 @@ def health():
     }
 
 
+def _prepare(text_in: str) -> Tuple[List[str], bool]:
+    """Bound the vectorizer's work first, then apply the training normalization."""
+    pieces, truncated = window_text(
+        text_in, MAX_TEXT_CHARS, TRUNCATION_STRATEGY, TRUNCATION_WINDOWS
+    )
+    return [p for p in map(normalize_text, pieces) if p], truncated
+
+
+Scores = Optional[Dict[str, float]]
+
+
+def _reduce(probs, rows, heads, start: int, stop: int) -> Tuple[float, Scores]:
+    """max() over a comment's truncation windows, per label."""
+    prob = max(probs[start:stop])
+    if rows is None:
+        return prob, None
+    window = rows[start:stop]
+    return prob, {h: max(r[j] for r in window) for j, h in enumerate(heads)}
+
+
+def score_texts(texts: List[str]) -> List[Optional[Tuple[float, bool, Scores]]]:
+    """
+    Score many comments with a single predict_scores_batch call.
+
+    Returns (probability, truncated, scores) per input, or None for inputs
+    that are empty after normalization; ``scores`` maps label -> probability
+    for multi-label models and is None otherwise. Truncation windows are
+    flattened into the same batch and reduced with max() per comment.
+    """
+    model.ensure_loaded()
+    flat: List[str] = []
+    spans_: List[Optional[Tuple[int, int, bool]]] = []
+    for t in texts:
+        pieces, truncated = _prepare((t or "").strip())
+        if pieces:
+            spans_.append((len(flat), len(flat) + len(pieces), truncated))
+            flat.extend(pieces)
+        else:
+            spans_.append(None)
+    probs, rows, heads = model.predict_scores_batch(flat) if flat else ([], None, None)
+    out: List[Optional[Tuple[float, bool, Scores]]] = []
+    for sp in spans_:
+        if sp is None:
+            out.append(None)
+            continue
+        prob, scores = _reduce(probs, rows, heads, sp[0], sp[1])
+        out.append((prob, sp[2], scores))
+    return out
+
+
+def score_arrays(texts: List[Optional[str]], explain: int = 0) -> Tuple[
+    np.ndarray, np.ndarray, Optional[np.ndarray], Optional[Tuple[str, ...]],
+    Optional[List[Optional[Explanation]]],
+]:
+    """
+    Columnar score_texts for /predict/batch.
+
+    Returns float32 probabilities (NaN where the text is empty after
+    normalization), truncated flags, float32 (n, n_labels) per-label scores
+    and their names (both None for single-label models), and with
+    ``explain`` > 0 the top contributing n-grams of each comment's
+    highest-scoring window. Truncation windows are reduced with
+    np.maximum.reduceat instead of per-comment Python loops.
+    """
+    model.ensure_loaded()
+    n = len(texts)
+    flat: List[str] = []
+    starts: List[int] = []
+    owners: List[int] = []
+    truncated = np.zeros(n, dtype=bool)
+    for i, t in enumerate(texts):
+        pieces, truncated[i] = _prepare((t or "").strip())
+        if pieces:
+            starts.append(len(flat))
+            owners.append(i)
+            flat.extend(pieces)
+
+    probs = np.full(n, np.nan, dtype=np.float32)
+    if not flat:
+        return probs, truncated, None, None, ([None] * n if explain else None)
+    if explain:
+        p, rows, heads, expl = model.predict_explained(flat, explain)
+    else:
+        (p, rows, heads), expl = model.predict_arrays(flat), None
+    probs[owners] = np.maximum.reduceat(p, starts)
+    scores = None
+    if rows is not None:
+        scores = np.full((n, rows.shape[1]), np.nan, dtype=np.float32)
+        scores[owners] = np.maximum.reduceat(rows, starts, axis=0)
+    explanations = None
+    if expl is not None:
+        explanations = [None] * n
+        for i, lo, hi in zip(owners, starts, starts[1:] + [len(flat)]):
+            explanations[i] = expl[lo + int(np.argmax(p[lo:hi]))]
+    return probs, truncated, scores, heads, explanations
+
+
+def _log_arrays(texts, probs: np.ndarray, scores: Optional[np.ndarray], heads,
+                latency_ms: float):
+    """log_predictions for score_arrays output (runs after the response is sent)."""
+    rows = []
+    for i in np.flatnonzero(~np.isnan(probs)):
+        p = float(probs[i])
+        s = dict(zip(heads, scores[i].tolist())) if scores is not None else None
+        rows.append((texts[i], LABEL_NAMES[p >= 0.5], p, s))
+    log_predictions(rows, latency_ms)
+
+
+def _contributions(expl: Optional[Explanation]) -> Optional[List[Contribution]]:
+    if expl is None:
+        return None
+    return [Contribution(ngram=g, contribution=c) for g, c in expl]
+
+
+def _packed(scores: Scores) -> Optional[bytes]:
+    """Per-label scores as label_scores BYTEA (LABELS order), or None."""
+    if not scores:
+        return None
+    from .multilabel import LABELS, pack_scores
+
+    return pack_scores([scores.get(lbl, 0.0) for lbl in LABELS])
+
+
+def log_predictions(rows: List[tuple], latency_ms: float):
+    """
+    Bulk-insert (input_text, label, probability[, scores]) rows; best effort.
+    ``latency_ms`` is the model time per row (the batch's time / its size), so
+    bulk rows weigh into the dashboard latency like /predict rows.
+    """
+    eng = get_engine()
+    if eng is None or not rows:
+        return
+    try:
+        with span("db.insert_many"), eng.begin() as conn:
+            conn.execute(
+                text(
+                    """
+                    INSERT INTO predictions
+                      (input_text, predicted_label, probability, latency_ms, model_version,
+                       label_scores)
+                    VALUES (:t, :l, :p, :ms, :mv, :ls)
+                    """
+                ),
+                [
+                    {"t": r[0], "l": r[1], "p": r[2], "ms": latency_ms, "mv": model.model_version,
+                     "ls": _packed(r[3] if len(r) > 3 else None)}
+                    for r in rows
+                ],
+            )
+    except Exception as e:
+        print(f"[warn] trace={current_trace_id()} DB bulk insert failed: {e}")
+
+
+def _score_pieces(pieces: List[str], explain: int = 0):
+    """(probability, scores, explanation) of one comment's truncation windows."""
+    if not explain:
+        prob, scores = _reduce(*model.predict_scores_batch(pieces), 0, len(pieces))
+        return prob, scores, None
+    # Same TF-IDF rows as scoring; explain the window that decided the max
+    probs, rows, heads, expl = model.predict_explained(pieces, explain)
+    prob, scores = _reduce(probs.tolist(), None if rows is None else rows.tolist(),
+                           heads, 0, len(pieces))
+    return prob, scores, _contributions(expl[int(np.argmax(probs))])
+
+
 @app.post("/predict", response_model=PredictOut)
-def predict(payload: PredictIn):
+def predict(payload: PredictIn, request: Request):
+    mark_since_start("request.parse")  # body read + JSON/pydantic validation
     text_in = (payload.text or "").strip()
-    if not text_in:
+    with span("normalize"):
+        pieces, truncated = _prepare(text_in)
+    if not pieces:
         raise HTTPException(status_code=400, detail="text is required")
 
     # NEW: lazy-load before first prediction
-    model.ensure_loaded()
+    with span("model.ensure_loaded"):
+        model.ensure_loaded()
 
     t0 = time.perf_counter()
-    prob = model.predict_proba(text_in)
+    # Duplicates arriving while the same text is being scored wait for that
+    # result instead of calling the model again (each still gets its own row),
+    # and give their admission slot to the next queued request meanwhile
+    key = (model.model_version, payload.explain, *pieces)
+    slot = request.scope.get("state", {}).get(SLOT_KEY)
+    with span("model.singleflight"):
+        (prob, scores, explanation), _ = inflight.do(
+            key, lambda: _score_pieces(pieces, payload.explain),
+            on_wait=slot.release_threadsafe if slot is not None else None,
+        )
     latency_ms = (time.perf_counter() - t0) * 1000.0
 
     label = "toxic" if prob >= 0.5 else "non-toxic"
@@ -264,34 +736,108 @@ def predict(payload: PredictIn):
     eng = get_engine()
     if eng is not None:
         try:
-            with eng.begin() as conn:
+            with span("db.insert"), eng.begin() as conn:
                 res = conn.execute(
                     text(
                         """
                         INSERT INTO predictions
-                          (input_text, predicted_label, probability, latency_ms, model_version)
+                          (input_text, predicted_label, probability, latency_ms, model_version,
+                           label_scores)
                         VALUES
-                          (:t, :l, :p, :ms, :mv)
+                          (:t, :l, :p, :ms, :mv, :ls)
                         RETURNING id
                         """
                     ),
-                    {"t": text_in, "l": label, "p": prob, "ms": latency_ms, "mv": model.model_version},
+                    {
+                        "t": text_in, "l": label, "p": prob, "ms": latency_ms,
+                        "mv": model.model_version, "ls": _packed(scores),
+                    },
                 )
                 new_id = res.scalar_one()
         except Exception as e:
             # Don't fail the prediction if DB write fails
-            print(f"[warn] DB insert failed: {e}")
+            print(f"[warn] trace={current_trace_id()} DB insert failed: {e}")
 
     return PredictOut(
         id=new_id,
         label=label,
         probability=prob,
         model_version=model.model_version,
+        truncated=truncated,
+        scores=scores,
+        explanation=explanation,
     )
 
 
+@app.post("/predict/batch", response_model=BatchOut)
+async def predict_batch(request: Request):
+    """
+    Score many comments in one request.
+
+    ``application/json``: ``{"texts": [...]}`` -> BatchOut.
+    ``application/vnd.apache.arrow.stream``: Arrow IPC in and out (see batch.py),
+    no per-item JSON or pydantic work.
+
+    Only the body is read on the event loop; decoding, scoring and encoding a
+    multi-MB batch all run in the threadpool.
+    """
+    body = await request.body()
+    return await run_in_threadpool(
+        _batch_response, body, request.headers.get("content-type"),
+        request.query_params.get("explain", "0"),
+    )
+
+
+def _batch_response(body: bytes, content_type: Optional[str], explain_param: str) -> Response:
+    arrow = is_arrow(content_type)
+    try:
+        if arrow:
+            with span("batch.decode"):
+                texts = decode_texts(body)
+            explain = int(explain_param)
+            if not 0 <= explain <= MAX_EXPLAIN_K:
+                raise ValueError(f"explain must be between 0 and {MAX_EXPLAIN_K}")
+        else:
+            parsed = BatchIn.model_validate_json(body)
+            texts, explain = parsed.texts, parsed.explain
+    except ImportError:
+        raise HTTPException(status_code=415, detail="Arrow batches need pyarrow installed")
+    except (ValueError, ValidationError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    mark_since_start("request.parse")
+    if len(texts) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=413, detail=f"batch exceeds {MAX_BATCH_ITEMS} items")
+
+    t0 = time.perf_counter()
+    probs, truncated, scores, heads, expl = score_arrays(texts, explain)
+    per_item_ms = (time.perf_counter() - t0) * 1000.0 / max(1, len(texts))
+    mv = model.model_version
+    log = BackgroundTask(_log_arrays, texts, probs, scores, heads, per_item_ms)
+    if arrow:
+        with span("batch.encode"):
+            out = encode_results(probs, truncated, scores, heads, mv, expl)
+        return Response(out, media_type=ARROW_STREAM, headers={"x-model-version": mv},
+                        background=log)
+
+    valid = (~np.isnan(probs)).tolist()
+    plist = probs.tolist()
+    out = BatchOut(
+        probability=[p if ok else None for p, ok in zip(plist, valid)],
+        label=[LABEL_NAMES[p >= 0.5] if ok else None for p, ok in zip(plist, valid)],
+        truncated=truncated.tolist(),
+        model_version=mv,
+        scores=None if scores is None else {
+            h: [v if ok else None for v, ok in zip(scores[:, j].tolist(), valid)]
+            for j, h in enumerate(heads)
+        },
+        explanation=None if expl is None else [_contributions(e) for e in expl],
+    )
+    return Response(out.model_dump_json(), media_type="application/json", background=log)
+
+
 @app.post("/feedback")
 def feedback(payload: FeedbackIn):
+    mark_since_start("request.parse")
     if TESTING:
         return {"ok": True, "testing": True}
 
@@ -300,9 +846,9 @@ def feedback(payload: FeedbackIn):
         raise HTTPException(status_code=503, detail="database not configured")
 
     try:
-        with eng.begin() as conn:
+        with span("db.update"), eng.begin() as conn:
             n = conn.execute(
-                text("UPDATE predictions SET feedback=:fb WHERE id=:id"),
+                text("UPDATE predictions SET feedback=:fb, feedback_at=NOW() WHERE id=:id"),
                 {"fb": bool(payload.correct), "id": int(payload.id)},
             ).rowcount
         if n == 0:
@@ -311,4 +857,50 @@ def feedback(payload: FeedbackIn):
     except HTTPException:
         raise
     except Exception as e:
+        print(f"[warn] trace={current_trace_id()} feedback update failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/reload")
+def reload_model(authorization: Optional[str] = Header(None)):
+    """Hot-swap the model after ml/train.py or ml/incremental.py published a new one."""
+    if not RELOAD_TOKEN:
+        raise HTTPException(status_code=403, detail="reload disabled (RELOAD_TOKEN not set)")
+    if not hmac.compare_digest((authorization or "").encode(), f"Bearer {RELOAD_TOKEN}".encode()):
+        raise HTTPException(status_code=401, detail="invalid reload token")
+    try:
+        model.reload()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"reload failed: {e}")
+    return {"ok": True, "model_source": model.source, "model_version": model.model_version}
+
+
+@app.get("/metrics")
+def metrics():
+    """Process-local counters (admission / load shedding, read routing, coalescing)."""
+    return {"admission": admission.stats(), "db": db.stats(), "coalescing": inflight.stats()}
+
+
+@app.get("/debug/slow-requests")
+def debug_slow_requests(limit: int = 50):
+    """Span breakdowns of the most recent requests slower than SLOW_REQUEST_MS."""
+    return {
+        "threshold_ms": slow_traces.threshold_ms,
+        "traces": slow_traces.snapshot(limit),
+    }
+
+
+# Raw ASGI endpoint: reads the chunked body and writes results incrementally
+# with back-pressure (see streaming.py)
+app.add_route(
+    "/predict/stream",
+    NdjsonScorer(
+        score_batch=score_texts,
+        log_batch=log_predictions,
+        model_version=lambda: model.model_version,
+        batch_size=STREAM_BATCH_SIZE,
+        max_line_bytes=MAX_REQUEST_BYTES,
+        admission=admission,  # one slot per scored batch, not per stream
+    ),
+    methods=["POST"],
+)
@@ -0,0 +1,162 @@
+# api/app/model_cache.py
+"""
+Local, content-addressed mirror of MLflow registry model versions.
+
+Layout under the cache root::
+
+    <root>/<model-name>/v<version>-<sha256[:16]>/
+        manifest.json      {"version", "sha256", "bytes", "created"}
+        model/             the downloaded pyfunc model directory
+
+A cached version is only used if the sha256 of its files still matches the
+manifest; corrupted entries are deleted and treated as a miss. After every
+successful fetch the cache is trimmed to ``max_versions`` entries and
+``max_bytes`` total (least recently used first; the entry just used is kept).
+
+mlflow is imported inside the functions that talk to the registry so that
+importing this module stays cheap.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+
+def resolve_version(name: str, stage: str) -> str:
+    """Ask the registry which version currently sits in ``stage``."""
+    from mlflow import MlflowClient
+
+    client = MlflowClient()
+    versions = client.get_latest_versions(name, stages=[stage])
+    if not versions:
+        raise LookupError(f"no '{name}' version in stage {stage}")
+    return str(versions[0].version)
+
+
+def dir_checksum(path: Path) -> Tuple[str, int]:
+    """sha256 over (relative path, bytes) of every file; returns (hex, total bytes)."""
+    h = hashlib.sha256()
+    total = 0
+    for f in sorted(p for p in path.rglob("*") if p.is_file()):
+        h.update(f.relative_to(path).as_posix().encode("utf-8"))
+        h.update(b"\0")
+        with open(f, "rb") as fh:
+            for chunk in iter(lambda: fh.read(1 << 20), b""):
+                h.update(chunk)
+                total += len(chunk)
+    return h.hexdigest(), total
+
+
+class ModelArtifactCache:
+    def __init__(self, root, max_versions: int = 3, max_bytes: int = 0):
+        self.root = Path(root)
+        self.max_versions = int(max_versions)
+        self.max_bytes = int(max_bytes)  # 0 = no size limit
+
+    # ---- lookup ----
+    def _entries(self, name: str) -> List[Path]:
+        d = self.root / name
+        if not d.is_dir():
+            return []
+        return [
+            p for p in d.iterdir()
+            if p.is_dir() and not p.name.startswith(".") and (p / "manifest.json").exists()
+        ]
+
+    def _verify(self, entry: Path) -> Optional[dict]:
+        try:
+            manifest = json.loads((entry / "manifest.json").read_text(encoding="utf-8"))
+            sha, _ = dir_checksum(entry / "model")
+        except Exception:
+            manifest, sha = None, None
+        if manifest is None or sha != manifest.get("sha256"):
+            print(f"[model-cache] integrity check failed, dropping {entry.name}")
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+        os.utime(entry)  # mark as recently used for eviction
+        return manifest
+
+    def lookup(self, name: str, version: str) -> Optional[Path]:
+        """Verified local model dir for ``version``, or None on a miss."""
+        for entry in self._entries(name):
+            if entry.name.startswith(f"v{version}-") and self._verify(entry):
+                return entry / "model"
+        return None
+
+    def latest(self, name: str) -> Optional[Tuple[str, Path]]:
+        """Highest cached version that still verifies (offline / stale fallback)."""
+        def vnum(p: Path) -> int:
+            try:
+                return int(p.name[1:].split("-", 1)[0])
+            except ValueError:
+                return -1
+
+        for entry in sorted(self._entries(name), key=vnum, reverse=True):
+            manifest = self._verify(entry)
+            if manifest:
+                return str(manifest["version"]), entry / "model"
+        return None
+
+    # ---- fill ----
+    def fetch(self, name: str, version: str) -> Path:
+        """Download ``models:/<name>/<version>`` into the cache; returns the model dir."""
+        import mlflow.artifacts
+
+        (self.root / name).mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(prefix=f".v{version}-", dir=self.root / name))
+        try:
+            mlflow.artifacts.download_artifacts(
+                artifact_uri=f"models:/{name}/{version}", dst_path=str(tmp / "model")
+            )
+            sha, size = dir_checksum(tmp / "model")
+            (tmp / "manifest.json").write_text(
+                json.dumps(
+                    {"version": version, "sha256": sha, "bytes": size, "created": time.time()}
+                ),
+                encoding="utf-8",
+            )
+            final = self.root / name / f"v{version}-{sha[:16]}"
+            if final.exists():
+                shutil.rmtree(tmp, ignore_errors=True)
+            else:
+                os.replace(tmp, final)
+        except Exception:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        self.evict(name, keep=final)
+        return final / "model"
+
+    # ---- eviction ----
+    def evict(self, name: str, keep: Optional[Path] = None) -> List[str]:
+        """Drop least-recently-used entries beyond max_versions / max_bytes."""
+        entries = sorted(self._entries(name), key=lambda p: p.stat().st_mtime, reverse=True)
+        if keep is not None and keep in entries:
+            entries.remove(keep)
+            entries.insert(0, keep)
+
+        def size(p: Path) -> int:
+            try:
+                return int(json.loads((p / "manifest.json").read_text())["bytes"])
+            except Exception:
+                return 0
+
+        kept, total, dropped = 0, 0, []
+        for entry in entries:
+            n = size(entry)
+            over_count = self.max_versions > 0 and kept >= self.max_versions
+            over_size = self.max_bytes > 0 and kept > 0 and total + n > self.max_bytes
+            if over_count or over_size:
+                shutil.rmtree(entry, ignore_errors=True)
+                dropped.append(entry.name)
+            else:
+                kept += 1
+                total += n
+        if dropped:
+            print(f"[model-cache] evicted {', '.join(dropped)}")
+        return dropped
@@ -0,0 +1,97 @@
+# api/app/multilabel.py
+"""
+Multi-label toxicity heads over one shared TF-IDF feature space.
+
+MultiLabelLinear holds the per-label logistic regression heads stacked into a
+single (n_features, n_labels) float32 matrix ``W``, so scoring a batch of
+comments is one tokenization (the shared vectorizer) and one sparse x dense
+product ``X @ W + b`` followed by a sigmoid, instead of one model per label.
+``W`` is row-major: every non-zero in X reads one contiguous row of
+n_labels weights.
+
+It quacks enough like a fitted sklearn classifier (``coef_``,
+``intercept_``, ``n_features_in_``, ``predict_proba``, ``predict``) for
+ml/compress.py and ml/benchmark.py to handle it unchanged, except that
+``predict_proba`` returns one column per label rather than [P(0), P(1)].
+
+Per-comment scores are stored in the DB as ``label_scores`` BYTEA: one byte
+per label in LABELS order, probability quantized to 1/255.
+"""
+from typing import Dict, Iterable, Optional, Sequence
+
+import numpy as np
+
+LABELS = ("toxic", "severe_toxic", "obscene", "threat", "insult", "identity_hate")
+
+
+class MultiLabelLinear:
+    def __init__(self, labels: Sequence[str], W: np.ndarray, b: np.ndarray):
+        self.labels = tuple(labels)
+        self.W = np.ascontiguousarray(W, dtype=np.float32)
+        self.b = np.asarray(b, dtype=np.float32).reshape(-1)
+        if self.W.shape[1] != len(self.labels) or self.b.shape[0] != len(self.labels):
+            raise ValueError("W must be (n_features, n_labels) and b (n_labels,)")
+
+    @classmethod
+    def from_estimators(cls, labels: Sequence[str], estimators: Iterable) -> "MultiLabelLinear":
+        """Stack fitted binary linear models (coef_ (1, F), intercept_ (1,))."""
+        ests = list(estimators)
+        W = np.vstack([np.asarray(e.coef_).reshape(1, -1) for e in ests]).T
+        b = np.array([float(np.ravel(e.intercept_)[0]) for e in ests])
+        return cls(labels, W, b)
+
+    # sklearn-style attributes, (n_labels, n_features) like a multi-output coef_
+    @property
+    def coef_(self) -> np.ndarray:
+        return self.W.T
+
+    @coef_.setter
+    def coef_(self, value):
+        self.W = np.ascontiguousarray(np.asarray(value).T, dtype=np.float32)
+
+    @property
+    def intercept_(self) -> np.ndarray:
+        return self.b
+
+    @intercept_.setter
+    def intercept_(self, value):
+        self.b = np.asarray(value, dtype=np.float32).reshape(-1)
+
+    @property
+    def n_features_in_(self) -> int:
+        return self.W.shape[0]
+
+    @n_features_in_.setter
+    def n_features_in_(self, value):
+        pass  # derived from W
+
+    def decision_function(self, X) -> np.ndarray:
+        if X.shape[1] != self.W.shape[0]:
+            raise ValueError(f"X has {X.shape[1]} features, expected {self.W.shape[0]}")
+        Z = np.asarray(X @ self.W)
+        Z += self.b
+        return Z
+
+    def predict_proba(self, X) -> np.ndarray:
+        """(n_samples, n_labels) independent per-label probabilities."""
+        Z = self.decision_function(X)
+        np.negative(Z, out=Z)
+        np.exp(Z, out=Z)
+        Z += 1.0
+        np.reciprocal(Z, out=Z)
+        return Z
+
+    def predict(self, X, threshold: float = 0.5) -> np.ndarray:
+        return (self.predict_proba(X) >= threshold).astype(np.int8)
+
+
+def pack_scores(probs: Sequence[float]) -> bytes:
+    """One byte per label, probability quantized to 1/255."""
+    return bytes(min(255, max(0, int(round(float(p) * 255.0)))) for p in probs)
+
+
+def unpack_scores(blob: Optional[bytes],
+                  labels: Sequence[str] = LABELS) -> Optional[Dict[str, float]]:
+    if blob is None:
+        return None
+    return {lbl: round(v / 255.0, 4) for lbl, v in zip(labels, bytes(blob))}
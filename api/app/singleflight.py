@@ -0,0 +1,81 @@
+# api/app/singleflight.py
+"""
+In-flight request coalescing ("single flight") for identical predictions.
+
+During raids hundreds of copies of the same comment arrive within a few
+milliseconds. A result cache doesn't help there: they all miss together
+because none has finished yet. SingleFlight.do(key, fn) runs ``fn`` once per
+key at a time; callers that arrive with the same key while it is running
+block on the leader's Future and get the same result (or exception).
+Nothing is kept after the leader finishes, so this is not a cache and never
+serves a stale result.
+
+/predict keys on the normalized text windows plus the model version (and the
+explain setting), so a hot-swapped model never answers with the old one's
+result. Each caller still writes its own prediction row. The handlers run in
+Starlette's threadpool, hence threading primitives rather than asyncio.
+Waiters hand their admission slot back (``on_wait``), so MAX_INFLIGHT bounds
+model calls rather than duplicates and a raid doesn't fill the queue.
+
+Counters (``stats()``, served under /metrics): ``leaders`` computed (every
+call when disabled), ``coalesced`` shared a leader's result, ``errors``
+leader failures (every waiter of that flight re-raises the same exception),
+``inflight`` keys currently being computed.
+"""
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    def __init__(self, enabled: bool = True):
+        self.enabled = bool(enabled)
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.counters = {"leaders": 0, "coalesced": 0, "errors": 0}
+
+    def do(
+        self, key: Hashable, fn: Callable[[], T], on_wait: Optional[Callable[[], None]] = None
+    ) -> Tuple[T, bool]:
+        """
+        Return ``(fn(), shared)``; ``shared`` is True for coalesced callers.
+        ``on_wait`` runs just before a coalesced caller blocks on the leader.
+        """
+        if not self.enabled:
+            with self._lock:
+                self.counters["leaders"] += 1  # still counts model calls
+            return fn(), False
+        with self._lock:
+            fut = self._inflight.get(key)
+            leader = fut is None
+            if leader:
+                fut = self._inflight[key] = Future()
+                self.counters["leaders"] += 1
+            else:
+                self.counters["coalesced"] += 1
+        if not leader:
+            if on_wait is not None:
+                on_wait()
+            return fut.result(), True
+
+        try:
+            res = fn()
+        except BaseException as e:
+            with self._lock:
+                self.counters["errors"] += 1
+            fut.set_exception(e)
+            raise
+        else:
+            fut.set_result(res)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        return res, False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self.counters, "enabled": self.enabled, "inflight": len(self._inflight)}
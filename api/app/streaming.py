@@ -0,0 +1,155 @@
+# api/app/streaming.py
+"""
+Streaming NDJSON scoring as a raw ASGI endpoint.
+
+Request body: one JSON value per line, either ``"some text"`` or
+``{"text": "...", "key": <anything>}``. Response: one JSON object per input
+line, in order::
+
+    {"i": 0, "key": ..., "label": "toxic", "probability": 0.93, "truncated": false}
+    {"i": 1, "error": "..."}
+
+Multi-label models add ``"scores": {"toxic": ..., "obscene": ..., ...}``.
+
+Every line that arrived in the same body chunk is scored in one vectorized
+batch (split at ``batch_size``), so a fast bulk client gets full batches
+while a slow trickle is still answered promptly.
+
+Flow control: the next body chunk is only read after the previous batch's
+results were handed to ``send()``, which blocks while the client isn't
+reading (uvicorn drains its transport). A slow reader therefore stalls
+intake instead of growing buffers; memory is bounded by one chunk, one
+batch and ``max_line_bytes`` of partial line.
+
+With an ``admission`` controller each batch is scored inside one of its
+slots, so streams share MAX_INFLIGHT with /predict and /predict/batch; a
+busy server slows the stream down rather than failing lines.
+
+This is a plain ASGI app rather than a StreamingResponse because the latter
+reads ``receive()`` concurrently to watch for disconnects, which would steal
+request-body chunks from the generator.
+"""
+from __future__ import annotations
+
+import json
+import time
+from typing import Callable, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.types import Receive, Scope, Send
+
+from .admission import AdmissionController
+from .tracing import untraced
+
+ScoreFn = Callable[[List[str]], List[Optional[tuple]]]  # (prob, truncated[, scores])
+LogFn = Callable[[List[tuple], float], None]  # (text, label, prob[, scores]) rows, ms/item
+
+
+def _parse_line(raw: bytes):
+    """Return (text, key) or raise ValueError."""
+    obj = json.loads(raw)
+    if isinstance(obj, str):
+        return obj, None
+    if isinstance(obj, dict) and isinstance(obj.get("text"), str):
+        return obj["text"], obj.get("key")
+    raise ValueError("expected a JSON string or an object with a 'text' string")
+
+
+class NdjsonScorer:
+    def __init__(
+        self,
+        score_batch: ScoreFn,
+        log_batch: Optional[LogFn] = None,
+        model_version: Callable[[], str] = lambda: "",
+        batch_size: int = 256,
+        max_line_bytes: int = 256 * 1024,
+        admission: Optional[AdmissionController] = None,
+    ):
+        self.score_batch = score_batch
+        self.log_batch = log_batch
+        self.model_version = model_version
+        self.batch_size = int(batch_size)
+        self.max_line_bytes = int(max_line_bytes)
+        self.admission = admission
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        # One trace for a multi-million-line stream would grow without bound
+        with untraced():
+            await self._run(scope, receive, send)
+
+    async def _run(self, scope: Scope, receive: Receive, send: Send):
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"application/x-ndjson"),
+                (b"x-model-version", self.model_version().encode("latin-1", "replace")),
+            ],
+        })
+        partial = b""
+        index = 0
+        more = True
+        while more:
+            msg = await receive()
+            if msg["type"] == "http.disconnect":
+                return
+            more = msg.get("more_body", False)
+            lines = (partial + msg.get("body", b"")).split(b"\n")
+            partial = b"" if not more else lines.pop()
+            if len(partial) > self.max_line_bytes:
+                await self._send_lines(send, [{"i": index, "error": "line too long"}], False)
+                return
+            lines = [ln for ln in lines if ln.strip()]
+            for start in range(0, len(lines), self.batch_size):
+                out = await self._score(lines[start:start + self.batch_size], index)
+                index += len(out)
+                await self._send_lines(send, out, True)
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    async def _score(self, raw_lines: List[bytes], first_index: int) -> List[dict]:
+        out: List[dict] = []
+        texts, slots = [], []
+        for j, raw in enumerate(raw_lines):
+            try:
+                text, key = _parse_line(raw)
+            except ValueError as e:
+                out.append({"i": first_index + j, "error": str(e)})
+                continue
+            out.append({"i": first_index + j, "key": key})
+            texts.append(text)
+            slots.append(len(out) - 1)
+
+        if texts:
+            if self.admission is not None:
+                async with self.admission.batch_slot():
+                    results, ms = await self._timed_score(texts)
+            else:
+                results, ms = await self._timed_score(texts)
+            logged = []
+            for slot, text, res in zip(slots, texts, results):
+                row = out[slot]
+                if res is None:
+                    row["error"] = "text is required"
+                    continue
+                prob, truncated = res[0], res[1]
+                scores = res[2] if len(res) > 2 else None
+                row["label"] = "toxic" if prob >= 0.5 else "non-toxic"
+                row["probability"] = prob
+                row["truncated"] = truncated
+                if scores:
+                    row["scores"] = scores
+                logged.append((text, row["label"], prob, scores))
+            if self.log_batch is not None and logged:
+                await run_in_threadpool(self.log_batch, logged, ms / len(texts))
+        return out
+
+    async def _timed_score(self, texts: List[str]):
+        """(results, ms) of one score_batch call; the slot wait is not counted."""
+        t0 = time.perf_counter()
+        results = await run_in_threadpool(self.score_batch, texts)
+        return results, (time.perf_counter() - t0) * 1000.0
+
+    @staticmethod
+    async def _send_lines(send: Send, rows: List[dict], more: bool):
+        body = "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in rows)
+        await send({"type": "http.response.body", "body": body.encode("utf-8"), "more_body": more})
@@ -0,0 +1,82 @@
+# api/app/textnorm.py
+"""
+Shared text normalization for training and serving.
+
+Trivially different variants of a comment (case, whitespace runs, zero-width
+characters, repeated punctuation, look-alike unicode letters) are folded to one
+canonical string, and a 64-bit hash of that string is returned alongside it so
+caches and dedup can key on an int instead of the full text.
+
+Used by ml/preprocess.py, ml/train.py and api/app/main.py — keep it dependency
+free so the API image (which only ships api/) and training share one copy.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+import unicodedata
+from typing import Iterable, List, Tuple
+
+# Zero-width / invisible formatting characters that are dropped entirely.
+_ZERO_WIDTH = "\u200b\u200c\u200d\u2060\ufeff\u00ad\u180e"
+
+# Common Cyrillic/Greek look-alikes that NFKC leaves alone (lowercase only,
+# the text is casefolded first).
+_CONFUSABLES = {
+    "а": "a", "в": "b", "е": "e", "к": "k", "м": "m", "н": "h", "о": "o",
+    "р": "p", "с": "c", "т": "t", "у": "y", "х": "x", "і": "i", "ј": "j",
+    "ѕ": "s", "ԁ": "d", "ɡ": "g",
+    "α": "a", "ε": "e", "ι": "i", "κ": "k", "ν": "v", "ο": "o", "ρ": "p",
+    "τ": "t", "υ": "u", "χ": "x",
+}
+
+_TRANSLATE = {ord(c): None for c in _ZERO_WIDTH}
+_TRANSLATE.update({ord(k): v for k, v in _CONFUSABLES.items()})
+
+# 3+ of the same punctuation char -> 2 ("!!!!!" -> "!!", "...." -> "..")
+_PUNCT_RUN_RE = re.compile(r"([^\w\s])\1{2,}")
+
+
+def _keep_two(m: re.Match) -> str:
+    return m.group(1) * 2
+
+
+def text_hash(norm: str) -> int:
+    """Stable unsigned 64-bit hash of an already-normalized string."""
+    return int.from_bytes(
+        hashlib.blake2b(norm.encode("utf-8"), digest_size=8).digest(), "little"
+    )
+
+
+def normalize_text(text: str) -> str:
+    """Return the canonical form of ``text`` (no hash)."""
+    s = str(text)
+    if not s.isascii():
+        s = unicodedata.normalize("NFKC", s).casefold().translate(_TRANSLATE)
+    else:
+        s = s.lower()
+    s = " ".join(s.split())
+    # search() is ~4x cheaper than sub(); most comments have no runs at all
+    if _PUNCT_RUN_RE.search(s):
+        s = _PUNCT_RUN_RE.sub(_keep_two, s)
+    return s
+
+
+def normalize(text: str) -> Tuple[str, int]:
+    """Return ``(normalized_text, hash64)`` for a single comment."""
+    s = normalize_text(text)
+    return s, text_hash(s)
+
+
+def normalize_batch(texts: Iterable[str]) -> Tuple[List[str], List[int]]:
+    """
+    Normalize many comments at once.
+
+    Returns two parallel lists (normalized texts, 64-bit hashes). Hot-path
+    callables are bound locally so the per-item cost is just the C-level
+    string ops and one blake2b call.
+    """
+    norm = normalize_text
+    h = text_hash
+    out = [norm(t) for t in texts]
+    return out, [h(s) for s in out]
@@ -0,0 +1,178 @@
+# api/app/tracing.py
+"""
+Lightweight per-request span tracing with tail-based slow-request capture.
+
+Every request gets a Trace (id taken from ``traceparent`` / ``x-request-id``
+when the caller sends one) held in a ContextVar, so ``span("...")`` blocks in
+handlers, ModelWrapper and the DB helpers append to it — including code that
+runs in the sync-endpoint threadpool, which copies the context. Spans are just
+(name, start, duration) tuples; only requests slower than the buffer's
+threshold are converted to dicts and kept in a bounded ring buffer.
+
+Outside a traced request ``span()`` returns a shared no-op context manager.
+"""
+from __future__ import annotations
+
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import List, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+_current: ContextVar[Optional["Trace"]] = ContextVar("trace", default=None)
+_NULL = nullcontext()
+
+
+class Trace:
+    __slots__ = ("trace_id", "method", "path", "t0", "wall0", "spans", "status")
+
+    def __init__(self, trace_id: str, method: str = "", path: str = ""):
+        self.trace_id = trace_id
+        self.method = method
+        self.path = path
+        self.t0 = time.perf_counter()
+        self.wall0 = time.time()
+        self.spans: list = []
+        self.status: Optional[int] = None
+
+    def to_dict(self, duration_ms: float) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "started_at": self.wall0,
+            "duration_ms": round(duration_ms, 3),
+            "spans": [
+                {"name": n, "start_ms": round(s, 3), "duration_ms": round(d, 3), "error": e}
+                for n, s, d, e in self.spans
+            ],
+        }
+
+
+class _Span:
+    __slots__ = ("trace", "name", "t0")
+
+    def __init__(self, trace: Trace, name: str):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        t1 = time.perf_counter()
+        self.trace.spans.append((
+            self.name,
+            (self.t0 - self.trace.t0) * 1000.0,
+            (t1 - self.t0) * 1000.0,
+            exc_type.__name__ if exc_type else None,
+        ))
+        return False
+
+
+def span(name: str):
+    """Time a block as a child span of the current request (no-op if untraced)."""
+    tr = _current.get()
+    if tr is None:
+        return _NULL
+    return _Span(tr, name)
+
+
+def mark_since_start(name: str):
+    """Record a span from request start until now (e.g. body read + validation)."""
+    tr = _current.get()
+    if tr is not None:
+        now = time.perf_counter()
+        tr.spans.append((name, 0.0, (now - tr.t0) * 1000.0, None))
+
+
+@contextmanager
+def untraced():
+    """Detach the current trace (e.g. long-lived streams that would grow it forever)."""
+    token = _current.set(None)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def current_trace_id() -> Optional[str]:
+    tr = _current.get()
+    return tr.trace_id if tr is not None else None
+
+
+class SlowTraceBuffer:
+    """Ring buffer of traces whose total duration exceeded ``threshold_ms``."""
+
+    def __init__(self, threshold_ms: float = 250.0, size: int = 100):
+        self.threshold_ms = float(threshold_ms)
+        self._buf: deque = deque(maxlen=int(size))
+
+    def offer(self, trace: Trace, duration_ms: float):
+        if duration_ms >= self.threshold_ms:
+            self._buf.append(trace.to_dict(duration_ms))
+
+    def snapshot(self, limit: Optional[int] = None) -> List[dict]:
+        items = list(self._buf)[::-1]  # newest first
+        return items[:limit] if limit else items
+
+    def clear(self):
+        self._buf.clear()
+
+
+def _incoming_trace_id(scope: Scope) -> Optional[str]:
+    tp = rid = None
+    for k, v in scope.get("headers", []):
+        if k == b"traceparent":
+            tp = v.decode("latin-1")
+        elif k in (b"x-request-id", b"x-trace-id"):
+            rid = v.decode("latin-1")
+    if tp:
+        parts = tp.split("-")  # W3C: version-traceid-parentid-flags
+        if len(parts) >= 4 and len(parts[1]) == 32:
+            return parts[1]
+    if rid:
+        return rid[:128]
+    return None
+
+
+class TracingMiddleware:
+    """Pure ASGI middleware: opens a Trace per HTTP request, echoes x-trace-id."""
+
+    def __init__(self, app: ASGIApp, buffer: SlowTraceBuffer, enabled: bool = True):
+        self.app = app
+        self.buffer = buffer
+        self.enabled = enabled
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace(
+            _incoming_trace_id(scope) or uuid.uuid4().hex,
+            scope.get("method", ""),
+            scope.get("path", ""),
+        )
+        token = _current.set(trace)
+
+        async def traced_send(msg: Message):
+            if msg["type"] == "http.response.start":
+                trace.status = msg["status"]
+                msg["headers"] = list(msg.get("headers", [])) + [
+                    (b"x-trace-id", trace.trace_id.encode("latin-1"))
+                ]
+            await send(msg)
+
+        try:
+            await self.app(scope, receive, traced_send)
+        finally:
+            _current.reset(token)
+            if trace.status is None:
+                trace.status = 500
+            self.buffer.offer(trace, (time.perf_counter() - trace.t0) * 1000.0)
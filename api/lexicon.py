@@ -0,0 +1,126 @@
+"""Compiled weighted lexicon for the keyword sentiment API.
+
+Terms (single words or multi-word phrases) are compiled once into a hash
+map keyed by token tuples, so scoring a comment costs O(tokens x longest
+phrase) no matter how many terms the lexicon holds. Matching is on whole
+Unicode word tokens (NFC, lower-cased), so "bad" no longer fires inside
+"badge" and terms like "génial" or "schlecht" work too.
+
+Negators ("not", "never", "don't", ...) flip the sign of matches that start
+within the next ``negation_window`` tokens. A term that itself starts with a
+negator ("not bad", "no problem") is matched as a phrase first; the negator
+only applies when no term starts at that token.
+
+Lexicon files are UTF-8 text, one term per line, ``term<TAB>weight`` or
+``term,weight`` (split on the last comma, so phrases may contain commas;
+weight > 0 positive, < 0 negative). Lines without a weight
+use ``default_weight``; blank lines and ``#`` comments are skipped.
+"""
+
+import re
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+TOKEN_RE = re.compile(r"\w+(?:'\w+)?")
+
+DEFAULT_NEGATORS = frozenset(
+    {
+        "not", "no", "never", "nothing", "nobody", "none", "neither", "nor",
+        "without", "hardly", "isn't", "wasn't", "aren't", "don't", "doesn't",
+        "didn't", "can't", "cannot", "won't", "wouldn't", "shouldn't", "couldn't",
+    }
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(unicodedata.normalize("NFC", text).lower())
+
+
+class Lexicon:
+    def __init__(
+        self,
+        terms: Dict[str, float],
+        negators: Iterable[str] = DEFAULT_NEGATORS,
+        negation_window: int = 3,
+    ):
+        self.negators = frozenset(negators)
+        self.negation_window = int(negation_window)
+        self._table: Dict[Tuple[str, ...], float] = {}
+        self.max_len = 1
+        for term, weight in terms.items():
+            key = tuple(tokenize(term))
+            if key:
+                self._table[key] = float(weight)
+                self.max_len = max(self.max_len, len(key))
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    @classmethod
+    def from_lists(cls, positive: Iterable[str], negative: Iterable[str], **kw) -> "Lexicon":
+        terms = {w: 1.0 for w in positive}
+        terms.update({w: -1.0 for w in negative})
+        return cls(terms, **kw)
+
+    @classmethod
+    def from_files(cls, *paths, default_weight: float = 1.0, **kw) -> "Lexicon":
+        terms: Dict[str, float] = {}
+        for path in paths:
+            for line in Path(path).read_text(encoding="utf-8").splitlines():
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                parts = line.split("\t", 1) if "\t" in line else line.rsplit(",", 1)
+                weight = default_weight
+                if len(parts) == 2:
+                    try:
+                        weight = float(parts[1])
+                    except ValueError:
+                        parts = [line]
+                terms[parts[0].strip()] = weight
+        return cls(terms, **kw)
+
+    def score(self, text: str) -> float:
+        """Sum of matched term weights, with negation applied."""
+        toks = tokenize(text)
+        table = self._table
+        total = 0.0
+        negate_until = -1
+        i, n = 0, len(toks)
+        while i < n:
+            tok = toks[i]
+            # longest phrase first, so entries like "not bad" beat the negator
+            for k in range(min(self.max_len, n - i), 0, -1):
+                w = table.get(tuple(toks[i:i + k])) if k > 1 else table.get((tok,))
+                if w is not None:
+                    total += -w if i <= negate_until else w
+                    i += k
+                    break
+            else:
+                if tok in self.negators:
+                    negate_until = i + self.negation_window
+                i += 1
+        return total
+
+    def score_batch(self, texts: Iterable[str]) -> List[float]:
+        score = self.score
+        return [score(t) for t in texts]
+
+
+def label(score: float, threshold: float = 0.0) -> str:
+    if score > threshold:
+        return "positive"
+    if score < -threshold:
+        return "negative"
+    return "neutral"
+
+
+def load_default(path: Optional[str] = None) -> Lexicon:
+    """Lexicon from ``path`` if given, else the small built-in word lists."""
+    if path:
+        return Lexicon.from_files(path)
+    return Lexicon.from_lists(
+        ["good", "great", "excellent", "amazing", "wonderful", "fantastic", "love", "perfect"],
+        ["bad", "terrible", "awful", "hate", "horrible", "worst", "disappointing"],
+    )
@@ -1,9 +1,12 @@
+import logging
+import os
+from typing import List
+
+import uvicorn
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
-import uvicorn
-import os
-import logging
 
+from api.lexicon import label, load_default
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -14,45 +17,22 @@ class TextInput(BaseModel):
     text: str
 
 
+class BatchInput(BaseModel):
+    texts: List[str]
+
+
 app = FastAPI(title="Sentiment Analysis API", version="1.0.0")
 
+# Compiled once at import; set SENTIMENT_LEXICON_PATH to load a weighted lexicon file
+LEXICON = load_default(os.getenv("SENTIMENT_LEXICON_PATH"))
+logger.info(f"Sentiment lexicon loaded: {len(LEXICON)} terms")
+
 
 def predict_sentiment(text: str) -> str:
-    """Simple sentiment prediction based on keywords."""
+    """Lexicon-based sentiment (see api/lexicon.py)."""
     if not text or len(text.strip()) == 0:
         raise ValueError("Text cannot be empty")
-
-    # Simple keyword-based sentiment
-    positive_words = [
-        "good",
-        "great",
-        "excellent",
-        "amazing",
-        "wonderful",
-        "fantastic",
-        "love",
-        "perfect",
-    ]
-    negative_words = [
-        "bad",
-        "terrible",
-        "awful",
-        "hate",
-        "horrible",
-        "worst",
-        "disappointing",
-    ]
-
-    text_lower = text.lower()
-
-    positive_score = sum(1 for word in positive_words if word in text_lower)
-    negative_score = sum(1 for word in negative_words if word in text_lower)
-
-    if positive_score > negative_score:
-        return "positive"
-    if negative_score > positive_score:
-        return "negative"
-    return "neutral"
+    return label(LEXICON.score(text))
 
 
 @app.get("/")
@@ -81,6 +61,12 @@ def predict(input_data: TextInput):
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+@app.post("/predict/batch")
+def predict_batch(input_data: BatchInput):
+    scores = LEXICON.score_batch(input_data.texts)
+    return {"sentiments": [label(sc) for sc in scores], "scores": scores}
+
+
 if __name__ == "__main__":
     port = int(os.getenv("PORT", "8000"))
     uvicorn.run("api.main:app", host="0.0.0.0", port=port, reload=True)
@@ -0,0 +1,100 @@
+# benchmarks/bench_binary_batch.py
+"""
+End-to-end throughput of POST /predict/batch: JSON vs Arrow IPC.
+
+    python -m benchmarks.bench_binary_batch [--sizes 1 10 100 1000 10000] [--seconds 2]
+
+Starts the API under uvicorn (TESTING=1, no DB, admission off) and, for each
+batch size, sends batches back to back over one keep-alive connection for
+``--seconds``. Timings include client-side encoding and decoding, i.e. what a
+calling service pays per comment. Single-item POST /predict is shown at
+batch size 1 for reference.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pyarrow as pa
+import requests
+
+from benchmarks.bench_stream import _wait_port
+
+ARROW = "application/vnd.apache.arrow.stream"
+COMMENTS = [
+    "you are a nice person",
+    "this edit is stupid and awful",
+    "thanks for fixing the citation on the history section",
+    "go away idiot nobody wants you here",
+]
+
+
+def _texts(n: int):
+    return [f"{COMMENTS[i % len(COMMENTS)]} {i}" for i in range(n)]
+
+
+def _json_batch(s: requests.Session, url: str, texts):
+    r = s.post(url + "/predict/batch", data=json.dumps({"texts": texts}),
+               headers={"content-type": "application/json"})
+    r.raise_for_status()
+    return r.json()["probability"]
+
+
+def _arrow_batch(s: requests.Session, url: str, texts):
+    table = pa.table({"text": pa.array(texts, type=pa.string())})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as w:
+        w.write_table(table)
+    r = s.post(url + "/predict/batch", data=sink.getvalue().to_pybytes(),
+               headers={"content-type": ARROW})
+    r.raise_for_status()
+    return pa.ipc.open_stream(r.content).read_all().column("probability")
+
+
+def _single(s: requests.Session, url: str, texts):
+    return [s.post(url + "/predict", json={"text": t}).json()["probability"] for t in texts]
+
+
+def _rate(fn, s, url, texts, seconds: float) -> float:
+    fn(s, url, texts)  # warm-up
+    n, t0 = 0, time.perf_counter()
+    while n == 0 or time.perf_counter() - t0 < seconds:
+        fn(s, url, texts)
+        n += len(texts)
+    return n / (time.perf_counter() - t0)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="*", default=[1, 10, 100, 1000, 10000])
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    env = dict(os.environ, TESTING="1", TRACING_ENABLED="false", MAX_INFLIGHT="0")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.app.main:app", "--port", str(args.port),
+         "--log-level", "warning"],
+        env=env,
+    )
+    url = f"http://127.0.0.1:{args.port}"
+    try:
+        _wait_port(args.port)
+        s = requests.Session()
+        print(f"{'batch':>6} {'json/s':>10} {'arrow/s':>10} {'speedup':>8}")
+        for size in args.sizes:
+            texts = _texts(size)
+            j = _rate(_json_batch, s, url, texts, args.seconds)
+            a = _rate(_arrow_batch, s, url, texts, args.seconds)
+            print(f"{size:>6} {j:>10.0f} {a:>10.0f} {a / j:>7.2f}x")
+        one = _rate(_single, s, url, _texts(1), args.seconds)
+        print(f"single-item POST /predict: {one:.0f}/s")
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
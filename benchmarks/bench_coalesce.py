@@ -0,0 +1,129 @@
+# benchmarks/bench_coalesce.py
+"""
+Duplicate-heavy load test for in-flight coalescing on POST /predict.
+
+    python -m benchmarks.bench_coalesce [--requests 5000] [--concurrency 64] [--dup-share 0.9]
+    python -m benchmarks.bench_coalesce --replay requests.jsonl   # {"text": ...} or {"body": ...}
+
+Builds a raid-like request sequence (``--dup-share`` of the requests are one
+of ``--hot`` comments of ``--chars`` characters, the rest short and unique)
+or replays a JSONL file, then fires it at the API from ``--concurrency``
+client threads, once with COALESCE_PREDICTIONS=false and once with it on. Each run starts its own
+uvicorn (TESTING=1, no DB, default admission settings unless MAX_INFLIGHT etc.
+are set in the environment) and reports requests/s, latency percentiles,
+requests shed (429/503) and the /metrics coalescing counters (``leaders`` =
+model calls).
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+from benchmarks.bench_stream import _wait_port
+
+RAID = [
+    "you are a worthless idiot and everyone here hates you",
+    "GET OUT OF THIS PAGE LOSER",
+    "this article is garbage and so are you",
+]
+
+
+def _raid_texts(n: int, dup_share: float, hot: int, rnd: random.Random, chars: int):
+    # Raid copypasta is usually long, which is what makes each model call count
+    hot_texts = [(t + " ") * max(1, chars // (len(t) + 1)) for t in RAID[:max(1, hot)]]
+    out = []
+    for i in range(n):
+        if rnd.random() < dup_share:
+            out.append(rnd.choice(hot_texts))
+        else:
+            out.append(f"thanks for the edit on section {i}, the citation looks right now")
+    return out
+
+
+def _replay_texts(path: str):
+    out = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                obj = json.loads(line)
+                out.append(obj.get("text") or obj.get("body") or "")
+    return [t for t in out if t.strip()]
+
+
+def _run(texts, concurrency: int, port: int, coalesce: bool) -> dict:
+    env = dict(os.environ, TESTING="1", TRACING_ENABLED="false",
+               COALESCE_PREDICTIONS=str(coalesce).lower())
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.app.main:app", "--port", str(port),
+         "--log-level", "warning"],
+        env=env,
+    )
+    url = f"http://127.0.0.1:{port}"
+    local = threading.local()
+
+    def post(t):
+        s = getattr(local, "session", None)
+        if s is None:
+            s = local.session = requests.Session()  # one keep-alive connection per thread
+        t0 = time.perf_counter()
+        r = s.post(url + "/predict", json={"text": t})
+        if r.status_code not in (429, 503):
+            r.raise_for_status()
+        return (time.perf_counter() - t0) * 1000.0, r.status_code != 200
+
+    try:
+        _wait_port(port)
+        requests.post(url + "/predict", json={"text": "warm up"}).raise_for_status()
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as ex:
+            lat, shed = map(np.array, zip(*ex.map(post, texts)))
+        elapsed = time.perf_counter() - t0
+        counters = requests.get(url + "/metrics").json()["coalescing"]
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+    return {
+        "req_per_s": len(texts) / elapsed,
+        "p50_ms": float(np.percentile(lat, 50)),
+        "p99_ms": float(np.percentile(lat, 99)),
+        "shed": int(shed.sum()),
+        **counters,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--dup-share", type=float, default=0.9)
+    parser.add_argument("--hot", type=int, default=1, help="distinct duplicated comments")
+    parser.add_argument("--chars", type=int, default=4000, help="length of a duplicated comment")
+    parser.add_argument("--replay", default=None, help="JSONL with a text/body field per line")
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.replay:
+        texts = _replay_texts(args.replay)
+        texts = [texts[i % len(texts)] for i in range(max(args.requests, len(texts)))]
+    else:
+        texts = _raid_texts(args.requests, args.dup_share, args.hot, random.Random(args.seed),
+                            args.chars)
+    print(f"{len(texts)} requests, {len(set(texts))} distinct, concurrency {args.concurrency}")
+    for coalesce in (False, True):
+        r = _run(texts, args.concurrency, args.port, coalesce)
+        print(f"coalesce={str(coalesce):5s}  {r['req_per_s']:8.0f} req/s  "
+              f"p50={r['p50_ms']:7.1f} ms  p99={r['p99_ms']:7.1f} ms  shed={r['shed']:5d}  "
+              f"model calls={r['leaders']:6d}  coalesced={r['coalesced']:6d}")
+
+
+if __name__ == "__main__":
+    main()
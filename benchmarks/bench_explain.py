@@ -0,0 +1,79 @@
+# benchmarks/bench_explain.py
+"""
+Cost of ``explain`` (top-k n-gram contributions) on top of plain scoring.
+
+    python -m benchmarks.bench_explain --docs 20000 --batch 1 256 --k 10
+
+Trains a (1, 2)-gram TF-IDF + LogisticRegression on a synthetic corpus, then
+times ModelWrapper.predict_arrays vs predict_explained on the same texts
+(interleaved, median per call). The explanation reuses the scoring rows, so
+the overhead should track the rows' non-zeros, not the vocabulary size or the
+number of model evaluations.
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+
+os.environ.setdefault("TESTING", "1")
+
+from sklearn.feature_extraction.text import TfidfVectorizer  # noqa: E402
+from sklearn.linear_model import LogisticRegression  # noqa: E402
+
+from api.app.main import ModelWrapper  # noqa: E402
+
+
+def _corpus(n, rnd):
+    words = [f"w{i}" for i in range(20000)]
+    cues = [f"insult{i}" for i in range(200)]
+    texts, y = [], []
+    for _ in range(n):
+        toks = rnd.choices(words, k=40)
+        toxic = rnd.random() < 0.3
+        if toxic:
+            toks += rnd.choices(cues, k=3)
+        rnd.shuffle(toks)
+        texts.append(" ".join(toks))
+        y.append(int(toxic))
+    return texts, y
+
+
+def _time_pair(f, g, reps):
+    """Median ms per call of f and g, interleaved so machine noise hits both alike."""
+    f(), g()  # warm-up (and the one-off feature-name table)
+    tf, tg = [], []
+    for _ in range(reps):
+        for fn, out in ((f, tf), (g, tg)):
+            t0 = time.perf_counter()
+            fn()
+            out.append((time.perf_counter() - t0) * 1000.0)
+    return statistics.median(tf), statistics.median(tg)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--batch", type=int, nargs="*", default=[1, 256])
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--reps", type=int, default=50)
+    args = parser.parse_args()
+
+    texts, y = _corpus(args.docs, random.Random(0))
+    vec = TfidfVectorizer(ngram_range=(1, 2))
+    clf = LogisticRegression(max_iter=300).fit(vec.fit_transform(texts), y)
+    m = ModelWrapper()
+    m.model, m.source = ("local", vec, clf), "bench"
+    print(f"features={len(vec.vocabulary_):,}  k={args.k}")
+
+    for b in args.batch:
+        batch = texts[:b]
+        plain, expl = _time_pair(lambda: m.predict_arrays(batch),
+                                 lambda: m.predict_explained(batch, args.k), args.reps)
+        nnz = vec.transform(batch).nnz / b
+        print(f"batch={b:<5d} nnz/row={nnz:6.0f}  plain={plain:8.3f} ms  "
+              f"explain={expl:8.3f} ms  overhead={100 * (expl / plain - 1):5.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# benchmarks/bench_import_time.py
+"""
+Import-time breakdown of the API module (``python -X importtime`` style).
+
+    python -m benchmarks.bench_import_time [--module api.app.main] [--top 15]
+
+Runs a fresh interpreter with -X importtime, then prints the total import
+time and the top-level packages ranked by the summed self time of all their
+submodules. Also reports whether mlflow / pandas / sklearn got pulled in,
+since none of them should be on the default (no MLFLOW_TRACKING_URI) path.
+"""
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+WATCH = ("mlflow", "pandas", "sklearn")
+
+
+def measure(module: str):
+    env = os.environ.copy()
+    env.pop("MLFLOW_TRACKING_URI", None)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    per_pkg = defaultdict(int)
+    total = 0
+    for line in proc.stderr.splitlines():
+        # "import time:   self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, rest = line.split(":", 1)
+        self_us, _cum_us, name = (p.strip() for p in rest.split("|"))
+        total += int(self_us)
+        per_pkg[name.split(".")[0]] += int(self_us)
+    return total, per_pkg
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", default="api.app.main")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    total, per_pkg = measure(args.module)
+    print(f"import {args.module}: {total / 1000:.1f} ms total")
+    for name, us in sorted(per_pkg.items(), key=lambda kv: -kv[1])[: args.top]:
+        print(f"  {name:28s} {us / 1000:8.1f} ms")
+    for name in WATCH:
+        print(f"  {name:28s} {'LOADED' if name in per_pkg else 'not loaded'}")
+
+
+if __name__ == "__main__":
+    main()
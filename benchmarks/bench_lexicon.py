@@ -0,0 +1,63 @@
+# benchmarks/bench_lexicon.py
+"""
+Per-comment cost of the keyword sentiment scorer as the lexicon grows.
+
+    python -m benchmarks.bench_lexicon --n 2000
+
+Compares the old approach (``word in text`` for every lexicon word) with
+api/lexicon.py (token-hash lookup) for lexicons of 15 to 50k terms. The
+compiled engine should stay flat; the substring scan grows linearly.
+"""
+import argparse
+import random
+import string
+import time
+
+from api.lexicon import Lexicon, load_default
+
+COMMENTS = [
+    "I love this product, it is not bad at all and the support was great",
+    "This is the worst thing I have ever bought, terrible and disappointing",
+    "The badge arrived on time. It works as described, nothing special.",
+]
+
+
+def _substring_scan(words_pos, words_neg, text):
+    t = text.lower()
+    return sum(1 for w in words_pos if w in t) - sum(1 for w in words_neg if w in t)
+
+
+def _random_words(k, rnd):
+    return ["".join(rnd.choices(string.ascii_lowercase, k=rnd.randint(4, 10))) for _ in range(k)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=2000, help="comments scored per size")
+    args = parser.parse_args()
+
+    rnd = random.Random(0)
+    texts = [COMMENTS[i % len(COMMENTS)] for i in range(args.n)]
+    base = load_default()
+    base_terms = dict(base._table)
+
+    for size in (15, 1_000, 10_000, 50_000):
+        extra = _random_words(max(0, size - len(base_terms)), rnd)
+        pos = [" ".join(k) for k, w in base_terms.items() if w > 0] + extra[: len(extra) // 2]
+        neg = [" ".join(k) for k, w in base_terms.items() if w < 0] + extra[len(extra) // 2:]
+
+        t0 = time.perf_counter()
+        for t in texts:
+            _substring_scan(pos, neg, t)
+        old_us = (time.perf_counter() - t0) * 1e6 / len(texts)
+
+        lex = Lexicon.from_lists(pos, neg)
+        t0 = time.perf_counter()
+        lex.score_batch(texts)
+        new_us = (time.perf_counter() - t0) * 1e6 / len(texts)
+        print(f"terms={len(lex):>6d}  substring={old_us:9.1f} us/comment  "
+              f"compiled={new_us:6.1f} us/comment")
+
+
+if __name__ == "__main__":
+    main()
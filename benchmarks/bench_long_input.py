@@ -0,0 +1,70 @@
+# benchmarks/bench_long_input.py
+"""
+Tail latency of POST /predict as the input-size distribution widens.
+
+    TESTING=1 python -m benchmarks.bench_long_input --n 300
+
+Sizes are drawn log-uniformly from [20 chars, max_size] for several max_size
+values. With MAX_TEXT_CHARS bounding vectorizer work, p99 should stay roughly
+flat once max_size passes MAX_TEXT_CHARS (only the request-body copy grows).
+Pass --no-limit to see the unbounded behaviour for comparison.
+"""
+import argparse
+import math
+import os
+import random
+import time
+
+os.environ.setdefault("TESTING", "1")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import api.app.main as api_main  # noqa: E402
+
+WORDS = "you are a nice person but this edit is really stupid and awful".split()
+
+
+def _text(n_chars, rnd):
+    out, size = [], 0
+    while size < n_chars:
+        w = rnd.choice(WORDS)
+        out.append(w)
+        size += len(w) + 1
+    return " ".join(out)[:n_chars]
+
+
+def _pct(xs, q):
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(q * len(xs)))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=300, help="requests per size band")
+    parser.add_argument("--no-limit", action="store_true")
+    args = parser.parse_args()
+
+    if args.no_limit:
+        api_main.MAX_TEXT_CHARS = 0
+    client = TestClient(api_main.app)
+    client.post("/predict", json={"text": "warm up"})
+
+    rnd = random.Random(0)
+    print(f"MAX_TEXT_CHARS={api_main.MAX_TEXT_CHARS} strategy={api_main.TRUNCATION_STRATEGY}")
+    for max_size in (200, 2_000, 20_000, 200_000):
+        lat = []
+        for _ in range(args.n):
+            n = int(math.exp(rnd.uniform(math.log(20), math.log(max_size))))
+            body = {"text": _text(n, rnd)}
+            t0 = time.perf_counter()
+            r = client.post("/predict", json=body)
+            lat.append((time.perf_counter() - t0) * 1000.0)
+            assert r.status_code == 200, r.text
+        print(
+            f"sizes<= {max_size:>7d}  p50={_pct(lat, 0.5):7.2f} ms  "
+            f"p99={_pct(lat, 0.99):7.2f} ms  max={max(lat):7.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# benchmarks/bench_multilabel.py
+"""
+Cost of scoring all six Jigsaw labels: six separate vectorizer+classifier
+pipelines vs one shared TfidfVectorizer and a stacked MultiLabelLinear.
+
+    python -m benchmarks.bench_multilabel --docs 20000 --batch 256
+
+Both sides are trained on the same synthetic corpus. Reported per batch:
+six pipelines = six tokenizations + six sparse x dense products; stacked =
+one tokenization + one (n, F) x (F, 6) product.
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+
+from api.app.multilabel import LABELS, MultiLabelLinear
+
+
+def _corpus(n, rnd):
+    words = [f"w{i}" for i in range(20000)]
+    cues = {lbl: [f"{lbl}{i}" for i in range(50)] for lbl in LABELS}
+    texts, Y = [], np.zeros((n, len(LABELS)), dtype=int)
+    for i in range(n):
+        toks = rnd.choices(words, k=30)
+        for j, lbl in enumerate(LABELS):
+            if rnd.random() < 0.15:
+                Y[i, j] = 1
+                toks += rnd.choices(cues[lbl], k=2)
+        rnd.shuffle(toks)
+        texts.append(" ".join(toks))
+    return texts, Y
+
+
+def _time(fn, reps):
+    t0 = time.perf_counter()
+    for _ in range(reps):
+        fn()
+    return (time.perf_counter() - t0) * 1000.0 / reps
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--batch", type=int, default=256)
+    parser.add_argument("--reps", type=int, default=20)
+    args = parser.parse_args()
+
+    rnd = random.Random(0)
+    texts, Y = _corpus(args.docs, rnd)
+    batch = texts[: args.batch]
+
+    separate = []
+    for j in range(len(LABELS)):
+        v = TfidfVectorizer(ngram_range=(1, 2)).fit(texts)
+        separate.append((v, LogisticRegression(max_iter=200).fit(v.transform(texts), Y[:, j])))
+
+    vec = TfidfVectorizer(ngram_range=(1, 2), dtype=np.float32).fit(texts)
+    X = vec.transform(texts)
+    stacked = MultiLabelLinear.from_estimators(
+        LABELS, [LogisticRegression(max_iter=200).fit(X, Y[:, j]) for j in range(len(LABELS))]
+    )
+
+    def run_separate():
+        return np.column_stack([c.predict_proba(v.transform(batch))[:, 1] for v, c in separate])
+
+    def run_stacked():
+        return stacked.predict_proba(vec.transform(batch))
+
+    ms_sep = _time(run_separate, args.reps)
+    ms_st = _time(run_stacked, args.reps)
+    ms_tok = _time(lambda: vec.transform(batch), args.reps)
+    print(f"batch={args.batch}  features={len(vec.vocabulary_)}  labels={len(LABELS)}")
+    print(f"six pipelines   {ms_sep:8.2f} ms/batch")
+    print(f"stacked         {ms_st:8.2f} ms/batch  ({ms_sep / ms_st:.1f}x)"
+          f"  of which tokenization {ms_tok:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# benchmarks/bench_stream.py
+"""
+Memory and throughput of POST /predict/stream over a long NDJSON stream.
+
+    python -m benchmarks.bench_stream --lines 2000000 [--slow-reader]
+
+Starts the API under uvicorn (TESTING=1, no DB), then pushes ``--lines``
+comments as one chunked request from a writer thread while the main thread
+reads results, the way a long-lived ingestion client would. The server's RSS
+is sampled every 10% of the stream; it should stay flat. With --slow-reader
+the reader sleeps between reads: throughput drops to the reader's pace and RSS
+still stays flat (back-pressure instead of buffering).
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+COMMENTS = [
+    b'"you are a nice person"',
+    b'{"text": "this edit is stupid and awful", "key": 1}',
+    b'"thanks for fixing the citation"',
+    b'{"text": "go away idiot"}',
+]
+
+
+def _rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024.0
+    return float("nan")
+
+
+def _wait_port(port: int, timeout: float = 30.0):
+    t0 = time.time()
+    while time.time() - t0 < timeout:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+def _writer(sock: socket.socket, n: int, chunk_lines: int):
+    head = (
+        b"POST /predict/stream HTTP/1.1\r\nHost: bench\r\n"
+        b"Content-Type: application/x-ndjson\r\nTransfer-Encoding: chunked\r\n\r\n"
+    )
+    sock.sendall(head)
+    sent = 0
+    while sent < n:
+        k = min(chunk_lines, n - sent)
+        body = b"\n".join(COMMENTS[(sent + i) % len(COMMENTS)] for i in range(k)) + b"\n"
+        sock.sendall(b"%x\r\n%s\r\n" % (len(body), body))
+        sent += k
+    sock.sendall(b"0\r\n\r\n")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, default=2_000_000)
+    parser.add_argument("--chunk-lines", type=int, default=500)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--slow-reader", action="store_true")
+    args = parser.parse_args()
+
+    env = dict(os.environ, TESTING="1", TRACING_ENABLED="false")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.app.main:app", "--port", str(args.port),
+         "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        _wait_port(args.port)
+        sock = socket.create_connection(("127.0.0.1", args.port))
+        t = threading.Thread(target=_writer, args=(sock, args.lines, args.chunk_lines),
+                             daemon=True)
+        t0 = time.perf_counter()
+        t.start()
+
+        seen, carry, next_mark = 0, b"", args.lines // 10
+        recv_size = 4096 if args.slow_reader else 1 << 16
+        print(f"start  rss={_rss_mb(server.pid):7.1f} MB")
+        while seen < args.lines:
+            data = sock.recv(recv_size)
+            if not data:
+                break
+            buf = carry + data
+            seen += buf.count(b'{"i":')
+            carry = buf[-4:]
+            if args.slow_reader:
+                time.sleep(0.005)
+            if seen >= next_mark:
+                el = time.perf_counter() - t0
+                print(f"{seen:>9d} lines  {seen / el:9.0f} lines/s  "
+                      f"rss={_rss_mb(server.pid):7.1f} MB")
+                next_mark += args.lines // 10
+        sock.close()
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
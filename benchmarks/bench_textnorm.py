@@ -0,0 +1,64 @@
+# benchmarks/bench_textnorm.py
+"""
+Micro-benchmark for api/app/textnorm.py.
+
+    python -m benchmarks.bench_textnorm --n 200000
+
+Prints per-comment cost (µs) for ASCII and non-ASCII inputs, single-call and
+batch. Target: a few µs per comment.
+"""
+import argparse
+import random
+import time
+
+from api.app.textnorm import normalize, normalize_batch
+
+ASCII = [
+    "You are awesome!",
+    "I hope you have a great day",
+    "you   are   SO   stupid!!!!!!",
+    "Thanks for the help with the article, much appreciated.",
+    "this is the worst edit i have ever seen......",
+]
+UNICODE = [
+    "Ｙｏｕ ａｒｅ ｓｔｕｐｉｄ",
+    "id\u200biot",
+    "уоu аrе а lоsеr",  # Cyrillic look-alikes
+    "Ça va très bien, merci !!!",
+]
+
+
+def _sample(pool, n, seed=0):
+    rnd = random.Random(seed)
+    return [rnd.choice(pool) for _ in range(n)]
+
+
+def _time_single(texts):
+    t0 = time.perf_counter()
+    for t in texts:
+        normalize(t)
+    return (time.perf_counter() - t0) * 1e6 / len(texts)
+
+
+def _time_batch(texts):
+    t0 = time.perf_counter()
+    normalize_batch(texts)
+    return (time.perf_counter() - t0) * 1e6 / len(texts)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=200_000)
+    args = parser.parse_args()
+
+    for name, pool in (("ascii", ASCII), ("unicode", UNICODE)):
+        texts = _sample(pool, args.n)
+        normalize_batch(texts[:1000])  # warm regex caches
+        print(
+            f"{name:8s} single={_time_single(texts):6.2f} us/comment  "
+            f"batch={_time_batch(texts):6.2f} us/comment  (n={args.n})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,36 @@
 # frontend/app.py
+import hashlib
+import io
 import os
 import time
-import requests
+
+import pandas as pd
 import streamlit as st
 
+from bulk import BulkJob, BulkScorer, make_session
+
 API_URL = os.getenv("API_URL", "http://localhost:8000").rstrip("/")
+REQUEST_TIMEOUT_S = 10
+# Lets the API skip work for requests we've already given up on
+DEADLINE_HEADERS = {"X-Request-Timeout-Ms": str(REQUEST_TIMEOUT_S * 1000)}
+
+BULK_WORKERS = int(os.getenv("BULK_WORKERS", "4"))
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "500"))
+BULK_PREVIEW_ROWS = 200
+EXPLAIN_TOP_K = int(os.getenv("EXPLAIN_TOP_K", "10"))
 
 st.set_page_config(page_title="Toxic Comment Classifier", page_icon="🧪", layout="centered")
 st.title("🧪 Toxic Comment Classifier")
 
+
+@st.cache_resource
+def get_session():
+    # One keep-alive pool per server process, shared by every session and rerun
+    return make_session(BULK_WORKERS)
+
+
+session = get_session()
+
 # Keep last prediction id/label in session so feedback can use it
 if "last_pred_id" not in st.session_state:
     st.session_state.last_pred_id = None
@@ -16,6 +38,7 @@ if "last_label" not in st.session_state:
     st.session_state.last_label = None
 
 txt = st.text_area("Enter a comment:", height=140, placeholder="Type something…")
+explain = st.checkbox("Explain: show the n-grams that drove the score")
 
 col1, _ = st.columns([1, 3])
 with col1:
@@ -25,16 +48,30 @@ with col1:
         else:
             try:
                 t0 = time.perf_counter()
-                r = requests.post(f"{API_URL}/predict", json={"text": txt}, timeout=10)
+                r = session.post(
+                    f"{API_URL}/predict",
+                    json={"text": txt, "explain": EXPLAIN_TOP_K if explain else 0},
+                    headers=DEADLINE_HEADERS, timeout=REQUEST_TIMEOUT_S,
+                )
                 r.raise_for_status()
                 data = r.json()
                 st.session_state.last_pred_id = data.get("id")
                 st.session_state.last_label = data.get("label")
                 st.success(f"Prediction: **{data['label']}** (p={data['probability']:.3f})")
                 st.caption(f"Model: {data['model_version']} • API latency ~ {(time.perf_counter()-t0)*1000:.1f} ms")
+                st.session_state.last_explanation = data.get("explanation")
             except Exception as e:
                 st.error(f"Prediction failed: {e}")
 
+# Outside the narrow button column so the chart gets the full width
+expl = st.session_state.get("last_explanation") if explain else None
+if expl:
+    st.caption("Top contributing n-grams (TF-IDF × coefficient; > 0 pushes towards toxic)")
+    edf = pd.DataFrame(expl).set_index("ngram")
+    st.bar_chart(edf["contribution"])
+elif explain and expl == []:
+    st.caption("No known n-grams in this comment.")
+
 st.divider()
 st.subheader("Was this correct?")
 
@@ -46,7 +83,8 @@ def send_feedback(correct: bool):
         st.info("Make a prediction first.")
         return
     try:
-        r = requests.post(f"{API_URL}/feedback", json={"id": pid, "correct": bool(correct)}, timeout=10)
+        r = session.post(f"{API_URL}/feedback", json={"id": pid, "correct": bool(correct)},
+                         timeout=10)
         r.raise_for_status()
         st.success("Thanks! Feedback recorded.")
     except Exception as e:
@@ -56,3 +94,64 @@ with c1:
     st.button("👍 Yes", use_container_width=True, on_click=send_feedback, args=(True,))
 with c2:
     st.button("👎 No", use_container_width=True, on_click=send_feedback, args=(False,))
+
+
+st.divider()
+st.subheader("Score a CSV file")
+
+# Jobs live in session_state keyed by file content + column, so reruns (widget
+# clicks, progress refreshes) never start the scoring again
+if "bulk_jobs" not in st.session_state:
+    st.session_state.bulk_jobs = {}
+
+upload = st.file_uploader("CSV with one comment per row", type=["csv"])
+if upload is not None:
+    raw = upload.getvalue()
+    df = pd.read_csv(io.BytesIO(raw))
+    cols = list(df.columns)
+    default = next((i for i, c in enumerate(cols) if c in ("comment_text", "text", "comment")), 0)
+    column = st.selectbox("Text column", cols, index=default)
+    key = (hashlib.sha256(raw).hexdigest(), column)
+    job = st.session_state.bulk_jobs.get(key)
+
+    if job is None:
+        st.caption(f"{len(df):,} rows")
+        if st.button("Score file"):
+            scorer = BulkScorer(API_URL, session=session, chunk_size=BULK_CHUNK_SIZE,
+                                workers=BULK_WORKERS)
+            texts = df[column].fillna("").astype(str).tolist()
+            st.session_state.bulk_jobs = {key: BulkJob(scorer, texts)}
+            st.rerun()
+    else:
+        @st.fragment(run_every=1.0 if job.running else None)
+        def bulk_progress():
+            p = job.progress()
+            st.progress(p["done"] / max(p["total"], 1),
+                        text=f"{p['done']:,} / {p['total']:,} rows • {p['rows_per_s']:,.0f} rows/s "
+                             f"• {p['elapsed_s']:.1f} s • {p['mode']} mode")
+            done = [i for i, r in enumerate(job.results[:BULK_PREVIEW_ROWS]) if r is not None]
+            if done:
+                st.dataframe(pd.DataFrame({
+                    column: [job.texts[i] for i in done],
+                    "label": [job.results[i].get("label") for i in done],
+                    "probability": [job.results[i].get("probability") for i in done],
+                }), use_container_width=True)
+            if job.running:
+                st.button("Cancel", on_click=job.cancel)
+            elif st.session_state.get("bulk_shown") != key:
+                # Finished: one full rerun to stop polling and show the download
+                st.session_state.bulk_shown = key
+                st.rerun(scope="app")
+
+        bulk_progress()
+        if job.error:
+            st.error(f"Bulk scoring failed: {job.error}")
+        if not job.running:
+            if not hasattr(job, "csv_bytes"):
+                out = df.copy()
+                out["label"] = [(r or {}).get("label") for r in job.results]
+                out["probability"] = [(r or {}).get("probability") for r in job.results]
+                out["error"] = [(r or {}).get("error") for r in job.results]
+                job.csv_bytes = out.to_csv(index=False).encode("utf-8")
+            st.download_button("Download scored CSV", job.csv_bytes,
+                               file_name=f"scored_{upload.name}", mime="text/csv")
@@ -0,0 +1,158 @@
+# frontend/bulk.py
+"""
+Bulk scoring of many comments against the API, for the CSV upload mode.
+
+Texts are cut into chunks and sent concurrently from a small thread pool over
+one pooled keep-alive ``requests.Session``. A chunk goes to POST
+/predict/stream as a single NDJSON body when the API has it (checked once per
+scorer); otherwise each text in the chunk is a POST /predict on the same
+session, so the pool still gives ``workers`` calls in flight. 429/503 from
+admission control are retried after ``Retry-After``.
+
+A BulkJob runs in a background thread and only writes to its own fields, so
+the Streamlit script can poll ``progress()`` on every rerun without blocking
+and without starting the work again.
+"""
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUSES = (429, 503)
+
+
+def make_session(pool_size: int = 8) -> requests.Session:
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    return s
+
+
+class BulkScorer:
+    def __init__(
+        self,
+        api_url: str,
+        session: Optional[requests.Session] = None,
+        chunk_size: int = 500,
+        single_chunk_size: int = 25,
+        workers: int = 4,
+        timeout_s: float = 60.0,
+        max_retries: int = 3,
+    ):
+        self.api_url = api_url.rstrip("/")
+        self.session = session or make_session(workers)
+        self.chunk_size = int(chunk_size)
+        self.single_chunk_size = int(single_chunk_size)
+        self.workers = int(workers)
+        self.timeout_s = float(timeout_s)
+        self.max_retries = int(max_retries)
+        self._batch: Optional[bool] = None
+
+    def supports_batch(self) -> bool:
+        """Whether the API has POST /predict/stream (probed once with an empty body)."""
+        if self._batch is None:
+            try:
+                r = self.session.post(f"{self.api_url}/predict/stream", data=b"",
+                                      headers={"Content-Type": "application/x-ndjson"},
+                                      timeout=self.timeout_s)
+                self._batch = r.status_code == 200
+            except requests.RequestException:
+                self._batch = False
+        return self._batch
+
+    def chunks(self, n: int) -> List[range]:
+        size = self.chunk_size if self.supports_batch() else self.single_chunk_size
+        return [range(i, min(i + size, n)) for i in range(0, n, size)]
+
+    def _post(self, path: str, **kw) -> requests.Response:
+        for attempt in range(self.max_retries + 1):
+            r = self.session.post(f"{self.api_url}{path}", timeout=self.timeout_s, **kw)
+            if r.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                r.raise_for_status()
+                return r
+            time.sleep(min(float(r.headers.get("Retry-After", 1)), 10.0))
+        raise AssertionError("unreachable")
+
+    def score_chunk(self, texts: List[str]) -> List[dict]:
+        """One result dict (label, probability, error) per text, in order."""
+        if self.supports_batch():
+            body = "".join(json.dumps(t) + "\n" for t in texts).encode("utf-8")
+            r = self._post("/predict/stream", data=body,
+                           headers={"Content-Type": "application/x-ndjson"})
+            out = [{"error": "no result"} for _ in texts]
+            for line in r.iter_lines():
+                if line:
+                    row = json.loads(line)
+                    out[row.pop("i")] = row
+            return out
+
+        out = []
+        for t in texts:
+            try:
+                out.append(self._post("/predict", json={"text": t}).json())
+            except requests.RequestException as e:
+                out.append({"error": str(e)})
+        return out
+
+
+class BulkJob:
+    """Scores ``texts`` in a background thread; poll ``progress()``/``results``."""
+
+    def __init__(self, scorer: BulkScorer, texts: List[str]):
+        self.scorer = scorer
+        self.texts = texts
+        self.results: List[Optional[dict]] = [None] * len(texts)
+        self.done = 0
+        self.error: Optional[str] = None
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            with ThreadPoolExecutor(self.scorer.workers) as pool:
+                futs = {
+                    pool.submit(self._chunk, rng): rng
+                    for rng in self.scorer.chunks(len(self.texts))
+                }
+                for fut in as_completed(futs):
+                    rng = futs[fut]
+                    try:
+                        rows = fut.result()
+                    except Exception as e:
+                        rows = [{"error": str(e)}] * len(rng)
+                    self.results[rng.start:rng.stop] = rows
+                    self.done += len(rng)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self.finished = time.perf_counter()
+
+    def _chunk(self, rng: range) -> List[dict]:
+        if self._cancel.is_set():
+            return [{"error": "cancelled"}] * len(rng)
+        return self.scorer.score_chunk(self.texts[rng.start:rng.stop])
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def running(self) -> bool:
+        return self.finished is None
+
+    def progress(self) -> dict:
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        return {
+            "done": self.done,
+            "total": len(self.texts),
+            "elapsed_s": elapsed,
+            "rows_per_s": self.done / elapsed if elapsed > 0 else 0.0,
+            "mode": "batch" if self.scorer.supports_batch() else "single",
+        }
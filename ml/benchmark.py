@@ -0,0 +1,230 @@
+# ml/benchmark.py
+"""
+Post-training serving benchmark and promotion gate.
+
+benchmark() loads vectorizer.joblib + classifier.joblib in a fresh Python
+process (so memory numbers are not polluted by training) and measures, on a
+fixed sample of texts:
+
+- latency_p50_ms / latency_p99_ms   single-item transform + predict_proba
+- throughput_per_s                  items/s in batches of ``batch_size``
+- artifact_bytes                    serialized size on disk
+- model_rss_mb                      RSS growth from loading the artifacts
+- rss_mb                            process RSS after load + benchmark
+
+check_budgets() compares a candidate against the current Production version,
+benchmarked the same way on the same machine and sample, and lists every
+metric that regressed past its budget. A budget is a ratio to the baseline:
+the candidate may be at most ``ratio`` x the baseline for size/latency/memory,
+and at least ``ratio`` x for throughput. promotion_gate() wraps both for the
+scripts that register models (ml/train.py, ml/incremental.py --register).
+
+    python -m ml.benchmark --artifacts api/app/artifacts   # print metrics
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# metric -> max ratio (or min ratio for throughput) vs the Production version
+DEFAULT_BUDGETS: Dict[str, float] = {
+    "latency_p50_ms": 1.25,
+    "latency_p99_ms": 1.5,
+    "throughput_per_s": 0.8,
+    "artifact_bytes": 1.5,
+    "model_rss_mb": 1.5,
+}
+HIGHER_IS_BETTER = {"throughput_per_s"}
+
+
+def parse_budgets(spec: Optional[str]) -> Dict[str, float]:
+    """``"latency_p99_ms=1.3,artifact_bytes=2"`` on top of DEFAULT_BUDGETS."""
+    budgets = dict(DEFAULT_BUDGETS)
+    for part in (spec or "").split(","):
+        if part.strip():
+            k, v = part.split("=", 1)
+            if k.strip() not in DEFAULT_BUDGETS:
+                raise ValueError(f"unknown budget metric: {k.strip()}")
+            budgets[k.strip()] = float(v)
+    return budgets
+
+
+def fixed_sample(texts: List[str], n: int = 1000) -> List[str]:
+    """First ``n`` texts, cycled if there are fewer, so every run sees the same input."""
+    texts = [str(t) for t in texts] or ["hello"]
+    return [texts[i % len(texts)] for i in range(n)]
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024.0
+    import resource
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def _measure(vec_path: str, clf_path: str, texts: List[str], batch_size: int) -> dict:
+    """Runs inside the worker process."""
+    import joblib
+    import numpy as np
+    import sklearn.feature_extraction.text  # noqa: F401
+    import sklearn.linear_model  # noqa: F401  (import cost is not model memory)
+
+    rss0 = _rss_mb()
+    vec = joblib.load(vec_path)
+    clf = joblib.load(clf_path)
+    model_rss = _rss_mb() - rss0
+
+    for t in texts[:20]:  # warm-up
+        clf.predict_proba(vec.transform([t]))
+    times = []
+    for t in texts:
+        t0 = time.perf_counter()
+        clf.predict_proba(vec.transform([t]))
+        times.append((time.perf_counter() - t0) * 1000.0)
+
+    n, t0 = 0, time.perf_counter()
+    while n < 5 * len(texts) and (n == 0 or time.perf_counter() - t0 < 1.0):
+        for i in range(0, len(texts), batch_size):
+            clf.predict_proba(vec.transform(texts[i:i + batch_size]))
+        n += len(texts)
+    throughput = n / (time.perf_counter() - t0)
+
+    return {
+        "latency_p50_ms": float(np.percentile(times, 50)),
+        "latency_p99_ms": float(np.percentile(times, 99)),
+        "throughput_per_s": float(throughput),
+        "artifact_bytes": int(os.path.getsize(vec_path) + os.path.getsize(clf_path)),
+        "model_rss_mb": float(model_rss),
+        "rss_mb": float(_rss_mb()),
+    }
+
+
+def benchmark(art_dir: Path, texts: List[str], batch_size: int = 256) -> dict:
+    """Benchmark <art_dir>/{vectorizer,classifier}.joblib in a fresh interpreter."""
+    art_dir = Path(art_dir)
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump(texts, f)
+        sample_path = f.name
+    try:
+        out = subprocess.run(
+            [sys.executable, "-m", "ml.benchmark", "--worker",
+             "--artifacts", str(art_dir), "--sample", sample_path,
+             "--batch_size", str(batch_size)],
+            check=True, capture_output=True, text=True,
+            cwd=Path(__file__).resolve().parents[1],
+        ).stdout
+    finally:
+        os.unlink(sample_path)
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def production_baseline(model_name: str, texts: List[str], batch_size: int = 256) -> Optional[dict]:
+    """
+    Benchmark the registry's Production version, or None if there is none.
+    Registry and download errors propagate: the caller must not read them as
+    "nothing to compare against".
+    """
+    import mlflow
+    from mlflow import MlflowClient
+    from mlflow.exceptions import MlflowException
+
+    try:
+        versions = MlflowClient().get_latest_versions(model_name, stages=["Production"])
+    except MlflowException as e:
+        if e.error_code == "RESOURCE_DOES_NOT_EXIST":  # first ever registration
+            return None
+        raise
+    if not versions:
+        return None
+    with tempfile.TemporaryDirectory() as d:
+        local = mlflow.artifacts.download_artifacts(
+            run_id=versions[0].run_id, artifact_path="artifacts", dst_path=d
+        )
+        res = benchmark(Path(local), texts, batch_size)
+    res["version"] = str(versions[0].version)
+    return res
+
+
+def promotion_gate(model_name: str, candidate: dict, texts: List[str],
+                   budgets: Dict[str, float]) -> List[str]:
+    """
+    Gate a candidate's benchmark against the Production version inside the
+    active MLflow run (baseline_* metrics, promotion_refused tag). Returns the
+    violations; fails closed when Production can't be benchmarked.
+    """
+    import mlflow
+
+    try:
+        baseline = production_baseline(model_name, texts)
+    except Exception as e:
+        baseline = None
+        refused = [f"could not benchmark the Production version ({e}); "
+                   "fix the registry or pass --no_gate"]
+    else:
+        refused = []
+    if baseline is not None:
+        mlflow.log_param("baseline_version", baseline["version"])
+        mlflow.log_metrics({f"baseline_{k}": v for k, v in baseline.items() if k != "version"})
+        refused = check_budgets(candidate, baseline, budgets)
+    if refused:
+        mlflow.set_tag("promotion_refused", "; ".join(refused))
+        against = f" v{baseline['version']}" if baseline else ""
+        print(f"✖ Promotion refused vs Production{against}:")
+        for r in refused:
+            print(f"   - {r}")
+    return refused
+
+
+def check_budgets(candidate: dict, baseline: dict, budgets: Dict[str, float]) -> List[str]:
+    """Human-readable violations; empty means the candidate may be promoted."""
+    out = []
+    for k, ratio in budgets.items():
+        new, old = candidate.get(k), baseline.get(k)
+        if new is None or not old:
+            continue
+        if k in HIGHER_IS_BETTER:
+            if new < old * ratio:
+                out.append(f"{k} {new:.4g} < {ratio:g} x {old:.4g}")
+        elif new > old * ratio:
+            out.append(f"{k} {new:.4g} > {ratio:g} x {old:.4g}")
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--artifacts", default="api/app/artifacts")
+    parser.add_argument("--sample", default=None, help="JSON list of texts (default: --data)")
+    parser.add_argument("--data", default="ml/data/train.csv")
+    parser.add_argument("--sample_size", type=int, default=1000)
+    parser.add_argument("--batch_size", type=int, default=256)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    art = Path(args.artifacts)
+    if args.worker:
+        texts = json.loads(Path(args.sample).read_text(encoding="utf-8"))
+        res = _measure(str(art / "vectorizer.joblib"), str(art / "classifier.joblib"),
+                       texts, args.batch_size)
+        print(json.dumps(res))
+        return
+
+    if args.sample:
+        texts = json.loads(Path(args.sample).read_text(encoding="utf-8"))
+    else:
+        from ml.train import load_data
+
+        texts = load_data(args.data)[0]
+    print(json.dumps(benchmark(art, fixed_sample(texts, args.sample_size), args.batch_size),
+                     indent=2))
+
+
+if __name__ == "__main__":
+    main()
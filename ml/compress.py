@@ -0,0 +1,155 @@
+# ml/compress.py
+"""
+Post-training compression of the TF-IDF + logistic regression model.
+
+Features whose coefficient magnitude is below ``threshold`` (or outside the
+``top_k`` largest) are dropped from *both* the vectorizer vocabulary and the
+coefficient matrix, and the remaining idf/coef/intercept arrays are stored as
+float32; the vectorizer also emits float32 rows. Dropped n-grams contributed
+~0 to the logit, but they did count towards each row's L2 norm, so
+probabilities shift slightly: the compressed model is re-validated and the
+caller decides whether the val_f1 trade is worth it.
+
+profile() reports what matters for memory-constrained replicas: serialized
+size, load time, single-item latency and val_f1.
+
+    python -m ml.compress --top_k 5000 20000 50000   # sweep, one MLflow run each
+    python -m ml.compress --threshold 0.05 --out api/app/artifacts_small
+"""
+import argparse
+import copy
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+import joblib
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics import f1_score
+
+
+def kept_features(coef: np.ndarray, threshold: Optional[float] = None,
+                  top_k: Optional[int] = None) -> np.ndarray:
+    """Sorted column indices to keep (max |coef| over classes)."""
+    mag = np.abs(np.atleast_2d(coef)).max(axis=0)
+    keep = np.ones(mag.shape[0], dtype=bool)
+    if threshold is not None:
+        keep &= mag >= threshold
+    if top_k is not None and top_k < keep.sum():
+        order = np.argsort(-np.where(keep, mag, -1.0), kind="stable")
+        keep = np.zeros_like(keep)
+        keep[order[:top_k]] = True
+    return np.flatnonzero(keep)
+
+
+def compress(vec: TfidfVectorizer, clf, threshold: Optional[float] = None,
+             top_k: Optional[int] = None):
+    """Return (vec, clf) restricted to the kept features, in float32."""
+    keep = kept_features(clf.coef_, threshold, top_k)
+    terms = vec.get_feature_names_out()[keep]
+
+    params = vec.get_params()
+    params.update(vocabulary={t: i for i, t in enumerate(terms)}, dtype=np.float32)
+    small_vec = TfidfVectorizer(**params)
+    small_vec.idf_ = vec.idf_[keep].astype(np.float32)
+
+    small_clf = copy.copy(clf)
+    small_clf.coef_ = np.ascontiguousarray(clf.coef_[:, keep], dtype=np.float32)
+    small_clf.intercept_ = np.asarray(clf.intercept_, dtype=np.float32)
+    small_clf.n_features_in_ = len(keep)
+    return small_vec, small_clf
+
+
+def profile(vec, clf, texts, labels, n_latency: int = 200) -> dict:
+    """Serialized size, load time, single-item p50 latency and F1 on (texts, labels)."""
+    with tempfile.TemporaryDirectory() as d:
+        vp, cp = Path(d) / "vectorizer.joblib", Path(d) / "classifier.joblib"
+        joblib.dump(vec, vp)
+        joblib.dump(clf, cp)
+        size = vp.stat().st_size + cp.stat().st_size
+        t0 = time.perf_counter()
+        joblib.load(vp)
+        joblib.load(cp)
+        load_ms = (time.perf_counter() - t0) * 1000.0
+
+    sample = [texts[i % len(texts)] for i in range(n_latency)]
+    times = []
+    for t in sample:
+        t0 = time.perf_counter()
+        clf.predict_proba(vec.transform([t]))
+        times.append((time.perf_counter() - t0) * 1000.0)
+
+    pred = np.asarray(clf.predict(vec.transform(texts)))
+    average = "binary" if pred.ndim == 1 else "macro"  # multi-label: mean over heads
+    return {
+        "n_features": int(clf.coef_.shape[1]),
+        "model_bytes": int(size),
+        "load_ms": float(load_ms),
+        "latency_p50_ms": float(np.percentile(times, 50)),
+        "val_f1": float(f1_score(labels, pred, average=average, zero_division=0)),
+    }
+
+
+def log_comparison(before: dict, after: dict):
+    """Log both profiles to the active MLflow run as full_* / compressed_* metrics."""
+    import mlflow
+
+    mlflow.log_metrics({f"full_{k}": v for k, v in before.items()})
+    mlflow.log_metrics({f"compressed_{k}": v for k, v in after.items()})
+
+
+def main():
+    from ml.train import load_data, split
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--artifacts", default="api/app/artifacts")
+    parser.add_argument("--data", default="ml/data/train.csv", help="CSV with text,label")
+    parser.add_argument("--seed", type=int, default=42, help="same split seed as ml.train")
+    parser.add_argument("--threshold", type=float, default=None)
+    parser.add_argument("--top_k", type=int, nargs="*", default=[None])
+    parser.add_argument("--out", default=None, help="write the compressed artifacts here")
+    parser.add_argument("--no_mlflow", action="store_true")
+    args = parser.parse_args()
+    if args.out and len(args.top_k) > 1:
+        raise SystemExit("--out takes a single --top_k")
+
+    art = Path(args.artifacts)
+    vec = joblib.load(art / "vectorizer.joblib")
+    clf = joblib.load(art / "classifier.joblib")
+    heads = getattr(clf, "labels", None)
+    if heads:  # multi-label model: validate every head
+        from ml.preprocess import load_dataset
+
+        df = load_dataset(args.data, labels=heads)
+        data = df["text"].tolist(), df[list(heads)].to_numpy()
+    else:
+        data = load_data(args.data)
+    _, X_val, _, y_val = split(*data, seed=args.seed)
+    before = profile(vec, clf, X_val, y_val)
+    print(f"[compress] full        {before}")
+
+    if not args.no_mlflow:
+        import mlflow
+
+        mlflow.set_tracking_uri(os.getenv("MLFLOW_TRACKING_URI", "http://127.0.0.1:5000"))
+        mlflow.set_experiment(os.getenv("MLFLOW_EXPERIMENT_NAME", "toxic-comment"))
+
+    for k in args.top_k:
+        small_vec, small_clf = compress(vec, clf, args.threshold, k)
+        after = profile(small_vec, small_clf, X_val, y_val)
+        print(f"[compress] top_k={k} threshold={args.threshold}  {after}")
+        if not args.no_mlflow:
+            with mlflow.start_run(run_name=f"compress-top{k}-thr{args.threshold}"):
+                mlflow.log_params({"top_k": k, "threshold": args.threshold})
+                log_comparison(before, after)
+        if args.out:
+            out = Path(args.out)
+            out.mkdir(parents=True, exist_ok=True)
+            joblib.dump(small_vec, out / "vectorizer.joblib")
+            joblib.dump(small_clf, out / "classifier.joblib")
+
+
+if __name__ == "__main__":
+    main()
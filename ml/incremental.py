@@ -0,0 +1,241 @@
+# ml/incremental.py
+"""
+Incremental model updates from /feedback rows, without a full retrain.
+
+One cycle:
+  1. pull labeled feedback rows past the high-water mark (feedback_at, id)
+     stored in <artifacts>/incremental_state.json
+  2. hold out a deterministic slice of them (by row id)
+  3. warm-start an SGD log-loss classifier from the current coefficients and
+     partial_fit it on the rest, over the *existing* TF-IDF feature space
+  4. publish (atomic joblib swap + MODEL_VERSION.txt, optionally a new MLflow
+     version and a POST to the API's /reload) only if hold-out accuracy did
+     not drop by more than --max-drop; a registry version for Production also
+     has to pass the ml/benchmark.py promotion gate (else it goes to Staging)
+
+Every step touches only the new rows, so a cycle costs time proportional to
+the feedback since the last one. The vectorizer is reused as-is: words that
+are not in the vocabulary yet only arrive with the next full ml/train.py run.
+
+    python -m ml.incremental --db $DATABASE_URL [--interval 300] [--notify-url http://api:8000]
+"""
+import argparse
+import copy
+import json
+import os
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import accuracy_score
+from sqlalchemy import create_engine, text
+
+from api.app.textnorm import normalize_batch
+from ml.benchmark import DEFAULT_BUDGETS, benchmark, fixed_sample, parse_budgets, promotion_gate
+
+STATE_FILE = "incremental_state.json"
+
+FEEDBACK_SQL = """
+SELECT id, input_text, predicted_label, feedback,
+       COALESCE(feedback_at, created_at) AS fb_at
+FROM predictions
+WHERE feedback IS NOT NULL
+  AND (COALESCE(feedback_at, created_at) > :ts
+       OR (COALESCE(feedback_at, created_at) = :ts AND id > :id))
+ORDER BY fb_at, id
+LIMIT :lim
+"""
+
+
+def load_state(art_dir: Path) -> dict:
+    p = art_dir / STATE_FILE
+    if p.exists():
+        return json.loads(p.read_text(encoding="utf-8"))
+    return {"ts": "1970-01-01 00:00:00", "id": 0, "updates": 0}
+
+
+def save_state(art_dir: Path, state: dict):
+    tmp = art_dir / (STATE_FILE + ".tmp")
+    tmp.write_text(json.dumps(state), encoding="utf-8")
+    os.replace(tmp, art_dir / STATE_FILE)
+
+
+def fetch_feedback(engine, state: dict, limit: int):
+    """Rows past the high-water mark, with the true label derived from feedback."""
+    with engine.connect() as conn:
+        rows = conn.execute(
+            text(FEEDBACK_SQL), {"ts": state["ts"], "id": state["id"], "lim": int(limit)}
+        ).fetchall()
+    ids, texts, labels = [], [], []
+    for rid, txt, pred, correct, _ in rows:
+        pred_toxic = pred == "toxic"
+        ids.append(int(rid))
+        texts.append(txt)
+        labels.append(int(pred_toxic if correct else not pred_toxic))
+    new_hwm = {"ts": str(rows[-1][4]), "id": int(rows[-1][0])} if rows else None
+    return ids, texts, labels, new_hwm
+
+
+def warm_start_sgd(clf, eta0: float = 0.05, alpha: float = 1e-5) -> SGDClassifier:
+    """
+    SGD log-loss classifier initialised from any fitted binary linear model.
+
+    Always a new object: partial_fit must not touch the published model,
+    which is still needed as the hold-out baseline.
+    """
+    if isinstance(clf, SGDClassifier):
+        return copy.deepcopy(clf)
+    sgd = SGDClassifier(loss="log_loss", learning_rate="constant", eta0=eta0, alpha=alpha)
+    sgd.coef_ = np.ascontiguousarray(clf.coef_, dtype=np.float64).copy()
+    sgd.intercept_ = np.asarray(clf.intercept_, dtype=np.float64).copy()
+    return sgd
+
+
+def update(vec, clf, ids, texts, labels, holdout_every: int = 5, epochs: int = 3):
+    """Return (new_clf, metrics); the hold-out slice is ids % holdout_every == 0."""
+    norm, _ = normalize_batch(texts)
+    X = vec.transform(norm)
+    y = np.asarray(labels)
+    hold = np.asarray(ids) % holdout_every == 0
+    old_pred = clf.predict(X[hold]) if hold.any() else None  # before any update
+
+    t0 = time.perf_counter()
+    new = warm_start_sgd(clf)
+    if (~hold).any():
+        for _ in range(epochs):
+            new.partial_fit(X[~hold], y[~hold], classes=np.array([0, 1]))
+    update_ms = (time.perf_counter() - t0) * 1000.0
+
+    metrics = {
+        "n_train": int((~hold).sum()),
+        "n_holdout": int(hold.sum()),
+        "update_ms": float(update_ms),
+    }
+    if hold.any():
+        metrics["old_acc"] = float(accuracy_score(y[hold], old_pred))
+        metrics["new_acc"] = float(accuracy_score(y[hold], new.predict(X[hold])))
+    return new, metrics
+
+
+def publish(art_dir: Path, clf, version: str):
+    """Atomically replace classifier.joblib and MODEL_VERSION.txt."""
+    tmp = art_dir / "classifier.joblib.tmp"
+    joblib.dump(clf, tmp)
+    os.replace(tmp, art_dir / "classifier.joblib")
+    tmp = art_dir / "MODEL_VERSION.txt.tmp"
+    tmp.write_text(version, encoding="utf-8")
+    os.replace(tmp, art_dir / "MODEL_VERSION.txt")
+
+
+def run_cycle(engine, art_dir: Path, limit=50_000, min_rows=20, holdout_every=5,
+              max_drop=0.02, epochs=3, register=False, notify_url=None,
+              stage="Production", budgets=None, gate=True) -> dict:
+    state = load_state(art_dir)
+    ids, texts, labels, hwm = fetch_feedback(engine, state, limit)
+    if len(ids) < min_rows:
+        return {"status": "waiting", "new_rows": len(ids)}
+
+    vec = joblib.load(art_dir / "vectorizer.joblib")
+    clf = joblib.load(art_dir / "classifier.joblib")
+    if getattr(clf, "labels", None):
+        # Feedback only says whether the toxic/non-toxic call was right
+        return {"status": "skipped", "reason": "multi-label model", "new_rows": len(ids)}
+    new, metrics = update(vec, clf, ids, texts, labels, holdout_every, epochs)
+    metrics["new_rows"] = len(ids)
+
+    accepted = metrics["n_holdout"] == 0 or metrics["new_acc"] >= metrics["old_acc"] - max_drop
+    if accepted:
+        base = (art_dir / "MODEL_VERSION.txt").read_text(encoding="utf-8").strip().split("+inc")[0]
+        version = f"{base}+inc{state['updates'] + 1}"
+        publish(art_dir, new, version)
+        state["updates"] += 1
+        metrics["model_version"] = version
+        if register:
+            _register_mlflow(art_dir, metrics, stage, texts, budgets, gate)
+        if notify_url:
+            _notify(notify_url)
+    # Rejected batches are consumed too: they'd be rejected again next time
+    state.update(hwm)
+    save_state(art_dir, state)
+    metrics["status"] = "published" if accepted else "rejected"
+    return metrics
+
+
+def _register_mlflow(art_dir: Path, metrics: dict, stage: str, texts, budgets=None,
+                     gate: bool = True):
+    """Log the published artifacts as a new registry version for hot reload."""
+    import mlflow
+
+    from ml.train import register_pyfunc
+
+    mlflow.set_experiment(os.getenv("MLFLOW_EXPERIMENT_NAME", "toxic-comment"))
+    name = os.getenv("MLFLOW_MODEL_NAME", "toxic-comment-model")
+    with mlflow.start_run(run_name="incremental-sgd"):
+        mlflow.log_metrics({k: v for k, v in metrics.items() if isinstance(v, (int, float))})
+        vec_path, clf_path = art_dir / "vectorizer.joblib", art_dir / "classifier.joblib"
+        mlflow.log_artifact(str(vec_path), artifact_path="artifacts")
+        mlflow.log_artifact(str(clf_path), artifact_path="artifacts")
+        if stage == "Production" and gate:
+            # Same serving gate as ml/train.py, on this cycle's feedback texts
+            sample = fixed_sample(texts)
+            bench = benchmark(art_dir.resolve(), sample)
+            mlflow.log_metrics({f"bench_{k}": v for k, v in bench.items()})
+            refused = promotion_gate(name, bench, sample, budgets or DEFAULT_BUDGETS)
+            if refused:
+                stage = "Staging"
+                metrics["promotion_refused"] = refused
+        metrics["mlflow_version"] = register_pyfunc(vec_path, clf_path, name, stage)
+        metrics["mlflow_stage"] = stage
+
+
+def _notify(url: str):
+    import requests
+
+    try:
+        token = os.getenv("RELOAD_TOKEN", "")
+        requests.post(f"{url.rstrip('/')}/reload", timeout=10,
+                      headers={"Authorization": f"Bearer {token}"}).raise_for_status()
+    except Exception as e:
+        print(f"[warn] reload notification failed: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--artifacts", default="api/app/artifacts")
+    parser.add_argument("--limit", type=int, default=50_000, help="max rows per cycle")
+    parser.add_argument("--min_rows", type=int, default=20)
+    parser.add_argument("--holdout_every", type=int, default=5)
+    parser.add_argument("--max_drop", type=float, default=0.02)
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--register", action="store_true",
+                        help="also register a new MLflow version (uses MLFLOW_TRACKING_URI)")
+    parser.add_argument("--stage", default="Production", help="registry stage for --register")
+    parser.add_argument("--budgets", default=os.getenv("PROMOTION_BUDGETS"),
+                        help="promotion gate budgets for --stage Production (see ml/benchmark.py)")
+    parser.add_argument("--no_gate", action="store_true",
+                        help="register to Production without the benchmark gate")
+    parser.add_argument("--notify-url", dest="notify_url", default=None)
+    parser.add_argument("--interval", type=float, default=0, help="seconds; 0 = run once")
+    args = parser.parse_args()
+
+    if not args.db:
+        raise SystemExit("--db or DATABASE_URL is required")
+    budgets = parse_budgets(args.budgets)
+    engine = create_engine(args.db, pool_pre_ping=True, future=True)
+    art_dir = Path(args.artifacts)
+    while True:
+        t0 = time.perf_counter()
+        res = run_cycle(engine, art_dir, args.limit, args.min_rows, args.holdout_every,
+                        args.max_drop, args.epochs, args.register, args.notify_url, args.stage,
+                        budgets, not args.no_gate)
+        print(f"[incremental] {res} ({(time.perf_counter() - t0) * 1000:.0f} ms)")
+        if args.interval <= 0:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
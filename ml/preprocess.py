@@ -1,17 +1,40 @@
+from typing import Optional, Sequence
+
 import pandas as pd
 
+from api.app.textnorm import normalize_batch
+
 
-def load_dataset(path: str) -> pd.DataFrame:
+def load_dataset(path: str, labels: Optional[Sequence[str]] = None) -> pd.DataFrame:
     """
     Supports either:
       - columns: text,label  (label ∈ {0,1})
       - Jigsaw subset columns: comment_text,toxic (toxic ∈ {0,1})
+
+    With ``labels`` (e.g. api.app.multilabel.LABELS) the Jigsaw label columns
+    are kept instead, and the result has columns text,<labels...>.
+
+    Text is normalized (see api/app/textnorm.py) and rows whose normalized
+    text is a duplicate of an earlier row are dropped.
     """
     df = pd.read_csv(path)
+    if labels is not None:
+        if "comment_text" in df.columns:
+            df = df.rename(columns={"comment_text": "text"})
+        missing = [c for c in ["text", *labels] if c not in df.columns]
+        if missing:
+            raise ValueError(f"CSV is missing columns: {missing}")
+        df = df.dropna(subset=["text"])
+        df[list(labels)] = df[list(labels)].astype(int)
+        df["text"], hashes = normalize_batch(df["text"].astype(str))
+        df = df[~pd.Series(hashes, index=df.index).duplicated()]
+        return df[["text", *labels]].reset_index(drop=True)
     if "comment_text" in df.columns and "toxic" in df.columns:
         df = df.rename(columns={"comment_text": "text", "toxic": "label"})
     if not {"text", "label"}.issubset(df.columns):
         raise ValueError("CSV must have 'text' and 'label' columns (or 'comment_text' and 'toxic').")
     df = df.dropna(subset=["text"])
     df["label"] = df["label"].astype(int)
-    return df[["text", "label"]]
+    df["text"], hashes = normalize_batch(df["text"].astype(str))
+    df = df[~pd.Series(hashes, index=df.index).duplicated()]
+    return df[["text", "label"]].reset_index(drop=True)
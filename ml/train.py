@@ -1,6 +1,8 @@
 # ml/train.py
 import argparse
 import os
+import shutil
+import tempfile
 import time
 from pathlib import Path
 
@@ -16,19 +18,38 @@ import mlflow
 from mlflow import MlflowClient
 import mlflow.sklearn
 
+from api.app.multilabel import LABELS, MultiLabelLinear
+from api.app.textnorm import normalize_batch
+from ml.benchmark import benchmark, fixed_sample, parse_budgets, promotion_gate
+from ml.compress import compress, log_comparison, profile
+from ml.preprocess import load_dataset
+
 
 def load_data(csv_path: str):
-    """CSV must have columns: 'text', 'label' (0/1)."""
+    """
+    CSV must have columns: 'text', 'label' (0/1).
+
+    Texts are normalized with the same function the API uses at serving time,
+    and duplicates (by normalized-text hash) are dropped, keeping the first.
+    """
     df = pd.read_csv(csv_path)
     if "text" not in df.columns or "label" not in df.columns:
         raise ValueError("CSV must have columns: 'text', 'label'")
-    return df["text"].astype(str).tolist(), df["label"].astype(int).tolist()
+    texts, hashes = normalize_batch(df["text"].astype(str))
+    keep = ~pd.Series(hashes).duplicated().to_numpy()
+    labels = df["label"].astype(int).to_numpy()
+    return [t for t, k in zip(texts, keep) if k], labels[keep].tolist()
+
+
+def split(X, y, seed=42):
+    """The train/validation split used by train(); deterministic for a seed."""
+    y_arr = np.asarray(y)
+    strat = y_arr if y_arr.ndim == 1 else y_arr[:, 0]  # multi-label: stratify on 'toxic'
+    return train_test_split(X, y, test_size=0.2, random_state=seed, stratify=strat)
 
 
 def train(X, y, min_df=1, ngram_max=2, C=1.0, max_iter=400, seed=42):
-    X_train, X_val, y_train, y_val = train_test_split(
-        X, y, test_size=0.2, random_state=seed, stratify=y
-    )
+    X_train, X_val, y_train, y_val = split(X, y, seed)
 
     vec = TfidfVectorizer(min_df=min_df, ngram_range=(1, ngram_max))
     clf = LogisticRegression(max_iter=max_iter, C=C)
@@ -49,6 +70,101 @@ def train(X, y, min_df=1, ngram_max=2, C=1.0, max_iter=400, seed=42):
     return vec, clf, metrics
 
 
+def train_multilabel(X, Y, labels=LABELS, min_df=1, ngram_max=2, C=1.0, max_iter=400, seed=42):
+    """
+    One shared TfidfVectorizer, one LogisticRegression per label, stacked into
+    a MultiLabelLinear. ``Y`` is (n_samples, len(labels)) of 0/1.
+    """
+    X_train, X_val, Y_train, Y_val = split(X, np.asarray(Y), seed)
+
+    vec = TfidfVectorizer(min_df=min_df, ngram_range=(1, ngram_max))
+    t0 = time.perf_counter()
+    Xtr = vec.fit_transform(X_train)
+    heads = []
+    for j in range(len(labels)):
+        y_j = Y_train[:, j]
+        if y_j.min() == y_j.max():
+            # Label never (or always) seen: constant head at the clipped prior
+            p = float(np.clip(y_j.mean(), 1e-4, 1 - 1e-4))
+            head = LogisticRegression()
+            head.coef_ = np.zeros((1, Xtr.shape[1]))
+            head.intercept_ = np.array([np.log(p / (1 - p))])
+        else:
+            head = LogisticRegression(max_iter=max_iter, C=C).fit(Xtr, y_j)
+        heads.append(head)
+    clf = MultiLabelLinear.from_estimators(labels, heads)
+    fit_ms = (time.perf_counter() - t0) * 1000.0
+
+    P = clf.predict(vec.transform(X_val))
+    metrics = {"fit_ms": float(fit_ms)}
+    for j, lbl in enumerate(labels):
+        metrics[f"val_f1_{lbl}"] = float(f1_score(Y_val[:, j], P[:, j], zero_division=0))
+    metrics["val_f1_macro"] = float(np.mean([metrics[f"val_f1_{lbl}"] for lbl in labels]))
+    # 'toxic' head under the single-label names, for comparing with older runs
+    metrics["val_acc"] = float(accuracy_score(Y_val[:, 0], P[:, 0]))
+    metrics["val_f1"] = metrics[f"val_f1_{labels[0]}"]
+    return vec, clf, metrics
+
+
+def register_pyfunc(vec_path, clf_path, registered_model_name, stage):
+    """
+    Log vectorizer+classifier as a pyfunc model in the active run, register
+    it and move the new version to ``stage``. Returns the version number.
+    """
+    # Defined in here so cloudpickle stores the class by value: the API image
+    # only ships api/, so it can't import ml.train when loading the model.
+    class ToxicCommentModel(mlflow.pyfunc.PythonModel):
+        def load_context(self, context):
+            import joblib
+            from pathlib import Path
+            v = joblib.load(Path(context.artifacts["vec"]))
+            c = joblib.load(Path(context.artifacts["clf"]))
+            self.vec = v
+            self.clf = c
+
+        def predict(self, context, model_input):
+            # expects a list/Series of strings
+            X = self.vec.transform(list(model_input))
+            heads = getattr(self.clf, "labels", None)
+            if heads:  # multi-label: 'prob' is the first head, plus prob_<label>
+                P = self.clf.predict_proba(X)
+                out = pd.DataFrame({f"prob_{h}": P[:, j] for j, h in enumerate(heads)})
+                out.insert(0, "prob", P[:, 0])
+                out.insert(0, "label", (P[:, 0] >= 0.5).astype(int))
+                return out
+            probs = self.clf.predict_proba(X)[:, 1]
+            labels = (probs >= 0.5).astype(int)
+            return pd.DataFrame({"label": labels, "prob": probs})
+
+    mlflow.pyfunc.log_model(
+        artifact_path="model",
+        python_model=ToxicCommentModel(),
+        artifacts={"vec": str(vec_path), "clf": str(clf_path)},
+        registered_model_name=registered_model_name,
+    )
+
+    run_id = mlflow.active_run().info.run_id
+    client = MlflowClient()
+
+    versions = client.search_model_versions(f"name='{registered_model_name}'")
+    my_version = None
+    for v in versions:
+        if v.run_id == run_id:
+            my_version = v.version
+            break
+
+    if my_version is None:
+        raise RuntimeError("Could not find model version we just logged.")
+
+    client.transition_model_version_stage(
+        name=registered_model_name,
+        version=my_version,
+        stage=stage,
+        archive_existing_versions=False,
+    )
+    return my_version
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--data", default="ml/data/train.csv", help="CSV with text,label")
@@ -58,7 +174,21 @@ def main():
     parser.add_argument("--max_iter", type=int, default=400)
     parser.add_argument("--seed", type=int, default=42)
     parser.add_argument("--stage", default="Production", choices=["Staging", "Production"])
+    parser.add_argument("--multilabel", action="store_true",
+                        help="train all Jigsaw labels (needs comment_text + label columns)")
+    # Optional post-training compression (see ml/compress.py)
+    parser.add_argument("--compress_threshold", type=float, default=None,
+                        help="drop features with |coef| below this")
+    parser.add_argument("--compress_top_k", type=int, default=None,
+                        help="keep only the K features with the largest |coef|")
+    # Promotion gate (see ml/benchmark.py): ratios vs the current Production version
+    parser.add_argument("--budgets", default=os.getenv("PROMOTION_BUDGETS"),
+                        help='e.g. "latency_p99_ms=1.3,artifact_bytes=2" '
+                             "(defaults in ml/benchmark.py)")
+    parser.add_argument("--bench_sample_size", type=int, default=1000)
+    parser.add_argument("--no_gate", action="store_true", help="promote without the benchmark gate")
     args = parser.parse_args()
+    budgets = parse_budgets(args.budgets)
 
     # --------- MLflow configuration ---------
     tracking_uri = os.getenv("MLFLOW_TRACKING_URI", "http://127.0.0.1:5000")
@@ -70,7 +200,11 @@ def main():
     registered_model_name = os.getenv("MLFLOW_MODEL_NAME", "toxic-comment-model")
 
     # --------- Train ---------
-    X, y = load_data(args.data)
+    if args.multilabel:
+        df = load_dataset(args.data, labels=LABELS)
+        X, y = df["text"].tolist(), df[list(LABELS)].to_numpy()
+    else:
+        X, y = load_data(args.data)
 
     with mlflow.start_run(run_name="tfidf-logreg"):
         # Log params
@@ -81,10 +215,11 @@ def main():
                 "C": args.C,
                 "max_iter": args.max_iter,
                 "seed": args.seed,
+                "multilabel": args.multilabel,
             }
         )
 
-        vec, clf, metrics = train(
+        vec, clf, metrics = (train_multilabel if args.multilabel else train)(
             X,
             y,
             min_df=args.min_df,
@@ -97,11 +232,25 @@ def main():
         # Log metrics
         mlflow.log_metrics(metrics)
 
-        # Save artifacts locally (useful fallback for the API)
+        if args.compress_threshold is not None or args.compress_top_k is not None:
+            _, X_val, _, y_val = split(X, y, args.seed)
+            before = profile(vec, clf, X_val, y_val)
+            vec, clf = compress(vec, clf, args.compress_threshold, args.compress_top_k)
+            after = profile(vec, clf, X_val, y_val)
+            mlflow.log_params({"compress_threshold": args.compress_threshold,
+                               "compress_top_k": args.compress_top_k})
+            log_comparison(before, after)
+            print(f"✔ Compressed {before['n_features']} -> {after['n_features']} features, "
+                  f"{before['model_bytes']} -> {after['model_bytes']} bytes, "
+                  f"val_f1 {before['val_f1']:.4f} -> {after['val_f1']:.4f}")
+
+        # Candidate goes to a scratch dir; api/app/artifacts (the API's local
+        # fallback) only gets it once it passed the promotion gate
         art_dir = Path("api/app/artifacts")
         art_dir.mkdir(parents=True, exist_ok=True)
-        vec_path = art_dir / "vectorizer.joblib"
-        clf_path = art_dir / "classifier.joblib"
+        cand_dir = Path(tempfile.mkdtemp(prefix="candidate-"))
+        vec_path = cand_dir / "vectorizer.joblib"
+        clf_path = cand_dir / "classifier.joblib"
         joblib.dump(vec, vec_path)
         joblib.dump(clf, clf_path)
 
@@ -109,56 +258,35 @@ def main():
         mlflow.log_artifact(str(vec_path), artifact_path="artifacts")
         mlflow.log_artifact(str(clf_path), artifact_path="artifacts")
 
-        # Log a unified pyfunc model so the API can load from the MLflow Registry
-        class ToxicCommentModel(mlflow.pyfunc.PythonModel):
-            def load_context(self, context):
-                import joblib
-                from pathlib import Path
-                v = joblib.load(Path(context.artifacts["vec"]))
-                c = joblib.load(Path(context.artifacts["clf"]))
-                self.vec = v
-                self.clf = c
-
-            def predict(self, context, model_input):
-                # expects a list/Series of strings
-                X = self.vec.transform(list(model_input))
-                probs = self.clf.predict_proba(X)[:, 1]
-                labels = (probs >= 0.5).astype(int)
-                return pd.DataFrame({"label": labels, "prob": probs})
-
-        pyfunc_info = mlflow.pyfunc.log_model(
-            artifact_path="model",
-            python_model=ToxicCommentModel(),
-            artifacts={"vec": str(vec_path), "clf": str(clf_path)},
-            registered_model_name=registered_model_name,
-        )
-
-        run_id = mlflow.active_run().info.run_id
-        client = MlflowClient()
-
-        versions = client.search_model_versions(f"name='{registered_model_name}'")
-        my_version = None
-        for v in versions:
-            if v.run_id == run_id:
-                my_version = v.version
-                break
+        # Serving benchmark on a fixed sample; gate promotion on Production's numbers
+        _, X_val, _, _ = split(X, y, args.seed)
+        sample = fixed_sample(X_val, args.bench_sample_size)
+        bench = benchmark(cand_dir, sample)
+        mlflow.log_metrics({f"bench_{k}": v for k, v in bench.items()})
+        print(f"✔ Benchmark: {bench}")
 
-        if my_version is None:
-            raise RuntimeError("Could not find model version we just logged.")
+        stage = args.stage
+        refused = []
+        if stage == "Production" and not args.no_gate:
+            refused = promotion_gate(registered_model_name, bench, sample, budgets)
+            if refused:
+                stage = "Staging"
 
-        client.transition_model_version_stage(
-            name=registered_model_name,
-            version=my_version,
-            stage=args.stage,
-            archive_existing_versions=False,
-        )
-
-        version_str = f"mlflow-{registered_model_name}-v{my_version}-{args.stage.lower()}"
-        (art_dir / "MODEL_VERSION.txt").write_text(version_str, encoding="utf-8")
-        print(f"✔ Registered '{registered_model_name}' v{my_version} -> {args.stage}")
+        # Log a unified pyfunc model so the API can load from the MLflow Registry
+        my_version = register_pyfunc(vec_path, clf_path, registered_model_name, stage)
+
+        if not refused:
+            for p in (vec_path, clf_path):
+                shutil.copy2(p, art_dir / p.name)
+            version_str = f"mlflow-{registered_model_name}-v{my_version}-{stage.lower()}"
+            (art_dir / "MODEL_VERSION.txt").write_text(version_str, encoding="utf-8")
+        shutil.rmtree(cand_dir, ignore_errors=True)
+        print(f"✔ Registered '{registered_model_name}' v{my_version} -> {stage}")
         print(f"   Run: {mlflow.get_artifact_uri()}")
 
     print("✅ Training + MLflow logging complete.")
+    if refused:
+        raise SystemExit(2)
 
 
 if __name__ == "__main__":
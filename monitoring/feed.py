@@ -0,0 +1,191 @@
+# monitoring/feed.py
+"""
+Shared, incrementally maintained view of the latest predictions.
+
+One PredictionFeed per monitoring process polls the database from a
+background thread:
+
+- new rows:        ``WHERE id > :last_id - overlap_ids``   (primary-key range scan)
+- feedback edits:  ``WHERE feedback_at > :last_fb - overlap_s``  (partial index, API DDL)
+
+The overlaps exist because BIGSERIAL ids (and NOW() feedback timestamps) are
+taken when a transaction starts but become visible when it commits, so under
+concurrent /predict inserts a lower id can appear after a higher one was
+already read. Each poll re-scans that small range; ids already ingested
+(tracked while they are inside the overlap) are skipped and re-read feedback
+is only applied if it changed.
+
+and keeps the most recent ``window`` rows plus running aggregates (count,
+latency sum, label counts, feedback accuracy, text length) that are adjusted
+as rows enter and leave the window. ``engine`` may be a callable returning the
+engine to use for each poll (``Database.reader`` routes to a fresh replica).
+Every Streamlit session reads
+``snapshot()``, so database load is one cheap poll per ``interval_s`` no
+matter how many dashboards are open.
+"""
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional, Set
+
+import pandas as pd
+from sqlalchemy import text
+
+COLUMNS = ["id", "input_text", "predicted_label", "probability", "latency_ms",
+           "model_version", "feedback", "created_at"]
+
+_SELECT = "SELECT " + ", ".join(COLUMNS) + ", feedback_at FROM predictions "
+INITIAL_SQL = _SELECT + "ORDER BY id DESC LIMIT :lim"
+NEW_ROWS_SQL = _SELECT + "WHERE id > :last_id ORDER BY id LIMIT :lim"
+EPOCH = "1970-01-01 00:00:00+00:00"
+FEEDBACK_SQL = (
+    "SELECT id, feedback, feedback_at FROM predictions "
+    "WHERE feedback_at > :fb_ts AND id >= :min_id ORDER BY feedback_at"
+)
+
+
+class PredictionFeed:
+    def __init__(self, engine, window: int = 5000, interval_s: float = 0.5,
+                 batch: int = 5000, overlap_ids: int = 200, overlap_s: float = 5.0):
+        self.engine = engine if callable(engine) else (lambda: engine)
+        self.window = int(window)
+        self.interval_s = float(interval_s)
+        self.batch = int(batch)
+        self.overlap_ids = int(overlap_ids)
+        self.overlap_s = float(overlap_s)
+        self.rows: "OrderedDict[int, list]" = OrderedDict()
+        self.last_id = 0
+        self.last_fb = None
+        self._seen: Set[int] = set()  # ingested ids inside the id overlap
+        self.version = 0  # bumped on every change; keys the snapshot cache
+        self.polls = 0
+        self.last_poll: Optional[float] = None
+        self.error: Optional[str] = None
+        self._agg = {"latency_sum": 0.0, "len_sum": 0, "fb_n": 0, "fb_correct": 0}
+        self._labels: Counter = Counter()
+        self._lock = threading.Lock()
+        self._snap = (-1, None)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ---- aggregates ----
+    def _add(self, row: list, sign: int):
+        a = self._agg
+        a["latency_sum"] += sign * float(row[4])
+        a["len_sum"] += sign * len(str(row[1]))
+        self._labels[row[2]] += sign
+        self._add_feedback(row[6], sign)
+
+    def _add_feedback(self, fb, sign: int):
+        if fb is not None:
+            self._agg["fb_n"] += sign
+            self._agg["fb_correct"] += sign * int(bool(fb))
+
+    def _ingest(self, new_rows, fb_rows):
+        with self._lock:
+            changed = False
+            for r in new_rows:
+                row = list(r[:len(COLUMNS)])
+                if row[0] in self._seen or row[0] in self.rows:
+                    continue  # re-read through the overlap
+                self.rows[row[0]] = row
+                self._seen.add(row[0])
+                self._add(row, +1)
+                self.last_id = max(self.last_id, row[0])
+                self._bump_fb(r[-1])
+                changed = True
+            while len(self.rows) > self.window:
+                _, old = self.rows.popitem(last=False)
+                self._add(old, -1)
+            floor = self.last_id - self.overlap_ids
+            self._seen = {i for i in self._seen if i > floor}
+            for rid, fb, fb_at in fb_rows:
+                row = self.rows.get(rid)
+                if row is not None and row[6] != fb:
+                    self._add_feedback(row[6], -1)
+                    row[6] = fb
+                    self._add_feedback(fb, +1)
+                    changed = True
+                self._bump_fb(fb_at)
+            if changed:
+                self.version += 1
+
+    def _bump_fb(self, ts):
+        if ts is not None and (self.last_fb is None or ts > self.last_fb):
+            self.last_fb = ts
+
+    def _fb_from(self):
+        if self.last_fb is None:
+            return EPOCH
+        if isinstance(self.last_fb, datetime):  # PostgreSQL TIMESTAMPTZ
+            return self.last_fb - timedelta(seconds=self.overlap_s)
+        return self.last_fb  # driver returned text (SQLite): no overlap arithmetic
+
+    # ---- polling ----
+    def poll_once(self):
+        with self.engine().connect() as conn:
+            if self.last_id == 0 and not self.rows:
+                new = conn.execute(text(INITIAL_SQL), {"lim": self.window}).fetchall()[::-1]
+                fb = []
+            else:
+                new = conn.execute(text(NEW_ROWS_SQL), {
+                    "last_id": max(0, self.last_id - self.overlap_ids),
+                    "lim": self.batch + self.overlap_ids,
+                }).fetchall()
+                fb = []
+                if self.rows:
+                    fb = conn.execute(text(FEEDBACK_SQL), {
+                        "fb_ts": self._fb_from(),
+                        "min_id": min(self.rows),
+                    }).fetchall()
+        self._ingest(new, fb)
+        self.polls += 1
+        self.last_poll = time.time()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+                self.error = None
+            except Exception as e:
+                self.error = str(e)
+            self._stop.wait(self.interval_s)
+
+    def start(self) -> "PredictionFeed":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="prediction-feed", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    # ---- readers ----
+    def stats(self) -> dict:
+        with self._lock:
+            n = len(self.rows)
+            a = self._agg
+            return {
+                "n": n,
+                "avg_latency_ms": a["latency_sum"] / n if n else None,
+                "toxic_share": self._labels["toxic"] / n if n else None,
+                "accuracy": a["fb_correct"] / a["fb_n"] if a["fb_n"] else None,
+                "avg_text_len": a["len_sum"] / n if n else None,
+                "labels": {k: v for k, v in self._labels.items() if v},
+                "last_id": self.last_id,
+                "version": self.version,
+            }
+
+    def snapshot(self) -> pd.DataFrame:
+        """Window as a DataFrame (oldest first); built once per change, shared by all sessions."""
+        with self._lock:
+            version, df = self._snap
+            if version == self.version and df is not None:
+                return df
+            df = pd.DataFrame([list(r) for r in self.rows.values()], columns=COLUMNS)
+            if not df.empty:
+                df["created_at"] = pd.to_datetime(df["created_at"])
+                df["text_len"] = df["input_text"].astype(str).str.len()
+            self._snap = (self.version, df)
+            return df
@@ -0,0 +1,98 @@
+# tests/monitoring/test_feed.py
+import importlib.util
+from pathlib import Path
+
+from sqlalchemy import create_engine, text
+
+_spec = importlib.util.spec_from_file_location("feed", Path("monitoring/feed.py"))
+feed_mod = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(feed_mod)
+
+
+def _db(tmp_path):
+    eng = create_engine(f"sqlite:///{tmp_path / 'm.db'}")
+    with eng.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE predictions (id INTEGER PRIMARY KEY, input_text TEXT, "
+            "predicted_label TEXT, probability REAL, latency_ms REAL, model_version TEXT, "
+            "feedback BOOLEAN, feedback_at TEXT, created_at TEXT)"
+        ))
+    return eng
+
+
+def _insert(eng, ids, label="toxic", latency=10.0):
+    with eng.begin() as conn:
+        for i in ids:
+            conn.execute(
+                text("INSERT INTO predictions VALUES (:id, 'some text', :l, 0.9, :lat, 'v1', "
+                     "NULL, NULL, '2024-01-01 00:00:00')"),
+                {"id": i, "l": label, "lat": latency},
+            )
+
+
+def test_incremental_window_and_feedback(tmp_path):
+    eng = _db(tmp_path)
+    _insert(eng, range(1, 4), "toxic", 10.0)
+    feed = feed_mod.PredictionFeed(eng, window=4)
+    feed.poll_once()
+    assert feed.stats()["n"] == 3
+
+    _insert(eng, range(4, 7), "non-toxic", 20.0)
+    feed.poll_once()
+    st = feed.stats()
+    # window keeps ids 3..6; aggregates follow evictions
+    assert list(feed.rows) == [3, 4, 5, 6]
+    assert st["labels"] == {"toxic": 1, "non-toxic": 3}
+    assert st["avg_latency_ms"] == (10 + 3 * 20) / 4
+
+    with eng.begin() as conn:
+        conn.execute(text("UPDATE predictions SET feedback=1, feedback_at='2024-01-02' WHERE id=5"))
+        conn.execute(text("UPDATE predictions SET feedback=0, feedback_at='2024-01-03' WHERE id=6"))
+    feed.poll_once()
+    assert feed.stats()["accuracy"] == 0.5
+
+    df = feed.snapshot()
+    assert df["id"].tolist() == [3, 4, 5, 6]
+    assert feed.snapshot() is df  # cached until the next change
+
+
+def test_poll_cost_does_not_depend_on_viewers(tmp_path):
+    eng = _db(tmp_path)
+    _insert(eng, range(1, 50))
+    feed = feed_mod.PredictionFeed(eng, window=1000)
+    queries = []
+    from sqlalchemy import event
+    event.listen(eng, "before_cursor_execute", lambda *a: queries.append(a[2]))
+
+    feed.poll_once()
+    for _ in range(100):  # 100 dashboard sessions reading
+        feed.snapshot()
+        feed.stats()
+    assert len(queries) == 1
+
+
+def test_late_committed_ids_are_picked_up_once(tmp_path):
+    eng = _db(tmp_path)
+    _insert(eng, [1, 2, 3])
+    feed = feed_mod.PredictionFeed(eng, window=100)
+    feed.poll_once()
+    _insert(eng, [5])  # id 4 was handed out first but commits later
+    feed.poll_once()
+    assert feed.last_id == 5 and 4 not in feed.rows
+    _insert(eng, [4], latency=30.0)
+    feed.poll_once()
+    version = feed.version
+    feed.poll_once()  # re-scanning the overlap changes nothing
+    st = feed.stats()
+    assert sorted(feed.rows) == [1, 2, 3, 4, 5]
+    assert st["n"] == 5 and st["avg_latency_ms"] == (4 * 10 + 30) / 5
+    assert feed.version == version
+
+
+def test_feedback_poll_rescans_overlap_window():
+    from datetime import datetime, timedelta, timezone
+
+    feed = feed_mod.PredictionFeed(None, overlap_s=5.0)
+    assert feed._fb_from() == feed_mod.EPOCH
+    feed.last_fb = datetime(2024, 1, 2, tzinfo=timezone.utc)
+    assert feed._fb_from() == feed.last_fb - timedelta(seconds=5)
@@ -0,0 +1,61 @@
+import os
+
+os.environ["TESTING"] = "1"  # avoid DB in tests
+
+import time  # noqa: E402
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import api.app.main as api_main  # noqa: E402
+
+
+def test_overload_sheds_predict_but_health_is_served(monkeypatch):
+    ctl = api_main.admission
+    monkeypatch.setattr(ctl, "inflight", ctl.max_inflight)  # all slots busy
+    monkeypatch.setattr(ctl, "ewma_ms", 60_000.0)  # -> estimated wait >> budget
+    before = ctl.counters["shed_wait_budget"]
+    c = TestClient(api_main.app)
+
+    r = c.post("/predict", json={"text": "you are nice"})
+    assert r.status_code == 503
+    assert int(r.headers["retry-after"]) >= 1
+    assert c.get("/health").status_code == 200
+    assert c.get("/metrics").json()["admission"]["shed_wait_budget"] == before + 1
+
+
+def test_expired_client_deadline_skips_work():
+    c = TestClient(api_main.app)
+    r = c.post(
+        "/predict",
+        json={"text": "you are nice"},
+        headers={"X-Request-Deadline": str(time.time() - 1)},
+    )
+    assert r.status_code == 504
+    r = c.post("/predict", json={"text": "you are nice"}, headers={"X-Request-Timeout-Ms": "5000"})
+    assert r.status_code == 200
+
+
+def test_queued_request_gets_released_slot():
+    import asyncio
+
+    from api.app.admission import AdmissionController
+
+    async def scenario():
+        ctl = AdmissionController(max_inflight=1, queue_budget_ms=1000)
+        assert await ctl.acquire(0.1)
+        waiter = asyncio.ensure_future(ctl.acquire(1.0))
+        await asyncio.sleep(0)
+        assert ctl.stats()["queued"] == 1
+        ctl.release(5.0)
+        assert await waiter and ctl.inflight == 1
+        assert not await ctl.acquire(0.01)  # still busy -> times out
+        ctl.release(5.0)
+        assert ctl.inflight == 0
+
+    asyncio.run(scenario())
+
+
+def test_disabled_controller_reports_stats():
+    from api.app.admission import AdmissionController
+
+    assert AdmissionController(max_inflight=0).stats()["estimated_wait_ms"] == 0.0
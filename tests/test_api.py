@@ -16,3 +16,37 @@ def test_predict_happy_path():
     assert r.status_code == 200
     data = r.json()
     assert {"id","label","probability","model_version"} <= set(data.keys())
+
+def test_predict_rejects_oversized_body():
+    c = TestClient(app)
+    r = c.post("/predict", json={"text": "x" * (300 * 1024)})
+    assert r.status_code == 413
+
+def test_predict_long_text_is_truncated():
+    c = TestClient(app)
+    r = c.post("/predict", json={"text": "you are nice " * 2000})
+    assert r.status_code == 200
+    assert r.json()["truncated"] is True
+
+def test_import_does_not_load_heavy_deps():
+    import subprocess
+    import sys
+    env = {k: v for k, v in os.environ.items() if k != "MLFLOW_TRACKING_URI"}
+    out = subprocess.run(
+        [sys.executable, "-c",
+         "import sys, api.app.main; "
+         "print(sorted({'mlflow','pandas','sklearn'} & set(sys.modules)))"],
+        capture_output=True, text=True, env=env, check=True,
+    ).stdout.strip()
+    assert out == "[]"
+
+def test_reload_requires_token(monkeypatch):
+    import api.app.main as api_main
+
+    c = TestClient(app)
+    assert c.post("/reload").status_code == 403  # RELOAD_TOKEN unset: disabled
+    monkeypatch.setattr(api_main, "RELOAD_TOKEN", "s3cret")
+    assert c.post("/reload").status_code == 401
+    assert c.post("/reload", headers={"Authorization": "Bearer nope"}).status_code == 401
+    r = c.post("/reload", headers={"Authorization": "Bearer s3cret"})
+    assert r.status_code == 200 and r.json()["ok"] is True
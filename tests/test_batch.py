@@ -0,0 +1,122 @@
+import os
+
+os.environ["TESTING"] = "1"  # avoid DB in tests
+
+import pyarrow as pa  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from api.app.batch import ARROW_STREAM  # noqa: E402
+from api.app.main import app  # noqa: E402
+
+client = TestClient(app)
+
+
+def _arrow_body(texts) -> bytes:
+    table = pa.table({"text": pa.array(texts, type=pa.string())})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as w:
+        w.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def test_arrow_batch_round_trip():
+    texts = ["you are nice", "stupid idiot", "   ", None, "x" * 50_000]
+    r = client.post("/predict/batch", content=_arrow_body(texts),
+                    headers={"content-type": ARROW_STREAM})
+    assert r.status_code == 200
+    assert r.headers["content-type"] == ARROW_STREAM
+    out = pa.ipc.open_stream(r.content).read_all()
+    assert out.num_rows == len(texts)
+    assert out.schema.field("probability").type == pa.float32()
+    assert pa.types.is_dictionary(out.schema.field("label").type)
+    assert out.schema.metadata[b"model_version"] == r.headers["x-model-version"].encode()
+
+    probs = out.column("probability").to_pylist()
+    labels = out.column("label").to_pylist()
+    assert probs[2] is None and probs[3] is None and labels[2] is None
+    assert all(0.0 <= p <= 1.0 for p in (probs[0], probs[1], probs[4]))
+    assert labels[1] == ("toxic" if probs[1] >= 0.5 else "non-toxic")
+    assert out.column("truncated").to_pylist()[4] is True
+
+
+def test_arrow_matches_json_batch():
+    texts = ["you are nice", "go away idiot", "", "thanks for the fix"]
+    j = client.post("/predict/batch", json={"texts": texts}).json()
+    r = client.post("/predict/batch", content=_arrow_body(texts),
+                    headers={"content-type": ARROW_STREAM})
+    a = pa.ipc.open_stream(r.content).read_all()
+    assert j["label"] == a.column("label").to_pylist()
+    for pj, pa_ in zip(j["probability"], a.column("probability").to_pylist()):
+        assert (pj is None and pa_ is None) or abs(pj - pa_) < 1e-6
+    single = client.post("/predict", json={"text": texts[1]}).json()
+    assert abs(single["probability"] - j["probability"][1]) < 1e-6
+
+
+def test_batch_rejects_bad_input():
+    r = client.post("/predict/batch", content=b"not arrow",
+                    headers={"content-type": ARROW_STREAM})
+    assert r.status_code == 422
+    table = pa.table({"comment": ["hi"]})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as w:
+        w.write_table(table)
+    r = client.post("/predict/batch", content=sink.getvalue().to_pybytes(),
+                    headers={"content-type": ARROW_STREAM})
+    assert r.status_code == 422 and "text" in r.json()["detail"]
+    assert client.post("/predict/batch", json={"text": "hi"}).status_code == 422
+
+
+def test_batch_has_its_own_body_limit():
+    texts = ["x" * 1000] * 400  # ~400 KB, over MAX_REQUEST_BYTES
+    assert client.post("/predict", json={"text": texts[0] * 400}).status_code == 413
+    r = client.post("/predict/batch", content=_arrow_body(texts),
+                    headers={"content-type": ARROW_STREAM})
+    assert r.status_code == 200
+
+
+def test_batch_decode_and_encode_stay_off_the_event_loop(monkeypatch):
+    import asyncio
+
+    from api.app import main
+
+    seen = []
+
+    def on_loop():
+        try:
+            asyncio.get_running_loop()
+            return True
+        except RuntimeError:
+            return False
+
+    def spy(fn):
+        def wrapped(*a, **kw):
+            seen.append((fn.__name__, on_loop()))
+            return fn(*a, **kw)
+        return wrapped
+
+    monkeypatch.setattr(main, "decode_texts", spy(main.decode_texts))
+    monkeypatch.setattr(main, "encode_results", spy(main.encode_results))
+    r = client.post("/predict/batch", content=_arrow_body(["a", "b"]),
+                    headers={"content-type": ARROW_STREAM})
+    assert r.status_code == 200
+    assert seen == [("decode_texts", False), ("encode_results", False)]
+
+
+def test_batch_rows_are_logged_with_per_item_latency(monkeypatch):
+    import time
+
+    from api.app import main
+
+    real, logged = main.score_arrays, []
+
+    def slow(texts, explain=0):
+        time.sleep(0.04)
+        return real(texts, explain)
+
+    monkeypatch.setattr(main, "score_arrays", slow)
+    monkeypatch.setattr(main, "log_predictions", lambda rows, ms: logged.append((len(rows), ms)))
+    r = client.post("/predict/batch", content=_arrow_body(["a", "b", "  "]),
+                    headers={"content-type": ARROW_STREAM})
+    assert r.status_code == 200
+    (n, ms), = logged
+    assert n == 2 and 10.0 <= ms < 1000.0  # 40+ ms spread over the 3 submitted texts
@@ -0,0 +1,106 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import joblib
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+
+from ml.benchmark import benchmark, check_budgets, fixed_sample, parse_budgets
+
+REPO = Path(__file__).resolve().parents[1]
+TEXTS = ["you are an idiot", "thanks for the fix", "stupid troll", "nice edit friend"]
+
+
+def test_check_budgets_directions():
+    base = {"latency_p99_ms": 1.0, "throughput_per_s": 1000.0, "artifact_bytes": 100}
+    budgets = parse_budgets("latency_p99_ms=1.2")
+    assert check_budgets({"latency_p99_ms": 1.1, "throughput_per_s": 900.0,
+                          "artifact_bytes": 140}, base, budgets) == []
+    bad = check_budgets({"latency_p99_ms": 1.3, "throughput_per_s": 700.0,
+                         "artifact_bytes": 160}, base, budgets)
+    assert [v.split()[0] for v in bad] == ["latency_p99_ms", "throughput_per_s", "artifact_bytes"]
+    with pytest.raises(ValueError):
+        parse_budgets("val_f1=1")
+
+
+def test_benchmark_reports_serving_metrics(tmp_path):
+    vec = TfidfVectorizer().fit(TEXTS)
+    joblib.dump(vec, tmp_path / "vectorizer.joblib")
+    joblib.dump(LogisticRegression().fit(vec.transform(TEXTS), [1, 0, 1, 0]),
+                tmp_path / "classifier.joblib")
+    res = benchmark(tmp_path, fixed_sample(TEXTS, 50), batch_size=16)
+    assert set(res) == {"latency_p50_ms", "latency_p99_ms", "throughput_per_s",
+                        "artifact_bytes", "model_rss_mb", "rss_mb"}
+    assert 0 < res["latency_p50_ms"] <= res["latency_p99_ms"]
+    assert res["throughput_per_s"] > 0 and res["artifact_bytes"] > 0
+
+
+@pytest.fixture
+def train_cli(tmp_path, monkeypatch):
+    """``(run, tracking_uri)``: run(*args) trains on a tiny CSV against a file store."""
+    pytest.importorskip("mlflow")
+    monkeypatch.setenv("MLFLOW_ALLOW_FILE_STORE", "true")  # MLflow >= 3 opt-in
+    data = tmp_path / "d.csv"
+    rows = [f"you idiot number {i},1" for i in range(10)]
+    rows += [f"thanks friend {i},0" for i in range(10)]
+    data.write_text("text,label\n" + "\n".join(rows) + "\n")
+    uri = (tmp_path / "mlruns").as_uri()
+    # Own process: ml.train sets MLflow's process-global tracking URI/experiment
+    env = dict(os.environ, MLFLOW_TRACKING_URI=uri, PYTHONPATH=str(REPO))
+
+    def run(*extra):
+        return subprocess.run(
+            [sys.executable, "-m", "ml.train", "--data", str(data), "--bench_sample_size", "50",
+             *extra],
+            cwd=tmp_path, env=env, capture_output=True, text=True,
+        )
+
+    return run, uri
+
+
+def test_train_refuses_promotion_past_budget(tmp_path, train_cli):
+    import mlflow
+
+    run, uri = train_cli
+    first = run()  # nothing to compare against -> Production
+    assert first.returncode == 0, first.stderr
+    version_txt = tmp_path / "api/app/artifacts/MODEL_VERSION.txt"
+    assert version_txt.read_text().endswith("v1-production")
+
+    # A 3-gram model is bigger; a 1.0x size budget must refuse it
+    second = run("--ngram_max", "3", "--budgets", "artifact_bytes=1.0")
+    assert second.returncode == 2, second.stderr
+    assert "artifact_bytes" in second.stdout
+    versions = mlflow.MlflowClient(tracking_uri=uri).search_model_versions(
+        "name='toxic-comment-model'"
+    )
+    stages = {str(v.version): v.current_stage for v in versions}
+    assert stages == {"1": "Production", "2": "Staging"}
+    assert version_txt.read_text().endswith("v1-production")
+
+
+def test_train_fails_closed_when_production_cannot_be_benchmarked(tmp_path, train_cli):
+    import shutil
+    from urllib.parse import urlparse
+
+    import mlflow
+
+    run, uri = train_cli
+    assert run().returncode == 0
+    client = mlflow.MlflowClient(tracking_uri=uri)
+    prod_run = client.get_model_version("toxic-comment-model", "1").run_id
+    # Production's benchmark artifacts are gone -> the download raises
+    shutil.rmtree(Path(urlparse(client.get_run(prod_run).info.artifact_uri).path) / "artifacts")
+
+    second = run()
+    assert second.returncode == 2, second.stderr
+    assert "could not benchmark the Production version" in second.stdout
+    v2 = client.get_model_version("toxic-comment-model", "2")
+    assert v2.current_stage == "Staging"
+    assert "could not benchmark" in client.get_run(v2.run_id).data.tags["promotion_refused"]
+    assert (tmp_path / "api/app/artifacts/MODEL_VERSION.txt").read_text().endswith("v1-production")
+
+    assert run("--no_gate").returncode == 0  # explicit override still promotes
@@ -0,0 +1,61 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+from frontend.bulk import BulkJob, BulkScorer
+
+
+@pytest.fixture(scope="module")
+def api_url():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    env = dict(os.environ, TESTING="1")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.app.main:app", "--port", str(port),
+         "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        for _ in range(150):
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+                break
+            except OSError:
+                time.sleep(0.2)
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def _wait(job, timeout=60):
+    t0 = time.time()
+    while job.running and time.time() - t0 < timeout:
+        time.sleep(0.05)
+    assert not job.running
+
+
+def test_bulk_job_uses_stream_endpoint_in_chunks(api_url):
+    scorer = BulkScorer(api_url, chunk_size=100, workers=3)
+    texts = [f"comment {i} you idiot" if i % 3 == 0 else f"thanks {i}" for i in range(1050)]
+    job = BulkJob(scorer, texts)
+    _wait(job)
+    assert job.error is None
+    assert job.progress()["mode"] == "batch"
+    assert job.done == len(texts)
+    assert all(r and "label" in r and 0.0 <= r["probability"] <= 1.0 for r in job.results)
+
+
+def test_falls_back_to_parallel_single_calls(api_url):
+    scorer = BulkScorer(api_url, single_chunk_size=4, workers=2)
+    scorer._batch = False  # as if the API had no /predict/stream
+    job = BulkJob(scorer, ["hello", "", "go away idiot", "nice work", "ok"])
+    _wait(job)
+    assert job.progress()["mode"] == "single"
+    assert [("label" in r) for r in job.results] == [True, False, True, True, True]
+    assert "error" in job.results[1]  # empty text -> 400
@@ -0,0 +1,35 @@
+import numpy as np
+
+from ml.compress import compress, kept_features, profile
+from ml.train import train
+
+TOXIC = ["you are an idiot", "stupid awful troll", "shut up idiot", "go away moron",
+         "idiot troll stupid", "awful moron"]
+CLEAN = ["thanks for the fix", "nice edit friend", "good citation here", "welcome to wiki",
+         "thanks friend nice", "good fix here"]
+
+
+def test_kept_features_threshold_and_top_k():
+    coef = np.array([[0.5, -0.01, -2.0, 0.2, 0.0]])
+    assert kept_features(coef, threshold=0.1).tolist() == [0, 2, 3]
+    assert kept_features(coef, top_k=2).tolist() == [0, 2]
+    assert kept_features(coef, threshold=0.3, top_k=5).tolist() == [0, 2]
+
+
+def test_compress_shrinks_vocab_and_weights_consistently():
+    X = (TOXIC + CLEAN) * 3
+    y = [1 if x in TOXIC else 0 for x in X]
+    vec, clf, _ = train(X, y, max_iter=200)
+    small_vec, small_clf = compress(vec, clf, top_k=8)
+
+    assert len(small_vec.vocabulary_) == small_clf.coef_.shape[1] == 8
+    assert small_clf.coef_.dtype == np.float32 and small_vec.idf_.dtype == np.float32
+    Xs = small_vec.transform(["you idiot", "thanks friend"])
+    assert Xs.dtype == np.float32
+    full = clf.predict(vec.transform(["you idiot", "thanks friend"]))
+    assert small_clf.predict(Xs).tolist() == full.tolist()
+
+    before, after = profile(vec, clf, X, y, 20), profile(small_vec, small_clf, X, y, 20)
+    assert after["n_features"] < before["n_features"]
+    assert after["model_bytes"] < before["model_bytes"]
+    assert {"load_ms", "latency_p50_ms", "val_f1"} <= set(after)
@@ -0,0 +1,59 @@
+from sqlalchemy import text
+
+from api.app.dbrouting import Database
+
+
+def _pair(tmp_path, **kw):
+    db = Database(f"sqlite:///{tmp_path / 'primary.db'}", f"sqlite:///{tmp_path / 'replica.db'}",
+                  pool_size=2, read_pool_size=3, lag_check_s=0, **kw)
+    for eng in (db.primary(), db.replica()):
+        with eng.begin() as conn:
+            conn.execute(text("CREATE TABLE t (name TEXT)"))
+            conn.execute(text("INSERT INTO t VALUES (:n)"), {"n": eng.url.database})
+    return db
+
+
+def _where(eng):
+    with eng.connect() as conn:
+        return conn.execute(text("SELECT name FROM t")).scalar().rsplit("/", 1)[-1]
+
+
+def test_reads_go_to_fresh_replica_with_own_pool(tmp_path):
+    db = _pair(tmp_path)
+    assert _where(db.reader()) == "replica.db"
+    assert _where(db.primary()) == "primary.db"
+    assert db.replica().pool.size() == 3 and db.primary().pool.size() == 2
+    # primary keeps SQLAlchemy's default overflow for insert bursts, replica is fixed
+    assert db.primary().pool._max_overflow == 10 and db.replica().pool._max_overflow == 0
+    assert db.stats()["reads_replica"] == 1
+
+
+def test_falls_back_to_primary_when_replica_lags_or_is_down(tmp_path):
+    lag = {"s": 30.0}
+    db = _pair(tmp_path, max_lag_s=5, lag_fn=lambda eng: lag["s"])
+    assert _where(db.reader()) == "primary.db"
+    assert db.stats()["replica_lag_s"] == 30.0
+
+    lag["s"] = 0.5
+    assert _where(db.reader()) == "replica.db"
+
+    def down(eng):
+        raise RuntimeError("connection refused")
+
+    db.lag_fn = down
+    assert _where(db.reader()) == "primary.db"
+    assert db.stats()["replica_fallbacks"] == 2
+
+
+def test_lag_is_checked_at_most_every_lag_check_s(tmp_path):
+    calls = []
+    db = _pair(tmp_path, lag_fn=lambda eng: calls.append(1) or 0.0)
+    db.lag_check_s = 60
+    for _ in range(100):
+        db.reader()
+    assert len(calls) == 1
+
+
+def test_without_replica_reads_use_primary(tmp_path):
+    db = Database(f"sqlite:///{tmp_path / 'p.db'}")
+    assert db.reader() is db.primary()
@@ -0,0 +1,69 @@
+import os
+
+os.environ["TESTING"] = "1"  # avoid DB in tests
+
+import numpy as np  # noqa: E402
+import pyarrow as pa  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sklearn.feature_extraction.text import TfidfVectorizer  # noqa: E402
+from sklearn.linear_model import LogisticRegression  # noqa: E402
+
+from api.app.batch import ARROW_STREAM  # noqa: E402
+from api.app.explain import explain_rows, top_contributions  # noqa: E402
+from api.app.main import app  # noqa: E402
+
+client = TestClient(app)
+TEXTS = ["you are nice", "great work friend", "you suck idiot", "stupid idiot go away"]
+
+
+def test_contributions_sum_to_the_logit():
+    vec = TfidfVectorizer(ngram_range=(1, 2)).fit(TEXTS)
+    X = vec.transform(TEXTS)
+    clf = LogisticRegression().fit(X, [0, 0, 1, 1])
+    counts, cols, vals = top_contributions(X, clf.coef_[0], k=1000)
+    assert counts.tolist() == np.diff(X.indptr).tolist()
+    logits = clf.decision_function(X)
+    lo = 0
+    for i, n in enumerate(counts):
+        row = vals[lo:lo + n]
+        assert abs(row.sum() + clf.intercept_[0] - logits[i]) < 1e-9
+        assert np.all(np.diff(np.abs(row)) <= 0)  # strongest first
+        assert np.allclose(row, X[i, cols[lo:lo + n]].toarray()[0] * clf.coef_[0][cols[lo:lo + n]])
+        lo += n
+
+    top2 = explain_rows(vec, clf, X, k=2)
+    assert [len(r) for r in top2] == [2, 2, 2, 2]
+    names = vec.get_feature_names_out()
+    first = int(np.diff(X.indptr)[:3].sum())
+    assert top2[3][0] == (names[cols[first]], vals[first])
+
+
+def test_predict_explain_top_ngrams():
+    plain = client.post("/predict", json={"text": "stupid idiot"}).json()
+    assert plain["explanation"] is None
+
+    data = client.post("/predict", json={"text": "stupid idiot", "explain": 3}).json()
+    assert data["probability"] == plain["probability"]
+    expl = data["explanation"]
+    assert 0 < len(expl) <= 3
+    assert {"stupid", "idiot"} & {e["ngram"] for e in expl}
+    assert all(e["contribution"] > 0 for e in expl if e["ngram"] in ("stupid", "idiot"))
+    assert client.post("/predict", json={"text": "x", "explain": 10_000}).status_code == 422
+
+
+def test_batch_explain_json_and_arrow():
+    texts = ["you are nice", "", "stupid idiot"]
+    j = client.post("/predict/batch", json={"texts": texts, "explain": 2}).json()
+    assert j["explanation"][1] is None
+    assert len(j["explanation"][2]) == 2
+
+    table = pa.table({"text": texts})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as w:
+        w.write_table(table)
+    r = client.post("/predict/batch?explain=2", content=sink.getvalue().to_pybytes(),
+                    headers={"content-type": ARROW_STREAM})
+    got = pa.ipc.open_stream(r.content).read_all().column("explanation").to_pylist()
+    assert [e["ngram"] for e in got[2]] == [e["ngram"] for e in j["explanation"][2]]
+    assert np.isclose(got[2][0]["contribution"], j["explanation"][2][0]["contribution"],
+                      rtol=1e-6)
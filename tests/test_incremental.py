@@ -0,0 +1,139 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+from urllib.parse import urlparse
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sqlalchemy import create_engine, text
+
+from ml.incremental import load_state, run_cycle, update
+
+TOXIC = ["you are an idiot", "stupid awful troll", "shut up idiot", "go away moron"]
+CLEAN = ["thanks for the fix", "nice edit friend", "good citation here", "welcome to wiki"]
+
+
+def _artifacts(tmp_path):
+    vec = TfidfVectorizer().fit(TOXIC + CLEAN)
+    clf = LogisticRegression().fit(vec.transform(TOXIC + CLEAN), [1] * 4 + [0] * 4)
+    joblib.dump(vec, tmp_path / "vectorizer.joblib")
+    joblib.dump(clf, tmp_path / "classifier.joblib")
+    (tmp_path / "MODEL_VERSION.txt").write_text("local-v1")
+    return vec, clf
+
+
+def _db(tmp_path, n):
+    eng = create_engine(f"sqlite:///{tmp_path / 'p.db'}")
+    with eng.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE predictions (id INTEGER PRIMARY KEY, input_text TEXT, "
+            "predicted_label TEXT, feedback BOOLEAN, feedback_at TEXT, created_at TEXT)"
+        ))
+        for i in range(1, n + 1):
+            toxic = i % 2 == 0
+            conn.execute(
+                text("INSERT INTO predictions VALUES (:id, :t, :p, :fb, :at, :at)"),
+                {"id": i, "t": (TOXIC if toxic else CLEAN)[i % 4],
+                 "p": "toxic" if toxic else "non-toxic", "fb": True,
+                 "at": f"2024-01-01 00:00:{i:02d}"},
+            )
+    return eng
+
+
+def test_update_warm_starts_from_current_coefficients(tmp_path):
+    vec, clf = _artifacts(tmp_path)
+    new, m = update(vec, clf, [1, 2, 3], TOXIC[:3], [1, 1, 1], holdout_every=1000, epochs=1)
+    assert m["n_train"] == 3 and m["n_holdout"] == 0
+    assert new.coef_.shape == clf.coef_.shape
+    assert np.corrcoef(new.coef_[0], clf.coef_[0])[0, 1] > 0.5
+
+
+def test_run_cycle_publishes_and_advances_high_water_mark(tmp_path):
+    _artifacts(tmp_path)
+    eng = _db(tmp_path, 30)
+
+    res = run_cycle(eng, tmp_path, min_rows=10, max_drop=1.0)
+    assert res["status"] == "published"
+    assert res["new_rows"] == 30
+    assert (tmp_path / "MODEL_VERSION.txt").read_text() == "local-v1+inc1"
+    state = load_state(tmp_path)
+    assert state["id"] == 30 and state["updates"] == 1
+
+    # nothing new since the last cycle
+    assert run_cycle(eng, tmp_path, min_rows=1) == {"status": "waiting", "new_rows": 0}
+
+
+def test_second_cycle_gates_on_the_published_sgd_model(tmp_path):
+    _artifacts(tmp_path)
+    eng = _db(tmp_path, 30)
+    assert run_cycle(eng, tmp_path, min_rows=10, max_drop=1.0)["status"] == "published"
+    published = (tmp_path / "classifier.joblib").read_bytes()
+
+    # Cycle 2 updates the published SGDClassifier: training rows say every
+    # prediction was wrong, the hold-out rows (id % 5 == 0) say it was right
+    with eng.begin() as conn:
+        for i in range(31, 131):
+            toxic = i % 2 == 0
+            conn.execute(
+                text("INSERT INTO predictions VALUES (:id, :t, :p, :fb, :at, :at)"),
+                {"id": i, "t": (TOXIC if toxic else CLEAN)[i % 4],
+                 "p": "toxic" if toxic else "non-toxic", "fb": i % 5 == 0,
+                 "at": f"2024-01-02 00:{i // 60:02d}:{i % 60:02d}"},
+            )
+    res = run_cycle(eng, tmp_path, min_rows=10, max_drop=0.02, epochs=20)
+    assert res["old_acc"] == 1.0 and res["new_acc"] < res["old_acc"]
+    assert res["status"] == "rejected"
+    assert (tmp_path / "classifier.joblib").read_bytes() == published
+    assert (tmp_path / "MODEL_VERSION.txt").read_text() == "local-v1+inc1"
+
+
+def test_register_to_production_goes_through_the_promotion_gate(tmp_path, monkeypatch):
+    mlflow = pytest.importorskip("mlflow")
+    repo = Path(__file__).resolve().parents[1]
+    monkeypatch.setenv("MLFLOW_ALLOW_FILE_STORE", "true")
+    uri = (tmp_path / "mlruns").as_uri()
+    env = dict(os.environ, MLFLOW_TRACKING_URI=uri, PYTHONPATH=str(repo))
+    _artifacts(tmp_path)
+    _db(tmp_path, 30)
+
+    def cycle():
+        # Own process: registering sets MLflow's process-global experiment
+        code = (
+            "import json, sys; from pathlib import Path; from sqlalchemy import create_engine;"
+            "from ml.incremental import run_cycle;"
+            "eng = create_engine(f'sqlite:///{sys.argv[1]}/p.db');"
+            "print(json.dumps(run_cycle(eng, Path(sys.argv[1]), min_rows=10, max_drop=1.0,"
+            " register=True), default=str))"
+        )
+        out = subprocess.run([sys.executable, "-c", code, str(tmp_path)], env=env, cwd=repo,
+                             capture_output=True, text=True)
+        assert out.returncode == 0, out.stderr
+        return json.loads(out.stdout.strip().splitlines()[-1])
+
+    first = cycle()  # nothing registered yet -> Production
+    assert first["mlflow_stage"] == "Production"
+
+    client = mlflow.MlflowClient(tracking_uri=uri)
+    prod_run = client.get_model_version("toxic-comment-model", "1").run_id
+    shutil.rmtree(Path(urlparse(client.get_run(prod_run).info.artifact_uri).path) / "artifacts")
+    eng = create_engine(f"sqlite:///{tmp_path / 'p.db'}")
+    with eng.begin() as conn:
+        for i in range(31, 61):
+            conn.execute(
+                text("INSERT INTO predictions VALUES (:id, :t, 'toxic', 1, :at, :at)"),
+                {"id": i, "t": TOXIC[i % 4], "at": f"2024-01-02 00:00:{i:02d}"},
+            )
+
+    second = cycle()  # Production can't be benchmarked -> fail closed
+    assert second["status"] == "published"
+    assert second["mlflow_stage"] == "Staging"
+    assert "could not benchmark" in second["promotion_refused"][0]
+    v2 = client.get_model_version("toxic-comment-model", "2")
+    assert v2.current_stage == "Staging"
+    assert "promotion_refused" in client.get_run(v2.run_id).data.tags
@@ -0,0 +1,36 @@
+from api.lexicon import Lexicon, label, load_default
+
+
+def test_whole_word_matching_and_negation():
+    lex = load_default()
+    assert lex.score("nice badge") == 0  # "bad" must not match inside "badge"
+    assert label(lex.score("this is great")) == "positive"
+    assert label(lex.score("this is not great")) == "negative"
+    assert label(lex.score("not that it matters, but it was bad")) == "negative"
+
+
+def test_weighted_phrases_from_file(tmp_path):
+    p = tmp_path / "lex.tsv"
+    p.write_text("# term<TAB>weight\nwaste of money\t-3\nworth it\t2\nok\n", encoding="utf-8")
+    lex = Lexicon.from_files(p)
+    assert len(lex) == 3
+    assert lex.score("a total waste of money") == -3
+    assert lex.score_batch(["worth it", "ok ok"]) == [2.0, 2.0]
+
+
+def test_phrases_starting_with_a_negator_match_before_negation():
+    lex = Lexicon({"not bad": 2, "bad": -1, "no problem": 1.5, "problem": -1})
+    assert lex.score("not bad") == 2
+    assert lex.score("no problem at all") == 1.5
+    assert lex.score("not a bad idea") == 1  # no phrase at "not": plain negation
+    assert lex.score("never not bad") == -2  # the phrase itself can still be negated
+
+
+def test_unicode_terms_and_phrases_with_commas(tmp_path):
+    p = tmp_path / "lex.csv"
+    p.write_text("génial,2\nschlecht,-1\nwell, well, well,-1.5\n", encoding="utf-8")
+    lex = Lexicon.from_files(p)
+    assert lex.score("C'est GÉNIAL") == 2
+    assert lex.score("ge\u0301nial") == 2  # decomposed accent, NFC-normalized
+    assert lex.score("sehr schlecht") == -1
+    assert lex.score("well, well, well") == -1.5
@@ -0,0 +1,18 @@
+from api.app.limits import window_text
+
+
+def test_short_text_untouched():
+    assert window_text("hello", 100) == (["hello"], False)
+
+
+def test_head_strategy_keeps_prefix():
+    pieces, truncated = window_text("a" * 50 + "b" * 50, 10, "head")
+    assert truncated and pieces == ["a" * 10]
+
+
+def test_windows_cover_head_and_tail_within_budget():
+    text = "a" * 100 + "z" * 100
+    pieces, truncated = window_text(text, 40, "windows", 4)
+    assert truncated
+    assert sum(map(len, pieces)) <= 40
+    assert pieces[0].startswith("a") and pieces[-1].endswith("z")
@@ -0,0 +1,88 @@
+import json
+import threading
+import time
+
+import pytest
+
+from api.app.model_cache import ModelArtifactCache, dir_checksum, resolve_version
+
+
+def _fake_entry(root, name, version, payload=b"x"):
+    entry = root / name / f"v{version}-deadbeef"
+    (entry / "model").mkdir(parents=True)
+    (entry / "model" / "MLmodel").write_bytes(payload)
+    sha, size = dir_checksum(entry / "model")
+    (entry / "manifest.json").write_text(
+        json.dumps({"version": version, "sha256": sha, "bytes": size, "created": 0})
+    )
+    return entry
+
+
+def test_lookup_verifies_checksum_and_evicts_by_count(tmp_path):
+    cache = ModelArtifactCache(tmp_path, max_versions=2)
+    for v in ("1", "2", "3"):
+        _fake_entry(tmp_path, "m", v)
+    assert cache.lookup("m", "2") is not None
+
+    (tmp_path / "m" / "v1-deadbeef" / "model" / "MLmodel").write_bytes(b"corrupt")
+    assert cache.lookup("m", "1") is None  # checksum mismatch -> dropped
+
+    cache.evict("m", keep=tmp_path / "m" / "v3-deadbeef")
+    assert sorted(p.name for p in (tmp_path / "m").iterdir()) == ["v2-deadbeef", "v3-deadbeef"]
+
+
+def test_fetch_from_file_tracking_store(tmp_path, monkeypatch):
+    pytest.importorskip("mlflow")
+    import mlflow
+    import mlflow.pyfunc
+
+    class Echo(mlflow.pyfunc.PythonModel):
+        def predict(self, context, model_input):
+            return [0.5 for _ in model_input]
+
+    monkeypatch.setenv("MLFLOW_ALLOW_FILE_STORE", "true")  # MLflow >= 3 opt-in
+    monkeypatch.setenv("MLFLOW_TRACKING_URI", (tmp_path / "mlruns").as_uri())
+    with mlflow.start_run():
+        mlflow.pyfunc.log_model(
+            artifact_path="model", python_model=Echo(), registered_model_name="m"
+        )
+    mlflow.MlflowClient().transition_model_version_stage("m", "1", "Production")
+
+    cache = ModelArtifactCache(tmp_path / "cache")
+    version = resolve_version("m", "Production")
+    assert cache.lookup("m", version) is None
+    path = cache.fetch("m", version)
+    assert (path / "MLmodel").exists()
+    assert cache.lookup("m", version) == path
+    assert list(mlflow.pyfunc.load_model(str(path)).predict(["a", "b"])) == [0.5, 0.5]
+
+
+def test_unreachable_registry_does_not_block_load(tmp_path, monkeypatch):
+    pytest.importorskip("mlflow")
+    import mlflow
+
+    from api.app import main
+
+    release, asked = threading.Event(), threading.Event()
+
+    def hanging_registry(name, stage):
+        asked.set()
+        release.wait(10)  # stands in for MLflow's retry/backoff against a dead server
+        raise ConnectionError("registry unreachable")
+
+    monkeypatch.setattr(mlflow, "set_tracking_uri", lambda uri: None)
+    monkeypatch.setattr(main, "MLFLOW_TRACKING_URI", "http://127.0.0.1:1")
+    monkeypatch.setattr(main, "MODEL_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(main, "ALLOW_FALLBACK_MODEL", False)
+    monkeypatch.setattr(main, "TESTING", True)
+    monkeypatch.setattr(main, "resolve_version", hanging_registry)
+
+    m = main.ModelWrapper()
+    t0 = time.perf_counter()
+    try:
+        m.load()
+        assert time.perf_counter() - t0 < 2.0
+        assert m.source == "testing-stub"
+        assert asked.wait(2)  # the lookup still happens, just off the request path
+    finally:
+        release.set()
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+
+from api.app import main
+from api.app.multilabel import LABELS, MultiLabelLinear, pack_scores, unpack_scores
+from ml.preprocess import load_dataset
+from ml.train import train_multilabel
+
+ROWS = [
+    ("you are an idiot", 1, 0, 0, 0, 1, 0),
+    ("i will hurt you idiot", 1, 1, 0, 1, 1, 0),
+    ("shut the f up moron", 1, 0, 1, 0, 1, 0),
+    ("go back to your country", 1, 0, 0, 0, 0, 1),
+    ("thanks for the fix", 0, 0, 0, 0, 0, 0),
+    ("nice edit friend", 0, 0, 0, 0, 0, 0),
+    ("good citation here", 0, 0, 0, 0, 0, 0),
+    ("welcome to the wiki", 0, 0, 0, 0, 0, 0),
+] * 3
+
+
+def _jigsaw(tmp_path):
+    p = tmp_path / "jigsaw.csv"
+    pd.DataFrame(ROWS, columns=["comment_text", *LABELS]).assign(
+        comment_text=lambda d: d["comment_text"] + " " + d.index.astype(str)
+    ).to_csv(p, index=False)
+    return p
+
+
+def test_stacked_heads_match_separate_models():
+    texts = [r[0] for r in ROWS]
+    Y = np.array([r[1:] for r in ROWS])
+    vec = TfidfVectorizer().fit(texts)
+    X = vec.transform(texts)
+    heads = [LogisticRegression().fit(X, Y[:, j]) for j in range(len(LABELS))]
+    stacked = MultiLabelLinear.from_estimators(LABELS, heads)
+
+    P = stacked.predict_proba(X)
+    assert P.shape == (len(texts), len(LABELS))
+    for j, h in enumerate(heads):
+        np.testing.assert_allclose(P[:, j], h.predict_proba(X)[:, 1], atol=1e-5)
+
+
+def test_train_multilabel_from_jigsaw_columns(tmp_path):
+    df = load_dataset(str(_jigsaw(tmp_path)), labels=LABELS)
+    assert list(df.columns) == ["text", *LABELS]
+    vec, clf, metrics = train_multilabel(df["text"].tolist(), df[list(LABELS)].to_numpy(),
+                                         max_iter=100)
+    assert clf.labels == LABELS and clf.W.dtype == np.float32
+    assert clf.W.shape == (len(vec.vocabulary_), len(LABELS))
+    assert {"val_f1", "val_acc", "val_f1_macro", "val_f1_threat"} <= set(metrics)
+
+
+def test_pack_scores_roundtrip():
+    blob = pack_scores([0.0, 0.5, 1.0, 0.25, 0.9, 1.2])
+    assert len(blob) == len(LABELS)
+    got = unpack_scores(blob)
+    assert got["toxic"] == 0.0 and got["threat"] == round(64 / 255, 4)
+    assert got["identity_hate"] == 1.0  # clipped
+
+
+def test_predict_returns_all_label_scores(tmp_path):
+    df = load_dataset(str(_jigsaw(tmp_path)), labels=LABELS)
+    vec, clf, _ = train_multilabel(df["text"].tolist(), df[list(LABELS)].to_numpy(), max_iter=100)
+    saved = main.model.model
+    main.model.model = ("local", vec, clf)
+    try:
+        c = TestClient(main.app)
+        data = c.post("/predict", json={"text": "i will hurt you idiot"}).json()
+        streamed = c.post("/predict/stream", content=b'"i will hurt you idiot"\n').json()
+        batch = c.post("/predict/batch", json={"texts": ["i will hurt you idiot", ""]}).json()
+        explained = c.post("/predict", json={"text": "i will hurt you idiot", "explain": 3}).json()
+    finally:
+        main.model.model = saved
+    assert set(data["scores"]) == set(LABELS)
+    assert data["probability"] == data["scores"]["toxic"]
+    assert data["label"] == "toxic"
+    assert streamed["scores"] == data["scores"]
+    assert batch["scores"]["threat"][1] is None
+    assert abs(batch["scores"]["threat"][0] - data["scores"]["threat"]) < 1e-6
+    assert len(explained["explanation"]) == 3  # toxic head
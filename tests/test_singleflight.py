@@ -0,0 +1,127 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ["TESTING"] = "1"  # avoid DB in tests
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import create_engine, text  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from api.app import main  # noqa: E402
+from api.app.singleflight import SingleFlight  # noqa: E402
+
+
+def test_concurrent_duplicates_share_one_call():
+    sf, calls = SingleFlight(), []
+    go = threading.Barrier(10)
+
+    def work():
+        calls.append(1)
+        time.sleep(0.2)
+        return 42
+
+    def caller(_):
+        go.wait()
+        return sf.do("same", work)
+
+    with ThreadPoolExecutor(10) as ex:
+        results = list(ex.map(caller, range(10)))
+    assert len(calls) == 1
+    assert [r for r, _ in results] == [42] * 10
+    assert sum(shared for _, shared in results) == 9
+    assert sf.stats() == {"leaders": 1, "coalesced": 9, "errors": 0, "enabled": True,
+                          "inflight": 0}
+    assert sf.do("same", lambda: 7) == (7, False)  # nothing kept once finished
+
+
+def test_leader_error_reaches_every_waiter():
+    sf = SingleFlight()
+    started = threading.Event()
+
+    def boom():
+        started.set()
+        time.sleep(0.1)
+        raise RuntimeError("model failed")
+
+    with ThreadPoolExecutor(2) as ex:
+        leader = ex.submit(sf.do, "k", boom)
+        started.wait()
+        waiter = ex.submit(sf.do, "k", lambda: "never runs")
+        for f in (leader, waiter):
+            with pytest.raises(RuntimeError, match="model failed"):
+                f.result()
+    assert sf.stats()["errors"] == 1 and sf.stats()["inflight"] == 0
+
+
+def test_predict_coalesces_but_logs_every_request(monkeypatch):
+    eng = create_engine("sqlite://", poolclass=StaticPool,
+                        connect_args={"check_same_thread": False})
+    with eng.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE predictions (id INTEGER PRIMARY KEY AUTOINCREMENT, input_text TEXT, "
+            "predicted_label TEXT, probability REAL, latency_ms REAL, model_version TEXT, "
+            "label_scores BLOB)"
+        ))
+    monkeypatch.setattr(main, "get_engine", lambda: eng)
+    main.model.ensure_loaded()
+    real, calls = main.model.predict_scores_batch, []
+
+    def slow(texts):
+        calls.append(texts)
+        time.sleep(0.3)
+        return real(texts)
+
+    monkeypatch.setattr(main.model, "predict_scores_batch", slow)
+    client = TestClient(main.app)
+    before = client.get("/metrics").json()["coalescing"]["coalesced"]
+    go = threading.Barrier(6)
+
+    def post(text_in):
+        go.wait()
+        return client.post("/predict", json={"text": text_in}).json()
+
+    # Same comment after normalization (case/whitespace), plus one different one
+    texts = ["You are an IDIOT", "you are an idiot", "  you are an idiot ", "you are an idiot",
+             "you are an idiot", "thanks for the fix"]
+    with ThreadPoolExecutor(len(texts)) as ex:
+        out = list(ex.map(post, texts))
+
+    assert len(calls) == 2
+    assert len({o["id"] for o in out}) == len(texts)  # one DB row per caller
+    assert len({o["probability"] for o in out[:5]}) == 1
+    assert client.get("/metrics").json()["coalescing"]["coalesced"] == before + 4
+    with eng.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM predictions")).scalar() == len(texts)
+
+
+def test_waiters_give_back_their_admission_slot(monkeypatch):
+    # Only two slots: duplicates must not queue behind each other for them
+    monkeypatch.setattr(main.admission, "max_inflight", 2)
+    main.model.ensure_loaded()
+    real, calls = main.model.predict_scores_batch, []
+
+    def slow(texts):
+        calls.append(texts)
+        time.sleep(0.3)
+        return real(texts)
+
+    monkeypatch.setattr(main.model, "predict_scores_batch", slow)
+    monkeypatch.setattr(main, "get_engine", lambda: None)
+    before = main.admission.counters["released_early"]
+    go = threading.Barrier(8)
+
+    with TestClient(main.app) as client:  # one event loop, like a real server
+        def post(_):
+            go.wait()
+            return client.post("/predict", json={"text": "raid copypasta"}).status_code
+
+        with ThreadPoolExecutor(8) as ex:
+            codes = list(ex.map(post, range(8)))
+
+    assert codes == [200] * 8
+    assert calls.count(["raid copypasta"]) == 1  # startup warm-up calls aside
+    assert main.admission.counters["released_early"] == before + 7
+    assert main.admission.inflight == 0
@@ -0,0 +1,21 @@
+from api.app.textnorm import normalize, normalize_batch
+
+
+def test_variants_collapse_to_same_hash():
+    variants = [
+        "You are   STUPID!!!!!",
+        "you are stupid!!",
+        "  you\tare\u200b stupid!!! ",
+        "Ｙｏｕ ａｒｅ ｓｔｕｐｉｄ!!!",
+        "yоu аre stupid!!",  # Cyrillic o / a
+    ]
+    norms, hashes = normalize_batch(variants)
+    assert set(norms) == {"you are stupid!!"}
+    assert len(set(hashes)) == 1
+
+
+def test_hash_is_64_bit_and_distinguishes_texts():
+    _, h1 = normalize("you are nice")
+    _, h2 = normalize("you are mean")
+    assert 0 <= h1 < 2**64
+    assert h1 != h2
@@ -0,0 +1,36 @@
+import os
+
+os.environ["TESTING"] = "1"  # avoid DB in tests
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import api.app.main as api_main  # noqa: E402
+from api.app.tracing import span  # noqa: E402
+
+
+def test_slow_request_captured_with_spans_and_propagated_id(monkeypatch):
+    monkeypatch.setattr(api_main.slow_traces, "threshold_ms", 0.0)
+    api_main.slow_traces.clear()
+    c = TestClient(api_main.app)
+    tid = "4bf92f3577b34da6a3ce929d0e0e4736"
+    r = c.post(
+        "/predict",
+        json={"text": "you are nice"},
+        headers={"traceparent": f"00-{tid}-00f067aa0ba902b7-01"},
+    )
+    assert r.headers["x-trace-id"] == tid
+
+    traces = c.get("/debug/slow-requests").json()["traces"]
+    mine = [t for t in traces if t["trace_id"] == tid]
+    assert mine and mine[0]["path"] == "/predict"
+    names = {s["name"] for s in mine[0]["spans"]}
+    assert {"request.parse", "normalize", "model.transform", "model.predict_proba"} <= names
+
+
+def test_fast_requests_not_captured_and_span_is_noop_outside_requests():
+    api_main.slow_traces.clear()
+    c = TestClient(api_main.app)
+    c.post("/predict", json={"text": "you are nice"})  # well under default threshold
+    assert api_main.slow_traces.snapshot() == []
+    with span("outside"):
+        pass